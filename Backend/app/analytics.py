@@ -0,0 +1,121 @@
+"""
+Suite-wide status analytics, computed in SQL over one suite at a time.
+
+transitions - how the status of every case changed between two points in time:
+              the status at a time point is the case's newest execution at or
+              before it, found with one index seek per case on
+              ix_test_executions_case_executed (the current status comes from
+              the latest_* projection). Run-to-run diffs are in runs.compare_runs.
+flakiness   - how often a case's outcome flips between consecutive executions
+              among its last N. Only the last N executions of each case are
+              read (again one index range per case) and the flips are counted
+              with LAG() over that bounded set.
+"""
+from datetime import datetime
+from sqlalchemy import select, func, case, and_
+from sqlalchemy.orm import aliased
+from .models import TestCase, TestExecution
+from .crud import NOT_STARTED, _counted_status, _utc
+
+CHANGED_LIMIT = 500
+FLAKY_WINDOW = 20
+FLAKY_LIMIT = 100
+EPOCH = datetime(1970, 1, 1)
+
+def _status_at(at: datetime | None):
+    """Correlated scalar: the case's status as of `at` (None: now, from the projection)."""
+    if at is None:
+        return _counted_status()
+    e = aliased(TestExecution)
+    #bucketed inside, so the subquery is rendered (and seeks) once
+    newest = (select(_counted_status(e.status))
+              .where(e.test_case_id == TestCase.id, e.executed_at <= _utc(at))
+              .order_by(e.executed_at.desc(), e.id.desc())
+              .limit(1)
+              .correlate(TestCase)
+              .scalar_subquery())
+    return func.coalesce(newest, NOT_STARTED)
+
+def status_transitions(db, suite_id: int, since: datetime, until: datetime | None = None,
+                       limit: int = CHANGED_LIMIT):
+    """
+    Status of every case in the suite at `since` vs at `until` (default: now).
+    Returns a count per (from, to) pair and up to `limit` changed cases, regressions
+    (away from PASS) first. Cases created after `since` count as NOT STARTED there.
+    """
+    per_case = (select(TestCase.id.label("case_id"), TestCase.title,
+                       _status_at(since).label("from_status"), _status_at(until).label("to_status"))
+                .where(TestCase.suite_id == suite_id)
+                .subquery("per_case"))
+    transitions = db.execute(
+        select(per_case.c.from_status, per_case.c.to_status, func.count().label("count"))
+        .group_by(per_case.c.from_status, per_case.c.to_status)
+        .order_by(func.count().desc())
+    ).all()
+    regression = case((and_(per_case.c.from_status == "PASS", per_case.c.to_status != "PASS"), 0), else_=1)
+    changed = db.execute(
+        select(per_case.c.case_id, per_case.c.title, per_case.c.from_status, per_case.c.to_status)
+        .where(per_case.c.from_status != per_case.c.to_status)
+        .order_by(regression, per_case.c.case_id)
+        .limit(limit)
+    ).all()
+    return {
+        "suite_id": suite_id,
+        "since": _utc(since).isoformat(),
+        "until": _utc(until).isoformat() if until else None,
+        "transitions": [dict(r._mapping) for r in transitions],
+        "changed": [dict(r._mapping) for r in changed],
+        "changed_total": sum(r.count for r in transitions if r.from_status != r.to_status),
+    }
+
+def flaky_cases(db, suite_id: int, window: int = FLAKY_WINDOW, min_executions: int = 3,
+                limit: int = FLAKY_LIMIT):
+    """
+    Flakiness of the suite's cases over their last `window` finished executions
+    (IN PROGRESS is skipped; executions tied with the oldest one in the window are
+    included too). A flip is a change between passing and not passing;
+    score = flips / (executions - 1), from 0 (stable) to 1 (flips every time).
+    Returns the `limit` flakiest cases with at least min_executions executions.
+    """
+    e = aliased(TestExecution)
+    #executed_at of the case's window-th newest execution, rows from there on are its last N
+    cutoff = (select(e.executed_at)
+              .where(e.test_case_id == TestCase.id, e.status != "IN PROGRESS")
+              .order_by(e.executed_at.desc())
+              .limit(1).offset(window - 1)
+              .correlate(TestCase)
+              .scalar_subquery())
+    passed = case((TestExecution.status == "PASS", 1), else_=0)
+    #partitioned by the driving table's key so rows arrive in index order, no sort
+    previous = func.lag(passed).over(partition_by=TestCase.id,
+                                     order_by=(TestExecution.executed_at.desc(), TestExecution.id.desc()))
+    recent = (select(TestCase.id.label("case_id"), TestExecution.executed_at, passed.label("passed"),
+                     case((passed != previous, 1), else_=0).label("flip"))
+              .select_from(TestCase)
+              .join(TestExecution, and_(TestExecution.test_case_id == TestCase.id,
+                                        TestExecution.executed_at >= func.coalesce(cutoff, EPOCH)))
+              .where(TestCase.suite_id == suite_id, TestExecution.status != "IN PROGRESS")
+              .subquery("recent"))
+    per_case = (select(recent.c.case_id, func.count().label("executions"), func.sum(recent.c.flip).label("flips"),
+                       func.sum(recent.c.passed).label("passes"),
+                       func.max(recent.c.executed_at).label("last_executed_at"))
+                .group_by(recent.c.case_id)
+                .having(func.count() >= max(min_executions, 2))
+                .subquery("per_case"))
+    score = (per_case.c.flips * 1.0 / (per_case.c.executions - 1)).label("score")
+    rows = db.execute(
+        select(per_case, TestCase.title, score)
+        .join(TestCase, TestCase.id == per_case.c.case_id)
+        .where(per_case.c.flips > 0)
+        .order_by(score.desc(), per_case.c.case_id)
+        .limit(limit)
+    ).all()
+    return {
+        "suite_id": suite_id,
+        "window": window,
+        "cases": [{"case_id": r.case_id, "title": r.title, "executions": r.executions,
+                   "flips": r.flips, "pass_rate": round(r.passes / r.executions, 3),
+                   "score": round(float(r.score), 3),
+                   "last_executed_at": r.last_executed_at.isoformat() if r.last_executed_at else None}
+                  for r in rows],
+    }
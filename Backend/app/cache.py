@@ -0,0 +1,167 @@
+"""
+Response cache for the read endpoints.
+
+Entries are stored with tags ("suites", "projects", "suite:<id>", "summaries")
+and the write paths invalidate exactly the tags they touch. The default backend
+is an in-process LRU with a TTL; CACHE_BACKEND=none turns caching off and
+CACHE_BACKEND=package.module:ClassName plugs in another CacheBackend.
+"""
+import hashlib
+import importlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from . import config
+
+class CacheBackend:
+    """Interface for cache backends, values are opaque to the backend."""
+    def get(self, key: str):
+        raise NotImplementedError
+    def generation(self, tags):
+        """Token that changes whenever one of tags is invalidated."""
+        raise NotImplementedError
+    def set(self, key: str, value, tags=(), generation=None):
+        """Store value; skipped when generation no longer matches generation(tags)."""
+        raise NotImplementedError
+    def invalidate(self, *tags: str):
+        raise NotImplementedError
+    def clear(self):
+        raise NotImplementedError
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+class NullCache(CacheBackend):
+    def get(self, key):
+        return None
+    def generation(self, tags):
+        return None
+    def set(self, key, value, tags=(), generation=None):
+        pass
+    def invalidate(self, *tags):
+        pass
+    def clear(self):
+        pass
+    def stats(self):
+        return {"backend": "none"}
+
+class MemoryCache(CacheBackend):
+    """LRU with a per-entry TTL and a bound on the number of entries."""
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}                # tag -> set of keys
+        self._generations = {}         # tag -> number of invalidations so far
+        self._epoch = 0                # bumped by clear(), which invalidates every tag
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidated": 0,
+                        "stale_skipped": 0}
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                self._counts["expired"] += 1
+                self._counts["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            return entry[1]
+
+    def _generation(self, tags):
+        return (self._epoch, *(self._generations.get(tag, 0) for tag in tags))
+
+    def generation(self, tags):
+        with self._lock:
+            return self._generation(tags)
+
+    def set(self, key, value, tags=(), generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation(tags):
+                #invalidated while the value was being built, it may predate that write
+                self._counts["stale_skipped"] += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+                    self._counts["invalidated"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return {"backend": "memory", "entries": len(self._entries), "max_entries": self.max_entries,
+                    "ttl_seconds": self.ttl, **self._counts,
+                    "hit_ratio": round(self._counts["hits"] / lookups, 3) if lookups else None}
+
+def make_cache() -> CacheBackend:
+    backend = config.CACHE_BACKEND
+    if backend == "none":
+        return NullCache()
+    if backend == "memory":
+        return MemoryCache(config.CACHE_TTL_SECONDS, config.CACHE_MAX_ENTRIES)
+    module, _, name = backend.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+cache = make_cache()
+
+def suite_tags(suite_ids, listing: bool = False):
+    """Tags to drop after a write touching these suites; listing=True when suites were added/removed."""
+    tags = [f"suite:{sid}" for sid in set(suite_ids) if sid is not None]
+    tags.append("summaries")
+    if listing:
+        tags.append("suites")
+    return tags
+
+def invalidate_suites(suite_ids, listing: bool = False):
+    cache.invalidate(*suite_tags(suite_ids, listing))
+
+def cached_json(request: Request, key: str, tags, producer):
+    """
+    JSON response for key, built by producer() on a miss. The body carries a
+    strong ETag so a client sending it back in If-None-Match gets a 304.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        #taken before reading: a write invalidating these tags meanwhile keeps the result out of the cache
+        generation = cache.generation(tags)
+        body = json.dumps(jsonable_encoder(producer())).encode()
+        entry = (body, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"')
+        cache.set(key, entry, tags, generation)
+    body, etag = entry
+    if etag in (request.headers.get("if-none-match") or ""):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
@@ -0,0 +1,140 @@
+"""
+Maintenance commands, run from the Backend folder:
+
+    python -m app.cli rebuild-latest [--suite-id N]
+    python -m app.cli check-latest [--suite-id N]
+    python -m app.cli db-settings
+    python -m app.cli search-rebuild
+    python -m app.cli retention [--keep-last N] [--keep-days N] [--archive-dir DIR] [--dry-run] [--vacuum]
+    python -m app.cli migrate [--revision REV]
+    python -m app.cli explain [--verbose]
+"""
+import argparse
+import json
+import sys
+from . import config
+from .db import SessionLocal, engine, engine_report
+from .schema import run_migrations, current_revision
+from .crud import rebuild_latest_status, check_latest_status, rebuild_suite_counters, check_suite_counters
+from .retention import apply_retention, ARCHIVE_FORMATS
+from .search import ensure_search_index, rebuild_search_index
+from .locks import startup_lock
+
+def upgrade(revision: str = "head"):
+    #same lock as the app's startup, a worker starting meanwhile waits for us
+    with startup_lock(engine):
+        run_migrations(engine, revision)
+
+def cmd_rebuild_latest(args):
+    db = SessionLocal()
+    try:
+        filled = rebuild_latest_status(db, args.suite_id)
+        print(f"latest status rebuilt, {filled} case(s) have executions")
+        rebuild_suite_counters(db, args.suite_id)
+        print("suite status counters rebuilt")
+    finally:
+        db.close()
+    return 0
+
+def cmd_check_latest(args):
+    db = SessionLocal()
+    try:
+        mismatches = check_latest_status(db, args.suite_id)
+        counters = check_suite_counters(db, args.suite_id)
+    finally:
+        db.close()
+    for m in mismatches[:args.show]:
+        print(m)
+    print(f"{len(mismatches)} case(s) out of sync")
+    for m in counters[:args.show]:
+        print(m)
+    print(f"{len(counters)} suite counter(s) out of sync")
+    return 1 if mismatches or counters else 0
+
+def cmd_db_settings(args):
+    for key, value in engine_report(engine).items():
+        print(f"{key:>14}: {value}")
+    return 0
+
+def cmd_search_rebuild(args):
+    if not ensure_search_index(engine):
+        rebuild_search_index(engine)
+    print("search index rebuilt")
+    return 0
+
+def cmd_retention(args):
+    db = SessionLocal()
+    try:
+        report = apply_retention(db, keep_last=args.keep_last, keep_days=args.keep_days,
+                                 archive_dir=args.archive_dir, archive_format=args.format,
+                                 dry_run=args.dry_run, vacuum=args.vacuum)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    if report["db_bytes_before"] is not None and report["db_bytes_after"] is not None:
+        print(f"reclaimed {report['db_bytes_before'] - report['db_bytes_after']} byte(s) on disk, "
+              f"{report['free_bytes_after']} byte(s) free for reuse inside the file")
+    return 0
+
+def cmd_migrate(args):
+    upgrade(args.revision)
+    print(f"database at revision {current_revision(engine)}")
+    return 0
+
+def cmd_explain(args):
+    from .explain import check_plans
+    problems = check_plans(verbose=args.verbose)
+    for p in problems:
+        print(f"\n{p['path']}: full scan of {', '.join(p['tables'])}\n  {p['sql']}")
+        for line in p["plan"]:
+            print(f"    {line}")
+    print(f"\n{len(problems)} statement(s) fall back to a full table scan")
+    return 1 if problems else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rebuild-latest", help="backfill test_cases.latest_* and suite counters from test_executions")
+    p.add_argument("--suite-id", type=int)
+    p.set_defaults(func=cmd_rebuild_latest, upgrade=True)
+
+    p = sub.add_parser("check-latest", help="compare test_cases.latest_* and suite counters with test_executions")
+    p.add_argument("--suite-id", type=int)
+    p.add_argument("--show", type=int, default=20, help="how many mismatches to print")
+    p.set_defaults(func=cmd_check_latest, upgrade=True)
+
+    p = sub.add_parser("db-settings", help="print the effective engine, pool and pragma settings")
+    p.set_defaults(func=cmd_db_settings)
+
+    p = sub.add_parser("search-rebuild", help="create or refill the full-text index on test_cases")
+    p.set_defaults(func=cmd_search_rebuild, upgrade=True)
+
+    p = sub.add_parser("retention", help="purge old executions into daily rollups, optionally archiving them")
+    p.add_argument("--keep-last", type=int, default=config.RETENTION_KEEP_LAST, help="executions kept per case")
+    p.add_argument("--keep-days", type=int, default=config.RETENTION_KEEP_DAYS, help="days of raw history kept")
+    p.add_argument("--archive-dir", default=config.RETENTION_ARCHIVE_DIR or None)
+    p.add_argument("--format", choices=ARCHIVE_FORMATS, default=config.RETENTION_ARCHIVE_FORMAT)
+    p.add_argument("--dry-run", action="store_true", help="only count what would be purged")
+    p.add_argument("--vacuum", action="store_true", help="VACUUM afterwards so the file shrinks")
+    p.set_defaults(func=cmd_retention, upgrade=True)
+
+    p = sub.add_parser("migrate", help="upgrade the database schema (alembic) and convert old steps")
+    p.add_argument("--revision", default="head")
+    p.set_defaults(func=cmd_migrate)
+
+    p = sub.add_parser("explain", help="check the hot queries' plans for full table scans (scratch database)")
+    p.add_argument("--verbose", action="store_true", help="print every statement with its plan")
+    p.set_defaults(func=cmd_explain)
+
+    args = parser.parse_args(argv)
+    #commands working on the data need the current schema; migrate, db-settings and explain leave it alone
+    if getattr(args, "upgrade", False):
+        upgrade()
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
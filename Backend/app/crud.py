@@ -1,41 +1,258 @@
-from sqlalchemy import select
-from .models import TestCase, TestExecution, TestSuite, Project
+from sqlalchemy import select, func, update, insert, delete, case, bindparam
+from .models import (TestCase, TestExecution, TestSuite, Project, SuiteStatusCount, ExecutionDailyRollup,
+                     TestRun, TestRunCase, TestRunStatusCount)
 from collections import Counter
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+from sqlalchemy.orm import undefer
+from .cache import cache, invalidate_suites
+from .events import case_event, publish_events, publish_reload
+from .db import lock_for_write
+from .utils import normalize_steps
+
+NOT_STARTED = "NOT STARTED"
+EXECUTION_STATUSES = ("PASS", "FAIL", "BLOCKER", "IN PROGRESS")
+HISTORY_LIMIT = 50  # executions per history page on the case detail
+IN_CHUNK = 5000  # ids per IN (...) list, keeps SQLite under its bound parameter limit
+
+def status_key(status: str | None):
+    """Bucket used by the suite counters for a case's latest status."""
+    return status if status not in (None, "", "null") else NOT_STARTED
+
+def latest_execution_subquery(suite_id: int | None = None):
+    """
+    Latest execution per test case, computed in one pass with a window function.
+    rn == 1 marks the newest row of each case (ties on executed_at broken by id).
+    """
+    rn = func.row_number().over(
+        partition_by=TestExecution.test_case_id,
+        order_by=(TestExecution.executed_at.desc(), TestExecution.id.desc()),
+    ).label("rn")
+    q = select(TestExecution.id,
+               TestExecution.test_case_id,
+               TestExecution.status,
+               TestExecution.comment,
+               TestExecution.executed_at,
+               rn)
+    if suite_id is not None:
+        #only rank executions of cases in this suite instead of the whole history
+        q = q.join(TestCase, TestCase.id == TestExecution.test_case_id).where(TestCase.suite_id == suite_id)
+    return q.subquery("latest_exec")
 
 def get_cases_with_latest_status(db, suite_id: int):
     """
     Return list of cases in suite with latest_status and latest_comment (if any).
+    Reads the latest_* projection columns, so test_executions is not touched.
+    Steps are left out, they come with the case detail.
     """
-    cases = db.query(TestCase).filter(TestCase.suite_id == suite_id).order_by(TestCase.id).all()
-    results = []
-    for c in cases:
-        latest = db.query(TestExecution).filter(TestExecution.test_case_id == c.id).order_by(TestExecution.executed_at.desc()).first() #this is a select query with where clause and order by condition
-        results.append({
-            "id": c.id,
-            "title": c.title,
-            "description": c.description,
-            "priority": c.priority,
-            "steps": c.steps,
-            "latest_status": latest.status if latest else None,
-            "latest_comment": latest.comment if latest else None,
-            "latest_executed_at": latest.executed_at.isoformat() if latest and latest.executed_at else None
-        })
-    return results
+    rows = db.execute(
+        select(TestCase.id, TestCase.title, TestCase.description, TestCase.priority,
+               TestCase.latest_status, TestCase.latest_comment, TestCase.latest_executed_at)
+        .where(TestCase.suite_id == suite_id)
+        .order_by(TestCase.id)
+    ).all()
+    return [
+        {
+            "id": r.id,
+            "title": r.title,
+            "description": r.description,
+            "priority": r.priority,
+            "latest_status": r.latest_status,
+            "latest_comment": r.latest_comment,
+            "latest_executed_at": r.latest_executed_at.isoformat() if r.latest_executed_at else None
+        }
+        for r in rows
+    ]
+
+CASE_FIELDS = {
+    "id": TestCase.id,
+    "title": TestCase.title,
+    "description": TestCase.description,
+    "priority": TestCase.priority,
+    "steps": TestCase.steps,
+    "latest_status": TestCase.latest_status,
+    "latest_comment": TestCase.latest_comment,
+    "latest_executed_at": TestCase.latest_executed_at,
+}
+#list views skip the large text columns unless asked for
+DEFAULT_PAGE_FIELDS = ("id", "title", "priority", "latest_status", "latest_executed_at")
+
+def get_cases_page(db, suite_id: int, after_id: int | None = None, limit: int = 100,
+                   fields=DEFAULT_PAGE_FIELDS, priorities: list[str] | None = None,
+                   statuses: list[str] | None = None):
+    """
+    One page of a suite's cases ordered by id, using after_id as keyset cursor.
+    Returns {"cases": [...], "next_cursor": id or None, "total": n or None}.
+    total comes from the suite counters, so it is only given when not filtering by priority.
+    """
+    fields = [f for f in fields if f in CASE_FIELDS]
+    if "id" not in fields:
+        fields.insert(0, "id")
+    q = select(*[CASE_FIELDS[f].label(f) for f in fields]).where(TestCase.suite_id == suite_id)
+    if after_id is not None:
+        q = q.where(TestCase.id > after_id)
+    if priorities:
+        q = q.where(TestCase.priority.in_(priorities))
+    if statuses:
+        cond = TestCase.latest_status.in_([st for st in statuses if st != NOT_STARTED])
+        if NOT_STARTED in statuses:
+            cond = cond | TestCase.latest_status.is_(None) | TestCase.latest_status.in_(("", "null"))
+        q = q.where(cond)
+    rows = db.execute(q.order_by(TestCase.id).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    cases = []
+    for r in rows:
+        item = dict(r._mapping)
+        if item.get("latest_executed_at"):
+            item["latest_executed_at"] = item["latest_executed_at"].isoformat()
+        cases.append(item)
+    total = None
+    if not priorities:
+        counts = compute_suite_summary_using_latest(db, suite_id)
+        total = sum(n for st, n in counts.items() if not statuses or st in statuses)
+    return {"cases": cases, "next_cursor": rows[-1].id if has_more else None, "total": total}
+
+def apply_latest_execution(tc: TestCase, te: TestExecution):
+    """
+    Point the case's latest_* projection at te if te is newer than what it holds.
+    """
+    if tc.latest_executed_at is not None and te.executed_at is not None:
+        if (te.executed_at, te.id) < (tc.latest_executed_at, tc.latest_execution_id or 0):
+            return
+    tc.latest_execution_id = te.id
+    tc.latest_status = te.status
+    tc.latest_comment = te.comment
+    tc.latest_executed_at = te.executed_at
+
+def rebuild_latest_status(db, suite_id: int | None = None):
+    """
+    Recompute the latest_* projection from the raw execution history (backfill).
+    Returns the number of cases that have at least one execution.
+    """
+    cases = update(TestCase)
+    if suite_id is not None:
+        cases = cases.where(TestCase.suite_id == suite_id)
+    db.execute(cases.values(latest_execution_id=None, latest_status=None,
+                            latest_comment=None, latest_executed_at=None))
+    latest = latest_execution_subquery(suite_id)
+    filled = db.execute(
+        update(TestCase)
+        .where(TestCase.id == latest.c.test_case_id, latest.c.rn == 1)
+        .values(latest_execution_id=latest.c.id,
+                latest_status=latest.c.status,
+                latest_comment=latest.c.comment,
+                latest_executed_at=latest.c.executed_at)
+    ).rowcount
+    db.commit()
+    return filled
+
+def check_latest_status(db, suite_id: int | None = None):
+    """
+    Compare the latest_* projection against test_executions.
+    Returns one dict per case whose projection does not match its newest execution.
+    """
+    latest = latest_execution_subquery(suite_id)
+    q = (select(TestCase.id, TestCase.latest_execution_id, TestCase.latest_status,
+                latest.c.id.label("actual_execution_id"), latest.c.status.label("actual_status"))
+         .outerjoin(latest, (latest.c.test_case_id == TestCase.id) & (latest.c.rn == 1))
+         .where(TestCase.latest_execution_id.is_distinct_from(latest.c.id)
+                | TestCase.latest_status.is_distinct_from(latest.c.status))
+         .order_by(TestCase.id))
+    if suite_id is not None:
+        q = q.where(TestCase.suite_id == suite_id)
+    return [
+        {"case_id": r.id,
+         "projected": {"execution_id": r.latest_execution_id, "status": r.latest_status},
+         "actual": {"execution_id": r.actual_execution_id, "status": r.actual_status}}
+        for r in db.execute(q)
+    ]
+
+def _execution_dict(e):
+    return {"id": e.id, "status": e.status, "comment": e.comment,
+            "executed_at": e.executed_at.isoformat() if e.executed_at else None}
+
+def get_execution_history(db, case_id: int, limit: int = HISTORY_LIMIT,
+                          before: datetime | None = None, before_id: int | None = None,
+                          after: datetime | None = None, after_id: int | None = None):
+    """
+    One page of a case's executions, newest first, read through ix_test_executions_case_executed.
+    before/after are executed_at cursors (before_id/after_id break ties between rows with the
+    same timestamp). With after the page holds the executions right after it, so a client can
+    catch up on newer rows. Returns {"executions": [...], "next_before": cursor or None,
+    "next_after": cursor or None}; a cursor is {"before": iso, "before_id": id} (or after/after_id).
+    """
+    q = select(TestExecution.id, TestExecution.status, TestExecution.comment, TestExecution.executed_at)\
+        .where(TestExecution.test_case_id == case_id)
+    if before is not None:
+        before = _utc(before)
+        older = TestExecution.executed_at < before
+        if before_id is not None:
+            older |= (TestExecution.executed_at == before) & (TestExecution.id < before_id)
+        q = q.where(older)
+    if after is not None:
+        after = _utc(after)
+        newer = TestExecution.executed_at > after
+        if after_id is not None:
+            newer |= (TestExecution.executed_at == after) & (TestExecution.id > after_id)
+        q = q.where(newer)
+        #oldest rows after the cursor first, flipped back to newest first below
+        q = q.order_by(TestExecution.executed_at, TestExecution.id)
+    else:
+        q = q.order_by(TestExecution.executed_at.desc(), TestExecution.id.desc())
+    rows = db.execute(q.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after is not None:
+        rows.reverse()
+    executions = [_execution_dict(r) for r in rows]
+    next_before = next_after = None
+    if has_more and after is None:
+        next_before = {"before": executions[-1]["executed_at"], "before_id": executions[-1]["id"]}
+    if has_more and after is not None:
+        next_after = {"after": executions[0]["executed_at"], "after_id": executions[0]["id"]}
+    return {"executions": executions, "next_before": next_before, "next_after": next_after}
 
-def get_case_detail_with_executions(db, case_id: int):
-    c = db.query(TestCase).get(case_id)
+def get_case_detail_with_executions(db, case_id: int, limit: int = HISTORY_LIMIT, **cursor):
+    """The case plus one page of its history (see get_execution_history for the cursor arguments)."""
+    c = db.get(TestCase, case_id, options=[undefer(TestCase.steps)])
     if not c:
         return None
-    executions = db.query(TestExecution).filter(TestExecution.test_case_id == case_id).order_by(TestExecution.executed_at.desc()).all()
-    exec_list = [
-        {"id": e.id, "status": e.status, "comment": e.comment, "executed_at": e.executed_at.isoformat() if e.executed_at else None}
-        for e in executions
-    ]
     return {
         "case_r": {"id": c.id, "title": c.title, "description": c.description, "priority": c.priority, "steps": c.steps},
-        "executions": exec_list
+        **get_execution_history(db, case_id, limit, **cursor),
     }
 
+def get_execution_daily_counts(db, case_id: int, since: datetime | None = None, until: datetime | None = None):
+    """
+    Executions per day and status for a case, counted in SQL over [since, until).
+    Days purged by retention come from execution_daily_rollups, matched by whole day:
+    a day is counted when it overlaps the range, so a midnight until leaves that day out.
+    Returns [{"day": "2024-05-01", "PASS": 3, "FAIL": 1, ...}, ...], oldest day first.
+    """
+    day = func.date(TestExecution.executed_at)
+    q = select(day.label("day"), TestExecution.status, func.count().label("count"))\
+        .where(TestExecution.test_case_id == case_id)
+    if since is not None:
+        q = q.where(TestExecution.executed_at >= _utc(since))
+    if until is not None:
+        q = q.where(TestExecution.executed_at < _utc(until))
+    #history purged by retention lives on in the daily rollups
+    rolled = select(ExecutionDailyRollup.day, ExecutionDailyRollup.status, ExecutionDailyRollup.count)\
+        .where(ExecutionDailyRollup.test_case_id == case_id)
+    if since is not None:
+        rolled = rolled.where(ExecutionDailyRollup.day >= _utc(since).date())
+    if until is not None:
+        #a rollup day is counted when it overlaps [since, until), like the raw rows are
+        until = _utc(until)
+        last = until.date() if until.time() != time.min else until.date() - timedelta(days=1)
+        rolled = rolled.where(ExecutionDailyRollup.day <= last)
+    days = {}
+    for r in [*db.execute(q.group_by(day, TestExecution.status)), *db.execute(rolled)]:
+        row = days.setdefault(str(r.day), {"day": str(r.day)})
+        row[r.status] = row.get(r.status, 0) + r.count
+    return [days[k] for k in sorted(days)]
+
 #not used now
 def get_next_case_in_suite(db, suite_id: int, after_case_id: int | None):
     q = db.query(TestCase).filter(TestCase.suite_id == suite_id)
@@ -44,41 +261,300 @@ def get_next_case_in_suite(db, suite_id: int, after_case_id: int | None):
     q = q.order_by(TestCase.id)
     return q.first()
 
+def bump_suite_counter(db, suite_id: int, status: str | None, delta: int):
+    """
+    Add delta to the suite's counter for status, creating the row on first use.
+    Runs inside the caller's transaction.
+    """
+    if suite_id is None or delta == 0:
+        return
+    status = status_key(status)
+    res = db.execute(
+        update(SuiteStatusCount)
+        .where(SuiteStatusCount.suite_id == suite_id, SuiteStatusCount.status == status)
+        .values(count=SuiteStatusCount.count + delta)
+    )
+    if res.rowcount == 0:
+        db.execute(insert(SuiteStatusCount).values(suite_id=suite_id, status=status, count=delta))
+
+def create_test_case(db, suite_id: int, title: str, description: str = "", priority: str = "", steps=None):
+    tc = TestCase(suite_id=suite_id, title=title, description=description, priority=priority,
+                  steps=normalize_steps(steps))
+    db.add(tc)
+    bump_suite_counter(db, suite_id, None, 1)
+    db.commit()
+    invalidate_suites([suite_id])
+    publish_reload([suite_id], "case added")
+    db.refresh(tc)
+    return tc
+
 def insert_execution(db, case_id: int, status: str, comment:str| None):
-    te = TestExecution(test_case_id=case_id, status=status, comment=comment)
+    """
+    Record one execution; returns None when the case does not exist.
+    The case is read under the write lock, so two results for the same case can't
+    both move it out of the same old bucket.
+    """
+    lock_for_write(db)
+    case_row = db.get(TestCase, case_id, with_for_update=True, populate_existing=True)
+    if case_row is None:
+        db.rollback()
+        return None
+    #same clock as stage_executions, the server's CURRENT_TIMESTAMP only has whole seconds
+    te = TestExecution(test_case_id=case_id, status=status, comment=comment,
+                       executed_at=_utc(datetime.now(timezone.utc)))
     db.add(te)
+    db.flush()
+    old_status = status_key(case_row.latest_status)
+    apply_latest_execution(case_row, te) #same transaction as the history row
+    new_status = status_key(case_row.latest_status)
+    if new_status != old_status:
+        #the case moved from one bucket to another
+        bump_suite_counter(db, case_row.suite_id, old_status, -1)
+        bump_suite_counter(db, case_row.suite_id, new_status, 1)
+    events = [case_event(case_row, old_status, new_status)]
     db.commit()
+    invalidate_suites(sid for sid, _ in events)
+    publish_events(events)
     db.refresh(te)
     return te
 
+def _utc(value: datetime):
+    #history is stored as naive UTC, like CURRENT_TIMESTAMP
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def record_executions(db, records: list[dict]):
+    """
+    Record many executions in one transaction.
+    records: dicts with case_id, status, comment (optional), executed_at (optional datetime).
+    Case ids are checked with one query per IN_CHUNK ids, history rows go in with one
+    executemany (ids allocated up front), the latest_* projection of the touched cases
+    with another, and the suite counters once per touched bucket. Returns one result dict
+    per record, in order.
+    """
+    results, events = stage_executions(db, records)
+    db.commit()
+    invalidate_suites(sid for sid, _ in events)
+    publish_events(events)
+    return results
+
+def _allocate_execution_ids(db, n: int):
+    """
+    n new test_executions ids in ascending order, so the history rows go in with a plain
+    executemany (INSERT ... RETURNING in parameter order runs row by row on SQLite).
+    SQLite: after the highest id, the caller holds the write lock. Postgres: from the sequence.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        seq = func.nextval(func.pg_get_serial_sequence("test_executions", "id"))
+        return sorted(db.scalars(select(seq).select_from(func.generate_series(1, n))))
+    start = db.scalar(select(func.coalesce(func.max(TestExecution.id), 0))) + 1
+    return list(range(start, start + n))
+
+def stage_executions(db, records: list[dict]):
+    """
+    record_executions without the commit, so callers can add their own writes to the
+    same transaction (test runs do). Records may carry a run_id. Returns (results, events);
+    after committing, pass the events to invalidate_suites/publish_events.
+    """
+    now = _utc(datetime.now(timezone.utc))
+    ids = sorted({r.get("case_id") for r in records if isinstance(r.get("case_id"), int)})
+    #the counters move from the statuses read here, so read them under the write lock
+    lock_for_write(db)
+    cases = {}
+    for i in range(0, len(ids), IN_CHUNK):
+        #plain rows, the projection is written back below with one executemany, not per-object flushes
+        q = (select(TestCase.id, TestCase.suite_id, TestCase.latest_execution_id, TestCase.latest_status,
+                    TestCase.latest_comment, TestCase.latest_executed_at)
+             .where(TestCase.id.in_(ids[i:i + IN_CHUNK])).order_by(TestCase.id).with_for_update())
+        for r in db.execute(q):
+            cases[r.id] = SimpleNamespace(**r._mapping)
+
+    results = [None] * len(records)
+    events = []
+    rows, positions = [], []
+    for i, r in enumerate(records):
+        status = (r.get("status") or "").upper()
+        if r.get("error"):
+            results[i] = {"index": i, "case_id": r.get("case_id"), "ok": False, "error": r["error"]}
+        elif r.get("case_id") not in cases:
+            results[i] = {"index": i, "case_id": r.get("case_id"), "ok": False, "error": "Test case not found"}
+        elif status not in EXECUTION_STATUSES:
+            results[i] = {"index": i, "case_id": r["case_id"], "ok": False, "error": f"Invalid status {r.get('status')!r}"}
+        else:
+            rows.append({"test_case_id": r["case_id"], "status": status, "comment": r.get("comment"),
+                         "executed_at": _utc(r["executed_at"]) if r.get("executed_at") else now,
+                         "run_id": r.get("run_id")})
+            positions.append(i)
+
+    if rows:
+        new_ids = _allocate_execution_ids(db, len(rows))
+        db.execute(insert(TestExecution), [{"id": eid, **row} for eid, row in zip(new_ids, rows)])
+        before = {cid: (status_key(tc.latest_status), tc.latest_execution_id) for cid, tc in cases.items()}
+        for row, execution_id, i in zip(rows, new_ids, positions):
+            apply_latest_execution(cases[row["test_case_id"]], SimpleNamespace(id=execution_id, **row))
+            results[i] = {"index": i, "case_id": row["test_case_id"], "ok": True, "execution_id": execution_id}
+        deltas = Counter()
+        moved = []
+        for cid in sorted({row["test_case_id"] for row in rows}):
+            tc = cases[cid]
+            old, old_execution_id = before[cid]
+            after = status_key(tc.latest_status)
+            if tc.latest_execution_id != old_execution_id:
+                moved.append({"case_id": cid, "new_execution_id": tc.latest_execution_id,
+                              "new_status": tc.latest_status, "new_comment": tc.latest_comment,
+                              "new_executed_at": tc.latest_executed_at})
+            if after != old:
+                deltas[(tc.suite_id, old)] -= 1
+                deltas[(tc.suite_id, after)] += 1
+            events.append(case_event(tc, old, after))
+        if moved:
+            #on the table, not the entity: the ORM treats an executemany UPDATE as update-by-primary-key
+            t = TestCase.__table__
+            db.execute(
+                update(t).where(t.c.id == bindparam("case_id"))
+                .values(latest_execution_id=bindparam("new_execution_id"), latest_status=bindparam("new_status"),
+                        latest_comment=bindparam("new_comment"), latest_executed_at=bindparam("new_executed_at")),
+                moved,
+            )
+        for (suite_id, status), delta in deltas.items():
+            bump_suite_counter(db, suite_id, status, delta)
+    return results, events
+
+def case_ids_by_title(db, suite_id: int, titles):
+    """title -> case id within a suite (lowest id wins on duplicate titles)."""
+    titles = list(set(titles))
+    found = {}
+    for i in range(0, len(titles), IN_CHUNK):
+        q = (select(TestCase.title, func.min(TestCase.id))
+             .where(TestCase.suite_id == suite_id, TestCase.title.in_(titles[i:i + IN_CHUNK]))
+             .group_by(TestCase.title))
+        found.update(dict(db.execute(q).all()))
+    return found
+
 def compute_suite_summary_using_latest(db, suite_id: int):
-    rows = get_cases_with_latest_status(db, suite_id)
-    total = len(rows)
-    normalized = [
-    r["latest_status"] if r["latest_status"] not in (None, "", "null")
-    else "NOT STARTED"
-    for r in rows]
-    status_counts = Counter(normalized)
-    failed = [r for r in rows if r["latest_status"] == "FAIL"]
-    blocked = [r for r in rows if r["latest_status"]=="BLOCKER"]
-    return status_counts#,{"failed_count": len(failed),
-        #"failed": failed, "blocked": blocked}
-        #"total_cases": total,
-        #"passed": passed,
+    rows = db.execute(
+        select(SuiteStatusCount.status, SuiteStatusCount.count)
+        .where(SuiteStatusCount.suite_id == suite_id, SuiteStatusCount.count > 0)
+    ).all()
+    return {r.status: r.count for r in rows}
 
-def delete_all_test_cases_from_suite(db, suite_id:int):
-    subq = db.query(TestCase.id).filter(TestCase.suite_id == suite_id).subquery()
-    #delete execution
-    db.query(TestExecution).filter(TestExecution.test_case_id.in_(subq)).delete(synchronize_session=False)
+def compute_summary_rollup(db, project_id: int | None = None, suite_ids: list[int] | None = None):
+    """
+    Per-suite status counts plus their total, for a project and/or a list of suites,
+    in a single query over suite_status_counts.
+    """
+    q = (select(SuiteStatusCount.suite_id, SuiteStatusCount.status, SuiteStatusCount.count)
+         .join(TestSuite, TestSuite.id == SuiteStatusCount.suite_id)
+         .where(SuiteStatusCount.count > 0)
+         .order_by(SuiteStatusCount.suite_id))
+    if project_id is not None:
+        q = q.where(TestSuite.project_id == project_id)
+    if suite_ids:
+        q = q.where(SuiteStatusCount.suite_id.in_(suite_ids))
+    suites = {}
+    total = Counter()
+    for r in db.execute(q):
+        suites.setdefault(r.suite_id, {})[r.status] = r.count
+        total[r.status] += r.count
+    return {"suites": suites, "total": dict(total)}
+
+def _counted_status(status=TestCase.latest_status):
+    #status_key in SQL
+    return case((status.in_(("", "null")), NOT_STARTED), else_=func.coalesce(status, NOT_STARTED))
+
+def _recount_suites(db, suite_ids=None):
+    #suite_status_counts from the test_cases projection, for suite_ids or every suite; no commit
+    clear = delete(SuiteStatusCount)
+    status = _counted_status()
+    q = (select(TestCase.suite_id, status, func.count())
+         .where(TestCase.suite_id.is_not(None))
+         .group_by(TestCase.suite_id, status))
+    if suite_ids is not None:
+        clear = clear.where(SuiteStatusCount.suite_id.in_(suite_ids))
+        q = q.where(TestCase.suite_id.in_(suite_ids))
+    db.execute(clear)
+    db.execute(insert(SuiteStatusCount).from_select(["suite_id", "status", "count"], q))
+
+def rebuild_suite_counters(db, suite_id: int | None = None):
+    """Recompute suite_status_counts from the test_cases projection."""
+    _recount_suites(db, None if suite_id is None else [suite_id])
     db.commit()
 
-    #delete test cases
-    cases = db.query(TestCase).filter(TestCase.suite_id == suite_id).delete(synchronize_session=False)
+def check_suite_counters(db, suite_id: int | None = None):
+    """Return (suite_id, status, stored, actual) for every counter that is off."""
+    status = _counted_status()
+    q = (select(TestCase.suite_id, status.label("status"), func.count().label("count"))
+         .where(TestCase.suite_id.is_not(None))
+         .group_by(TestCase.suite_id, status))
+    if suite_id is not None:
+        q = q.where(TestCase.suite_id == suite_id)
+    actual = {(r.suite_id, r.status): r.count for r in db.execute(q)}
+    stored_q = select(SuiteStatusCount.suite_id, SuiteStatusCount.status, SuiteStatusCount.count)
+    if suite_id is not None:
+        stored_q = stored_q.where(SuiteStatusCount.suite_id == suite_id)
+    stored = {(r.suite_id, r.status): r.count for r in db.execute(stored_q)}
+    return [
+        {"suite_id": k[0], "status": k[1], "stored": stored.get(k, 0), "actual": actual.get(k, 0)}
+        for k in sorted(set(actual) | set(stored))
+        if stored.get(k, 0) != actual.get(k, 0)
+    ]
+
+def _delete_cases(db, case_filter):
+    """
+    Set-based delete of the cases matching case_filter and everything hanging off them.
+    test_executions is cleared explicitly: databases created before it had ON DELETE
+    CASCADE keep the old foreign key, and the cascade does nothing with foreign keys off.
+    """
+    case_ids = select(TestCase.id).where(case_filter)
+    #without synchronize_session=False the ORM adds RETURNING and reads back every deleted id
+    plain = {"synchronize_session": False}
+    db.execute(delete(TestExecution).where(TestExecution.test_case_id.in_(case_ids)), execution_options=plain)
+    db.execute(delete(ExecutionDailyRollup).where(ExecutionDailyRollup.test_case_id.in_(case_ids)),
+               execution_options=plain)
+    #run snapshots outlive the case, they keep its title and result
+    db.execute(update(TestRunCase).where(TestRunCase.test_case_id.in_(case_ids)).values(test_case_id=None),
+               execution_options=plain)
+    return db.execute(delete(TestCase).where(case_filter), execution_options=plain).rowcount
+
+def delete_all_test_cases_from_suite(db, suite_id:int):
+    #one transaction, either every case goes or none does
+    cases = _delete_cases(db, TestCase.suite_id == suite_id)
+    db.execute(delete(SuiteStatusCount).where(SuiteStatusCount.suite_id == suite_id))
     db.commit()
+    invalidate_suites([suite_id])
+    publish_reload([suite_id], "cases deleted")
     if cases==0:
         return "No cases present to delete"
     return f"{cases} test case(s) deleted"
-    
+
+def delete_cases_in_batches(db, suite_ids, batch_size: int, on_batch=None):
+    """
+    Delete the cases of suite_ids batch_size at a time, committing every batch so the
+    write lock is only held briefly. A reload event goes out after every batch and the
+    suite counters are recounted once the last batch is gone. on_batch(deleted_so_far)
+    is called after every commit. Returns the total.
+    """
+    suite_ids = list(suite_ids)
+    deleted = 0
+    while True:
+        ids = db.scalars(select(TestCase.id).where(TestCase.suite_id.in_(suite_ids))
+                         .order_by(TestCase.id).limit(batch_size)).all()
+        if not ids:
+            break
+        deleted += _delete_cases(db, TestCase.id.in_(ids))
+        db.commit()
+        invalidate_suites(suite_ids)
+        #clients patching rows from events drop what this batch removed
+        publish_reload(suite_ids, "cases deleted")
+        if on_batch:
+            on_batch(deleted)
+    #results recorded between batches moved the counters of cases that are gone now,
+    #recount under the write lock so none lands between the count and the commit
+    lock_for_write(db)
+    _recount_suites(db, suite_ids)
+    db.commit()
+    invalidate_suites(suite_ids)
+    return deleted
+
 def get_all_suites_details(db):
     #joining 2 tables to get the data of project name
     '''suites = db.query(TestSuite.id, 
@@ -96,13 +572,42 @@ def get_all_suites_details(db):
     # Convert each row to a dict cleanly
     return [dict(row._mapping) for row in suites]
 
+def _delete_runs(db, run_filter):
+    run_ids = select(TestRun.id).where(run_filter)
+    plain = {"synchronize_session": False}
+    db.execute(delete(TestRunCase).where(TestRunCase.run_id.in_(run_ids)), execution_options=plain)
+    db.execute(delete(TestRunStatusCount).where(TestRunStatusCount.run_id.in_(run_ids)), execution_options=plain)
+    db.execute(update(TestExecution).where(TestExecution.run_id.in_(run_ids)).values(run_id=None),
+               execution_options=plain)
+    return db.execute(delete(TestRun).where(run_filter), execution_options=plain).rowcount
+
+def _delete_suites(db, suite_ids):
+    #within the caller's transaction; runs first so their snapshots aren't detached case by case
+    _delete_runs(db, TestRun.suite_id.in_(suite_ids))
+    deleted = _delete_cases(db, TestCase.suite_id.in_(suite_ids))
+    db.execute(delete(SuiteStatusCount).where(SuiteStatusCount.suite_id.in_(suite_ids)))
+    db.execute(delete(TestSuite).where(TestSuite.id.in_(suite_ids)))
+    return deleted
+
 def delete_suite_crud(db, suite_id:int):
-    #count_ts = db.query(TestCase).filter(TestCase.suite_id ==suite_id).all
-    #if len(count_ts)!=0:
-    #    return "Kindly delete the test cases first linked to this suite before suite"
-    #else:
-    del_s = db.query(TestSuite).filter(TestSuite.id == suite_id).first()
-    db.delete(del_s)
+    if db.get(TestSuite, suite_id) is None:
+        return None
+    cases = _delete_suites(db, [suite_id])
+    db.commit()
+    invalidate_suites([suite_id], listing=True)
+    publish_reload([suite_id], "suite deleted")
+    return f"Test Suite got deleted along with {cases} test case(s)"
+
+def delete_project_crud(db, project_id: int):
+    """Delete a project, its suites and their cases in one transaction. None if it doesn't exist."""
+    if db.get(Project, project_id) is None:
+        return None
+    suite_ids = db.scalars(select(TestSuite.id).where(TestSuite.project_id == project_id)).all()
+    cases = _delete_suites(db, suite_ids)
+    _delete_runs(db, TestRun.project_id == project_id)
+    db.execute(delete(Project).where(Project.id == project_id))
     db.commit()
-    message = f"Test Suite got deleted"
-    return message
\ No newline at end of file
+    invalidate_suites(suite_ids, listing=True)
+    cache.invalidate("projects")
+    publish_reload(suite_ids, "project deleted")
+    return f"Project got deleted along with {len(suite_ids)} suite(s) and {cases} test case(s)"
@@ -1,11 +1,80 @@
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, declarative_base
+from . import config
 
-DB_URL = "sqlite:///./db.sqlite"
+logger = logging.getLogger(__name__)
 
-# For SQLite use connect_args to allow usage in same thread for dev
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False}, echo=False)
+DB_URL = config.DB_URL
+
+def _sqlite_pragmas(dbapi_conn, connection_record):
+    cur = dbapi_conn.cursor()
+    cur.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    cur.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+    cur.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    cur.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    cur.execute(f"PRAGMA cache_size={config.SQLITE_CACHE_SIZE}")
+    #SQLite ignores REFERENCES/ON DELETE CASCADE unless this is on, per connection
+    cur.execute(f"PRAGMA foreign_keys={'ON' if config.SQLITE_FOREIGN_KEYS else 'OFF'}")
+    cur.close()
+
+def build_engine(url: str = DB_URL):
+    pool = dict(pool_size=config.DB_POOL_SIZE, max_overflow=config.DB_MAX_OVERFLOW,
+                pool_timeout=config.DB_POOL_TIMEOUT, pool_recycle=config.DB_POOL_RECYCLE)
+    if url.startswith("sqlite"):
+        in_memory = url in ("sqlite://", "sqlite:///:memory:")
+        # For SQLite use connect_args to allow usage in same thread for dev
+        eng = create_engine(url, echo=config.DB_ECHO,
+                            connect_args={"check_same_thread": False,
+                                          "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000},
+                            **({} if in_memory else pool))
+        event.listen(eng, "connect", _sqlite_pragmas)
+        return eng
+    return create_engine(url, echo=config.DB_ECHO, pool_pre_ping=True, **pool)
+
+engine = build_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+def engine_report(eng=engine):
+    """Effective database settings, logged at startup to verify a deployment."""
+    report = {
+        "url": eng.url.render_as_string(hide_password=True),
+        "dialect": eng.dialect.name,
+        "pool": type(eng.pool).__name__,
+    }
+    for attr, key in (("size", "pool_size"), ("_max_overflow", "max_overflow"),
+                      ("_timeout", "pool_timeout"), ("_recycle", "pool_recycle")):
+        value = getattr(eng.pool, attr, None)
+        report[key] = value() if callable(value) else value
+    if eng.dialect.name == "sqlite":
+        with eng.connect() as conn:
+            for pragma in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "foreign_keys"):
+                report[pragma] = conn.execute(text(f"PRAGMA {pragma}")).scalar()
+    return report
+
+def log_engine_report(eng=engine):
+    settings = engine_report(eng)
+    logger.info("database settings: %s", ", ".join(f"{k}={v}" for k, v in settings.items()))
+    return settings
+
+def lock_for_write(db):
+    """
+    Take the write lock before reading rows a write depends on (a case's latest status
+    before moving its counters). SQLite: BEGIN IMMEDIATE, so no other writer commits in
+    between; the session's first write would only take it later. Other databases lock
+    the rows themselves: read them with SELECT ... FOR UPDATE after calling this.
+    """
+    conn = db.connection()
+    if conn.dialect.name == "sqlite" and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def get_db():
+    #request scoped session, injected into the handlers with Depends(get_db)
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
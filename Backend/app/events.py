@@ -0,0 +1,100 @@
+"""
+Per-suite execution events for live UIs.
+
+Write paths call publish() after their commit. Every suite keeps a short ring
+buffer of numbered events, so a client can poll for what it missed
+(events_since) or hold a server-sent events stream (subscribe). Events are
+small: the changed case's new latest status plus the counter delta, or a
+"reload" event when cases were added or removed.
+
+The bus lives in the process: with several workers a subscriber only hears
+about writes handled by its own worker, so clients should still refresh
+periodically (the response ETags keep that cheap).
+"""
+import asyncio
+import threading
+from collections import deque
+from . import config
+
+def _deliver(queue: asyncio.Queue, event: dict):
+    """
+    Queue an event for one stream. A client too slow to keep up gets its queue
+    replaced by one reload marker at this seq, so it reloads instead of silently
+    missing events (put_nowait would raise QueueFull in the event loop).
+    """
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait({"seq": event["seq"], "suite_id": event["suite_id"],
+                          "type": "reload", "reason": "missed events"})
+
+class EventBus:
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._seq = {}          # suite id -> last sequence number
+        self._buffers = {}      # suite id -> deque of events
+        self._subscribers = {}  # suite id -> set of (loop, queue)
+
+    def publish(self, suite_id: int, event: dict):
+        with self._lock:
+            seq = self._seq.get(suite_id, 0) + 1
+            self._seq[suite_id] = seq
+            event = {"seq": seq, "suite_id": suite_id, **event}
+            self._buffers.setdefault(suite_id, deque(maxlen=self.buffer_size)).append(event)
+            subscribers = list(self._subscribers.get(suite_id, ()))
+        for loop, queue in subscribers:
+            #publishers run in worker threads, queues belong to the event loop
+            loop.call_soon_threadsafe(_deliver, queue, event)
+
+    def events_since(self, suite_id: int, after: int | None):
+        """
+        (events, last_seq, reset). reset is True when events after `after` already
+        fell out of the buffer, the client should then reload instead of patching.
+        """
+        with self._lock:
+            last = self._seq.get(suite_id, 0)
+            buf = list(self._buffers.get(suite_id, ()))
+        if after is None:
+            return [], last, False
+        if after > last:
+            return [], last, True  # server restarted, numbering began again
+        reset = bool(buf) and buf[0]["seq"] > after + 1
+        return [e for e in buf if e["seq"] > after], last, reset
+
+    def subscribe(self, suite_id: int):
+        queue = asyncio.Queue(maxsize=self.buffer_size)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(suite_id, set()).add(entry)
+        return entry
+
+    def unsubscribe(self, suite_id: int, entry):
+        with self._lock:
+            subs = self._subscribers.get(suite_id)
+            if subs:
+                subs.discard(entry)
+
+bus = EventBus(config.EVENTS_BUFFER_SIZE)
+
+def case_event(tc, old: str, new: str):
+    """(suite_id, event) for a case whose latest execution changed, built before commit."""
+    return tc.suite_id, {
+        "type": "case",
+        "case_id": tc.id,
+        "latest_status": tc.latest_status,
+        "latest_comment": tc.latest_comment,
+        "latest_executed_at": tc.latest_executed_at.isoformat() if tc.latest_executed_at else None,
+        "counts_delta": {old: -1, new: 1} if old != new else {},
+    }
+
+def publish_events(events):
+    """Publish (suite_id, event) pairs, call after the commit that made them true."""
+    for suite_id, event in events:
+        if suite_id is not None:
+            bus.publish(suite_id, event)
+
+def publish_reload(suite_ids, reason: str):
+    publish_events((sid, {"type": "reload", "reason": reason}) for sid in set(suite_ids))
@@ -0,0 +1,128 @@
+"""
+Query plan check for the hot paths (`python -m app.cli explain`).
+
+Builds a scratch SQLite database through the migrations, fills it with a little
+data and runs the hot crud/runs/analytics functions against it while recording
+every statement they send. Each statement is then run through EXPLAIN QUERY PLAN
+and a full scan of a table (SCAN <table>, with or without a covering index) is
+reported unless the path lists that table as expected. The exit status is 1 when
+anything falls back to a full scan, so it can run in CI next to the build.
+"""
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from .db import Base, build_engine
+from .schema import run_migrations
+from .search import ensure_search_index, search_cases
+from .models import Project, TestSuite
+from . import crud, runs, analytics, importer
+
+SCAN = re.compile(r"^SCAN (\w+)")
+ALIAS = re.compile(r"\b(\w+) AS (\w+)\b")
+SKIP = re.compile(r"^\s*(PRAGMA|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b", re.I)
+
+def _seed(db):
+    project = Project(name="explain")
+    db.add(project)
+    db.flush()
+    suites = [TestSuite(project_id=project.id, name=f"explain {i}") for i in range(2)]
+    db.add_all(suites)
+    db.commit()
+    ids = [crud.create_test_case(db, s.id, f"case {s.id}.{i}", "login page", "High", "1. open").id
+           for s in suites for i in range(3)]
+    start = datetime(2024, 1, 1)
+    crud.record_executions(db, [{"case_id": cid, "status": st, "executed_at": start + timedelta(days=d)}
+                                for cid in ids for d, st in enumerate(("PASS", "FAIL", "PASS"))])
+    return project.id, [s.id for s in suites], ids
+
+def hot_paths(project_id, suite_ids, case_ids):
+    """(name, call(db), tables a full scan of is expected) for every path checked."""
+    suite, other_suite = suite_ids
+    case = case_ids[0]
+    since = datetime(2024, 1, 2)
+    state = {}
+
+    def start_run(db):
+        state["run"] = runs.create_run(db, suite)["id"]
+
+    def second_run(db):
+        state["head"] = runs.create_run(db, suite)["id"]
+        runs.record_run_results(db, state["head"], [{"case_id": case, "status": "FAIL"}])
+
+    return [
+        ("cases of a suite", lambda db: crud.get_cases_with_latest_status(db, suite), ()),
+        ("cases page", lambda db: crud.get_cases_page(db, suite, after_id=case, statuses=["PASS"]), ()),
+        ("case detail", lambda db: crud.get_case_detail_with_executions(db, case), ()),
+        ("older history", lambda db: crud.get_execution_history(db, case, before=since, before_id=10), ()),
+        ("daily trend", lambda db: crud.get_execution_daily_counts(db, case, since=since), ()),
+        ("suite summary", lambda db: crud.compute_suite_summary_using_latest(db, suite), ()),
+        ("project summary", lambda db: crud.compute_summary_rollup(db, project_id=project_id), ()),
+        #the listing reads every suite by design
+        ("suite listing", lambda db: crud.get_all_suites_details(db), ("test_suites", "projects")),
+        ("record executions", lambda db: crud.record_executions(db, [{"case_id": case, "status": "PASS"}]), ()),
+        ("match results by title", lambda db: crud.case_ids_by_title(db, suite, ["case 1", "case 2"]), ()),
+        ("upload", lambda db: importer.import_testcases(db, [{"title": "uploaded", "suite": "explain 0"}]), ()),
+        ("search", lambda db: search_cases(db, "login", suite_id=suite), ()),
+        ("create run", start_run, ()),
+        ("run results", lambda db: runs.record_run_results(db, state["run"], [{"case_id": case, "status": "PASS"}]), ()),
+        ("run summary", lambda db: runs.get_run_summary(db, state["run"]), ()),
+        ("run cases", lambda db: runs.get_run_cases_page(db, state["run"], status="NOT STARTED"), ()),
+        ("suite runs", lambda db: runs.list_runs(db, suite), ()),
+        ("compare runs", lambda db: (second_run(db), runs.compare_runs(db, state["run"], state["head"])), ()),
+        ("transitions", lambda db: analytics.status_transitions(db, suite, since), ()),
+        ("flaky cases", lambda db: analytics.flaky_cases(db, suite), ()),
+        ("delete cases of a suite", lambda db: crud.delete_all_test_cases_from_suite(db, other_suite), ()),
+        ("delete suite", lambda db: crud.delete_suite_crud(db, suite), ()),
+        ("delete project", lambda db: crud.delete_project_crud(db, project_id), ()),
+    ]
+
+def _plan(conn, statement, parameters):
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [r[-1] for r in rows]
+
+def check_plans(verbose: bool = False, out=print):
+    """Run every hot path on a scratch database; returns the list of unexpected full scans."""
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'explain.sqlite')}")
+        try:
+            run_migrations(engine)
+            ensure_search_index(engine)
+            tables = set(Base.metadata.tables)
+            db = sessionmaker(bind=engine)()
+            project_id, suite_ids, case_ids = _seed(db)
+            captured = []
+
+            @event.listens_for(engine, "before_cursor_execute")
+            def _capture(conn, cursor, statement, parameters, context, executemany):
+                if not SKIP.match(statement):
+                    captured.append((statement, parameters[0] if executemany and parameters else parameters))
+
+            for name, call, expected in hot_paths(project_id, suite_ids, case_ids):
+                captured.clear()
+                call(db)
+                db.commit()
+                statements = list(captured)
+                with engine.connect() as conn:
+                    for statement, parameters in statements:
+                        plan = _plan(conn, statement, parameters)
+                        #plans name tables by their alias (test_executions AS test_executions_1)
+                        aliases = {a: t for t, a in ALIAS.findall(statement) if t in tables}
+                        scans = [aliases.get(m.group(1), m.group(1)) for m in map(SCAN.match, plan) if m]
+                        bad = [t for t in scans if t in tables and t not in expected]
+                        if bad:
+                            problems.append({"path": name, "tables": bad, "sql": " ".join(statement.split()),
+                                             "plan": plan})
+                        if verbose:
+                            out(f"-- {name}: {' '.join(statement.split())[:160]}")
+                            for line in plan:
+                                out(f"     {line}")
+                status = "ok" if not any(p["path"] == name for p in problems) else "FULL SCAN"
+                out(f"{name:>26}  {len(statements):>3} statement(s)  {status}")
+            db.close()
+        finally:
+            engine.dispose()
+    return problems
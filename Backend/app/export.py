@@ -0,0 +1,109 @@
+"""
+Streaming export of a suite's cases and execution history.
+
+The generators below open their own session (they run after the request handler
+has returned) and read the rows through yield_per, so memory stays flat and the
+first bytes go out before the whole history has been read.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from sqlalchemy import select
+from .db import SessionLocal
+from .models import TestCase, TestExecution
+from .crud import _utc
+from .utils import steps_text
+
+YIELD_PER = 1000
+FLUSH_LINES = 500
+CSV_COLUMNS = ["case_id", "title", "description", "priority", "steps", "latest_status",
+               "execution_id", "status", "comment", "executed_at"]
+
+def _iso(value: datetime | None):
+    return value.isoformat() if value else None
+
+def _rows(db, suite_id: int, executions: bool, since: datetime | None, until: datetime | None):
+    """
+    (case row, its executions oldest first) per case, in case id order. Cases and
+    executions are two streams in the same order walked side by side, so the case
+    columns (description, steps) are read once per case, not once per execution.
+    """
+    cases = db.execute(select(TestCase.id, TestCase.title, TestCase.description, TestCase.priority,
+                              TestCase.steps, TestCase.latest_status)
+                       .where(TestCase.suite_id == suite_id).order_by(TestCase.id)
+                       .execution_options(yield_per=YIELD_PER))
+    if not executions:
+        for c in cases:
+            yield c, []
+        return
+    q = (select(TestExecution.test_case_id, TestExecution.id, TestExecution.status,
+                TestExecution.comment, TestExecution.executed_at)
+         .join(TestCase, TestCase.id == TestExecution.test_case_id)
+         .where(TestCase.suite_id == suite_id)
+         .order_by(TestExecution.test_case_id, TestExecution.executed_at, TestExecution.id))
+    if since is not None:
+        q = q.where(TestExecution.executed_at >= _utc(since))
+    if until is not None:
+        q = q.where(TestExecution.executed_at < _utc(until))
+    history = iter(db.execute(q.execution_options(yield_per=YIELD_PER)))
+    e = next(history, None)
+    for c in cases:
+        own = []
+        while e is not None and e.test_case_id <= c.id:
+            if e.test_case_id == c.id:
+                own.append(e)
+            e = next(history, None)
+        yield c, own
+
+def iter_suite_ndjson(suite_id: int, executions: bool = True,
+                      since: datetime | None = None, until: datetime | None = None):
+    """One JSON object per case, with its executions (oldest first) nested in it."""
+    db = SessionLocal()
+    try:
+        buf = []
+        for c, history in _rows(db, suite_id, executions, since, until):
+            item = {"id": c.id, "title": c.title, "description": c.description,
+                    "priority": c.priority, "steps": c.steps, "latest_status": c.latest_status}
+            if executions:
+                item["executions"] = [{"id": e.id, "status": e.status, "comment": e.comment,
+                                       "executed_at": _iso(e.executed_at)} for e in history]
+            buf.append(json.dumps(item) + "\n")
+            if len(buf) >= FLUSH_LINES:
+                yield "".join(buf)
+                buf = []
+        if buf:
+            yield "".join(buf)
+    finally:
+        db.close()
+
+def iter_suite_csv(suite_id: int, executions: bool = True,
+                   since: datetime | None = None, until: datetime | None = None):
+    """One CSV line per execution (case columns repeated), or per case when executions=False."""
+    db = SessionLocal()
+    try:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(CSV_COLUMNS if executions else CSV_COLUMNS[:6])
+        yield out.getvalue() #header goes out straight away
+        out.seek(0)
+        out.truncate()
+        lines = 0
+        for c, history in _rows(db, suite_id, executions, since, until):
+            case_row = [c.id, c.title, c.description, c.priority, steps_text(c.steps), c.latest_status]
+            if not executions:
+                writer.writerow(case_row)
+            elif not history:
+                writer.writerow(case_row + [None, None, None, None])
+            for e in history:
+                writer.writerow(case_row + [e.id, e.status, e.comment, _iso(e.executed_at)])
+            lines += max(len(history), 1)
+            if lines >= FLUSH_LINES:
+                yield out.getvalue()
+                out.seek(0)
+                out.truncate()
+                lines = 0
+        if lines:
+            yield out.getvalue()
+    finally:
+        db.close()
@@ -0,0 +1,139 @@
+import logging
+import time
+from collections import Counter
+from itertools import islice
+from sqlalchemy import select, func, insert
+from sqlalchemy.exc import SQLAlchemyError
+from .models import TestSuite, TestCase
+from .crud import bump_suite_counter
+from .cache import invalidate_suites
+from .events import publish_reload
+from .utils import clean_cell, normalize_steps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_SUITE_NAME = "Default Suite"
+
+class ImportFailed(Exception):
+    """Raised when an import stops part way; inserted is how many rows stayed committed."""
+    def __init__(self, message: str, inserted: int):
+        super().__init__(message)
+        self.inserted = inserted
+
+def _chunks(rows, size: int):
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _suite_name(row: dict):
+    name = clean_cell(row.get("suite"))
+    return str(name) if name not in (None, "", "Default") else DEFAULT_SUITE_NAME
+
+def _resolve_suites(db, names, suites: dict, project_id: int | None, created: list):
+    """
+    Fill suites (name -> id) for every name not resolved yet: one lookup query,
+    then one batch insert for the names that do not exist.
+    """
+    missing = {n for n in names if n not in suites}
+    if not missing:
+        return
+    rows = db.execute(
+        select(TestSuite.name, func.min(TestSuite.id))
+        .where(TestSuite.name.in_(missing))
+        .group_by(TestSuite.name)
+    ).all()
+    for name, suite_id in rows:
+        suites[name] = suite_id
+    new_suites = [TestSuite(project_id=project_id, name=n) for n in sorted(missing - suites.keys())]
+    if new_suites:
+        db.add_all(new_suites)
+        db.flush()
+        for s in new_suites:
+            suites[s.name] = s.id
+            created.append(s.name)
+
+def import_testcases(db, rows, chunk_size: int = DEFAULT_CHUNK_SIZE, atomic: bool = True, on_chunk=None):
+    """
+    Bulk insert test case rows (dicts with title/description/priority/steps/suite).
+    rows can be a list or a generator such as utils.iter_testcase_rows, which is
+    consumed chunk by chunk.
+
+    Suites are resolved by name with one query per batch of unseen names and
+    missing ones are created in bulk. Cases go in with executemany inserts of
+    chunk_size rows. With atomic=True the whole file is one transaction,
+    otherwise every chunk is committed on its own and a failure keeps the
+    chunks before it. on_chunk(db, parsed, inserted) is called after every
+    chunk, before its commit.
+    """
+    started = time.perf_counter()
+    default_suite = db.query(TestSuite).filter(TestSuite.name == DEFAULT_SUITE_NAME).first()
+    project_id = default_suite.project_id if default_suite else None
+    suites = {DEFAULT_SUITE_NAME: default_suite.id} if default_suite else {}
+    created_suites = []
+    touched = set()
+    inserted = 0
+    committed = 0
+    parsed = 0
+    skipped = 0
+
+    if isinstance(rows, list):
+        #whole file is already in memory, resolve every suite name up front
+        _resolve_suites(db, {_suite_name(r) for r in rows}, suites, project_id, created_suites)
+
+    try:
+        for chunk in _chunks(rows, chunk_size):
+            parsed += len(chunk)
+            _resolve_suites(db, {_suite_name(r) for r in chunk}, suites, project_id, created_suites)
+            values = []
+            for r in chunk:
+                title = clean_cell(r.get("title"))
+                if title in (None, ""):
+                    skipped += 1
+                    continue
+                values.append({
+                    "suite_id": suites[_suite_name(r)],
+                    "title": str(title),
+                    "description": clean_cell(r.get("description")) or "",
+                    "priority": clean_cell(r.get("priority")) or "",
+                    "steps": normalize_steps(r.get("steps")),
+                })
+            if values:
+                db.execute(insert(TestCase), values)
+                for suite_id, n in Counter(v["suite_id"] for v in values).items():
+                    bump_suite_counter(db, suite_id, None, n)
+                inserted += len(values)
+                touched.update(v["suite_id"] for v in values)
+            if on_chunk:
+                on_chunk(db, parsed, inserted)
+            if not atomic:
+                db.commit()
+                committed = inserted
+                invalidate_suites({v["suite_id"] for v in values}, listing=bool(created_suites))
+                publish_reload({v["suite_id"] for v in values}, "cases imported")
+        db.commit()
+        invalidate_suites(touched, listing=bool(created_suites))
+        if atomic:
+            publish_reload(touched, "cases imported")
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise ImportFailed(f"Import failed after {committed} committed row(s): {e}", committed) from e
+    except Exception:
+        #rows come from a lazy parser, a bad row surfaces here mid import
+        db.rollback()
+        raise
+
+    seconds = time.perf_counter() - started
+    rows_per_sec = round(inserted / seconds, 1) if seconds > 0 else None
+    logger.info("imported %s test case(s) in %.2fs (%s rows/sec)", inserted, seconds, rows_per_sec)
+    return {
+        "parsed": parsed,
+        "inserted": inserted,
+        "skipped": skipped,
+        "suites_created": created_suites,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": rows_per_sec,
+    }
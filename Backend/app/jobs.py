@@ -0,0 +1,223 @@
+"""
+Background jobs: imports and batched deletes.
+
+An upload with background=true is copied to a temp file and handed to a single
+worker thread (one writer at a time suits SQLite). Deletes with background=true
+go to the same thread and remove cases in DELETE_BATCH_SIZE batches. Job state is stored in the
+import_jobs table; while a job runs its live counters are also kept in memory,
+because an atomic import only commits at the end and other connections can't
+see its progress before that. With several worker processes every worker has
+its own job thread, and a status request answered by another worker only sees
+what the job has committed so far.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from . import config
+from .db import SessionLocal
+from .models import ImportJob, TestSuite
+from .crud import delete_cases_in_batches, delete_suite_crud, delete_project_crud
+from .importer import import_testcases, ImportFailed
+from .utils import iter_testcase_rows
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import-job")
+_live = {}  # job id -> dict of counters for jobs running in this process
+_live_lock = threading.Lock()
+_queued = {}  # job id -> (future, temp file or None) for jobs submitted by this process
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _job_dict(job: ImportJob):
+    return {
+        "id": job.id,
+        "kind": job.kind or "import",
+        "filename": job.filename,
+        "status": job.status,
+        "rows_parsed": job.rows_parsed,
+        "rows_inserted": job.rows_inserted,
+        "rows_per_sec": job.rows_per_sec,
+        "rows_deleted": job.rows_deleted or 0,
+        "errors": job.errors or [],
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+def submit_import(upload_file, filename: str, chunk_size: int, atomic: bool):
+    """Spool the upload to disk, queue the import and return the new job id."""
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(filename)[1])
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(upload_file, out, 1024 * 1024)
+    job_id = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        db.add(ImportJob(id=job_id, kind="import", filename=filename, status="queued",
+                         rows_parsed=0, rows_inserted=0))
+        db.commit()
+    finally:
+        db.close()
+    _submit(job_id, path, _run_import, job_id, path, filename, chunk_size, atomic)
+    return job_id
+
+def _submit(job_id: str, path: str | None, fn, *args):
+    future = _executor.submit(fn, *args)
+    with _live_lock:
+        _queued[job_id] = (future, path)
+    future.add_done_callback(lambda _: _forget(job_id))
+
+def _forget(job_id: str):
+    with _live_lock:
+        _queued.pop(job_id, None)
+
+def _run_import(job_id: str, path: str, filename: str, chunk_size: int, atomic: bool):
+    db = SessionLocal()
+    started = time.perf_counter()
+    live = {"status": "running", "rows_parsed": 0, "rows_inserted": 0, "rows_per_sec": None, "errors": []}
+    with _live_lock:
+        _live[job_id] = live
+    job = db.get(ImportJob, job_id)
+    job.status = "running"
+    job.started_at = _now()
+    db.commit()
+
+    def on_chunk(session, parsed, inserted):
+        elapsed = time.perf_counter() - started
+        live.update(rows_parsed=parsed, rows_inserted=inserted,
+                    rows_per_sec=round(inserted / elapsed, 1) if elapsed > 0 else None)
+        #written in the import's own transaction, so it is visible once the chunk commits
+        job.rows_parsed = parsed
+        job.rows_inserted = inserted
+        job.rows_per_sec = live["rows_per_sec"]
+
+    try:
+        with open(path, "rb") as f:
+            result = import_testcases(db, iter_testcase_rows(f, filename),
+                                      chunk_size=chunk_size, atomic=atomic, on_chunk=on_chunk)
+        job = db.get(ImportJob, job_id)
+        job.status = "done"
+        job.rows_parsed = result["parsed"]
+        job.rows_inserted = result["inserted"]
+        job.rows_per_sec = result["rows_per_sec"]
+        if result["skipped"]:
+            job.errors = [f"{result['skipped']} row(s) without a title were skipped"]
+    except Exception as e:
+        logger.exception("import job %s failed", job_id)
+        db.rollback()
+        job = db.get(ImportJob, job_id)
+        job.status = "failed"
+        job.rows_parsed = live["rows_parsed"]
+        job.rows_inserted = e.inserted if isinstance(e, ImportFailed) else 0
+        job.rows_per_sec = live["rows_per_sec"]
+        job.errors = [str(e)]
+    finally:
+        job.finished_at = _now()
+        db.commit()
+        db.close()
+        with _live_lock:
+            _live.pop(job_id, None)
+        os.remove(path)
+
+DELETE_KINDS = ("delete_cases", "delete_suite", "delete_project")
+
+def submit_delete(kind: str, target_id: int):
+    """Queue a batched delete of a suite's cases, a suite or a project; returns the job id."""
+    if kind not in DELETE_KINDS:
+        raise ValueError(f"kind must be one of {DELETE_KINDS}")
+    job_id = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        db.add(ImportJob(id=job_id, kind=kind, filename=f"{kind.split('_')[1]} {target_id}",
+                         status="queued", rows_parsed=0, rows_inserted=0, rows_deleted=0))
+        db.commit()
+    finally:
+        db.close()
+    _submit(job_id, None, _run_delete, job_id, kind, target_id)
+    return job_id
+
+def _run_delete(job_id: str, kind: str, target_id: int):
+    db = SessionLocal()
+    live = {"status": "running", "rows_deleted": 0}
+    with _live_lock:
+        _live[job_id] = live
+    job = db.get(ImportJob, job_id)
+    job.status = "running"
+    job.started_at = _now()
+    db.commit()
+
+    def on_batch(deleted):
+        live["rows_deleted"] = deleted
+        #own short transaction, the batch before it is already committed
+        db.get(ImportJob, job_id).rows_deleted = deleted
+        db.commit()
+
+    try:
+        if kind == "delete_project":
+            suite_ids = db.query(TestSuite.id).filter(TestSuite.project_id == target_id).all()
+            suite_ids = [sid for (sid,) in suite_ids]
+        else:
+            suite_ids = [target_id]
+        deleted = delete_cases_in_batches(db, suite_ids, config.DELETE_BATCH_SIZE, on_batch)
+        #what is left is small, remove it in one go
+        if kind == "delete_suite":
+            delete_suite_crud(db, target_id)
+        elif kind == "delete_project":
+            delete_project_crud(db, target_id)
+        job = db.get(ImportJob, job_id)
+        job.status = "done"
+        job.rows_deleted = deleted
+    except Exception as e:
+        logger.exception("delete job %s failed", job_id)
+        db.rollback()
+        job = db.get(ImportJob, job_id)
+        job.status = "failed"
+        job.rows_deleted = live["rows_deleted"]
+        job.errors = [str(e)]
+    finally:
+        job.finished_at = _now()
+        db.commit()
+        db.close()
+        with _live_lock:
+            _live.pop(job_id, None)
+
+def get_job(db, job_id: str):
+    job = db.get(ImportJob, job_id)
+    if not job:
+        return None
+    data = _job_dict(job)
+    with _live_lock:
+        live = dict(_live.get(job_id) or {})
+    data.update(live)
+    return data
+
+def shutdown_jobs():
+    """
+    Stop taking jobs. Queued jobs that never started are cancelled and marked failed
+    (they would stay "queued" forever otherwise), their spooled uploads removed.
+    """
+    with _live_lock:
+        queued = dict(_queued)
+    _executor.shutdown(wait=False, cancel_futures=True)
+    cancelled = {job_id: path for job_id, (future, path) in queued.items() if future.cancelled()}
+    if not cancelled:
+        return
+    db = SessionLocal()
+    try:
+        for job in db.query(ImportJob).filter(ImportJob.id.in_(cancelled), ImportJob.status == "queued"):
+            job.status = "failed"
+            job.errors = ["cancelled: the server shut down before the job started"]
+            job.finished_at = _now()
+        db.commit()
+    finally:
+        db.close()
+    for path in cancelled.values():
+        if path:
+            os.remove(path)
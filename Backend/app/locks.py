@@ -0,0 +1,87 @@
+"""
+Cross-process locks for running the backend with several worker processes.
+
+Every worker runs the FastAPI lifespan, so the startup work (schema upgrade,
+search index, backfills, seeding) is wrapped in startup_lock() and only one
+worker does it at a time; the others wait, then find nothing left to do.
+try_lock() is the non-blocking form, used where only one worker should act at
+all (the retention scheduler).
+
+SQLite: an flock on a file next to the database. Postgres: a session advisory
+lock on a dedicated connection. Anything else (and in-memory SQLite, which
+can't be shared between processes anyway) gets no lock.
+"""
+import contextlib
+import logging
+import os
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows, a single process there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+def _lock_path(engine, name: str):
+    database = engine.url.database
+    if not database or database == ":memory:":
+        return None
+    return f"{os.path.abspath(database)}.{name}.lock"
+
+def _advisory_key(name: str):
+    #pg advisory locks take a bigint, keep it stable across processes
+    return zlib.crc32(f"test-management:{name}".encode())
+
+@contextlib.contextmanager
+def _file_lock(path: str, blocking: bool):
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+@contextlib.contextmanager
+def _advisory_lock(engine, name: str, blocking: bool):
+    key = _advisory_key(name)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if blocking:
+            conn.exec_driver_sql(f"SELECT pg_advisory_lock({key})")
+            acquired = True
+        else:
+            acquired = conn.exec_driver_sql(f"SELECT pg_try_advisory_lock({key})").scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.exec_driver_sql(f"SELECT pg_advisory_unlock({key})")
+
+@contextlib.contextmanager
+def _named_lock(engine, name: str, blocking: bool):
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        with _advisory_lock(engine, name, blocking) as acquired:
+            yield acquired
+        return
+    path = _lock_path(engine, name) if dialect == "sqlite" else None
+    if path is None or fcntl is None:
+        yield True
+        return
+    with _file_lock(path, blocking) as acquired:
+        yield acquired
+
+@contextlib.contextmanager
+def startup_lock(engine):
+    """Held while a worker runs the startup work; blocks until it is free."""
+    with _named_lock(engine, "startup", blocking=True):
+        logger.debug("startup lock acquired by pid %s", os.getpid())
+        yield
+
+def try_lock(engine, name: str):
+    """Context manager yielding True when this process got the lock, False when another one holds it."""
+    return _named_lock(engine, name, blocking=False)
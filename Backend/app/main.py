@@ -1,203 +1,449 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Depends, Request
+from sqlalchemy.orm import Session
 import httpx
-from .utils import parse_testcase_excel
+from .utils import iter_testcase_rows, SUPPORTED_UPLOADS, parse_datetime, parse_results_csv, parse_junit_xml
 from contextlib import asynccontextmanager
 from sqlalchemy.exc import SQLAlchemyError
 from .db import *
 from .models import *
 from .crud import *
-from fastapi.responses import JSONResponse
-from typing import Dict
+from .schema import run_migrations
+from .importer import import_testcases, ImportFailed, DEFAULT_CHUNK_SIZE
+from .jobs import submit_import, submit_delete, get_job, shutdown_jobs
+from .retention import start_retention_scheduler, stop_retention_scheduler
+from .locks import startup_lock
+from .search import ensure_search_index, search_cases
+from .runs import (create_run, list_runs, get_run_summary, get_run_cases_page, record_run_results,
+                   close_run, compare_runs, RunClosed)
+from .analytics import status_transitions, flaky_cases
+from .export import iter_suite_ndjson, iter_suite_csv
+from .cache import cache, cached_json, invalidate_suites
+from .events import bus
+from .metrics import MetricsMiddleware, instrument_engine, registry
+import asyncio
+import json
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from datetime import datetime, timedelta, timezone
+from . import config
+import logging
+
+logging.basicConfig(level=config.LOG_LEVEL, format="%(levelname)s:     %(name)s - %(message)s")
+from typing import Dict, List
 
 
 @asynccontextmanager
 async def lifespan(app:FastAPI): #this code will get execute once server has started, basically on the startup
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        default_project = db.query(Project).filter(Project.name == "SAMS").first()
-        if not default_project:
-            p = Project(name="SAMS")
-            db.add(p)
-            db.commit()
-            db.refresh(p)
-            default_suite = TestSuite(project_id=p.id, name="Default Suite")
-            db.add(default_suite)
-            db.commit()
-    finally:
-        db.close()
+    log_engine_report()
+    #every worker process runs this; one at a time, the later ones find it all done
+    with startup_lock(engine):
+        run_migrations(engine)
+        ensure_search_index(engine)
+        db = SessionLocal()
+        try:
+            default_project = db.query(Project).filter(Project.name == "SAMS").first()
+            if not default_project:
+                p = Project(name="SAMS")
+                db.add(p)
+                db.flush()
+                default_suite = TestSuite(project_id=p.id, name="Default Suite")
+                db.add(default_suite)
+                db.commit() #project and suite together, never one without the other
+        finally:
+            db.close()
+    start_retention_scheduler()
     yield
+    stop_retention_scheduler()
+    shutdown_jobs()
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
+@app.get("/metrics")
+def metrics():
+    cache_gauges = {f"cache_{k}": v for k, v in cache.stats().items()}
+    return PlainTextResponse(registry.render(cache_gauges), media_type="text/plain; version=0.0.4")
 
 @app.post("/api/testcases/upload")
-async def upload_testcases(file: UploadFile = File(...)): #this means file is required and file must be included in the request body
-    if not file.filename.endswith((".xlsx",".xls")):
-        raise HTTPException(status_code=400, detail="Only Excel files supported")
-    content = await file.read() #Reads the entire excel into memory, content is now b"...excel bytes...
+def upload_testcases(file: UploadFile = File(...),
+                     chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=50000),
+                     atomic: bool = True,
+                     background: bool = False,
+                     db: Session = Depends(get_db)): #this means file is required and file must be included in the request body
+    if not file.filename.lower().endswith(SUPPORTED_UPLOADS):
+        raise HTTPException(status_code=400, detail="Only Excel or CSV files supported")
+    if background:
+        #return straight away, progress is polled on /api/import-jobs/{job_id}
+        job_id = submit_import(file.file, file.filename, chunk_size, atomic)
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": "queued"})
     try:
-        parsed = parse_testcase_excel(content) #here excel gets parsed
+        #file.file is spooled to disk by starlette, rows are read from it lazily
+        rows = iter_testcase_rows(file.file, file.filename)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse Excel: {e}")
-    
-    created = [] #create an empty list
-    db = SessionLocal() #create a new db session
+
     try:
-        first_row_keys = set(parsed[0].keys())
-        print(first_row_keys)
-        if "title" in first_row_keys:
-            default_suite = db.query(TestSuite).filter(TestSuite.name == "Default Suite").first()
-            for p in parsed:
-                suitename = p.get("suite") or "Default"
-                if suitename!="Default":
-                    s = db.query(TestSuite).filter(TestSuite.name==suitename).first()
-                    if not s:
-                        s = TestSuite(project_id=default_suite.project_id, name=suitename)
-                        db.add(s)
-                        db.commit()
-                        db.refresh(s)
-                    target_suite = s
-                else:
-                    target_suite = default_suite
-                
-                tc = TestCase(
-                    suite_id=target_suite.id,
-                    title=p["title"],
-                    description=p.get("description") or "",
-                    priority=p.get("priority") or "",
-                    steps=p.get("steps") or "",
-                )
-                db.add(tc)
-                db.commit()
-                db.refresh(tc)
-                created.append({"id": tc.id, "title": tc.title, "suite": target_suite.name, "steps": tc.steps})
-        else:
-            return JSONResponse(
-        status_code=400,
-        content="Excel is not proper")
-            
-    except SQLAlchemyError as e:
-        db.rollback()
+        #atomic=True imports the whole file in one transaction, otherwise one per chunk
+        result = import_testcases(db, rows, chunk_size=chunk_size, atomic=atomic)
+    except ImportFailed as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+    except ValueError as e:
+        #bad cell data found while streaming, the transaction was rolled back
+        raise HTTPException(status_code=400, detail=f"Failed to parse Excel: {e}")
+
+    return {"message": "Test cases got uploaded successfully", **result}
 
-    return {"Test cases got uploaded successfully"}
+@app.get("/api/import-jobs/{job_id}")
+@app.get("/api/jobs/{job_id}")
+def import_job_status(job_id: str, db: Session = Depends(get_db)):
+    job = get_job(db, job_id)
+    if not job:
+        return JSONResponse(status_code=404, content="Job not found")
+    return job
 
 @app.get("/api/suites/{suite_id}/cases")
-def list_cases_for_suite(suite_id):
-    db = SessionLocal()
-    try:
-        cases = get_cases_with_latest_status(db, suite_id)
-        return {"cases": cases}
-    finally:
-        db.close()
+def list_cases_for_suite(suite_id: int, request: Request, db: Session = Depends(get_db)):
+    return cached_json(request, f"suite:{suite_id}:cases", [f"suite:{suite_id}"],
+                       lambda: {"cases": get_cases_with_latest_status(db, suite_id)})
+
+@app.get("/api/suites/{suite_id}/cases/page")
+def list_cases_page(suite_id: int,
+                    request: Request,
+                    after_id: int | None = None,
+                    limit: int = Query(100, ge=1, le=1000),
+                    fields: str | None = None,
+                    priority: list[str] | None = Query(None),
+                    status: list[str] | None = Query(None),
+                    db: Session = Depends(get_db)):
+    #fields is a comma separated list, e.g. fields=id,title,latest_status
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(DEFAULT_PAGE_FIELDS)
+    unknown = [f for f in selected if f not in CASE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    statuses = [s.upper() for s in status] if status else None
+    key = f"suite:{suite_id}:page:{after_id}:{limit}:{','.join(selected)}:{priority}:{statuses}"
+    return cached_json(request, key, [f"suite:{suite_id}"],
+                       lambda: get_cases_page(db, suite_id, after_id=after_id, limit=limit, fields=selected,
+                                              priorities=priority, statuses=statuses))
+
+@app.get("/api/suites/{suite_id}/export")
+def export_suite(suite_id: int,
+                 format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+                 executions: bool = True,
+                 since: datetime | None = None,
+                 until: datetime | None = None,
+                 db: Session = Depends(get_db)):
+    #since/until limit the exported execution history, cases are always included
+    if db.get(TestSuite, suite_id) is None:
+        return JSONResponse(status_code=404, content="Test suite not found")
+    if format == "csv":
+        body = iter_suite_csv(suite_id, executions, since, until)
+        media_type = "text/csv"
+    else:
+        body = iter_suite_ndjson(suite_id, executions, since, until)
+        media_type = "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="suite_{suite_id}.{format}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+@app.get("/api/suites/{suite_id}/events")
+def suite_events(suite_id: int, after: int | None = None):
+    #polling variant: events after seq `after`; without it only the current last_seq is returned
+    events, last_seq, reset = bus.events_since(suite_id, after)
+    return {"events": events, "last_seq": last_seq, "reset": reset}
+
+@app.get("/api/suites/{suite_id}/events/stream")
+async def suite_event_stream(suite_id: int, request: Request, after: int | None = None):
+    #server-sent events, resumes from Last-Event-ID (or after) when the client reconnects
+    last_id = request.headers.get("last-event-id")
+    after = int(last_id) if last_id and last_id.isdigit() else after
+
+    async def stream():
+        entry = bus.subscribe(suite_id)
+        try:
+            backlog, _, reset = bus.events_since(suite_id, after)
+            if reset:
+                yield "event: reload\ndata: {\"type\": \"reload\", \"reason\": \"missed events\"}\n\n"
+            sent = after or 0
+            for event in backlog:
+                sent = event["seq"]
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(entry[1].get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["seq"] <= sent:
+                    continue  # already sent from the backlog
+                sent = event["seq"]
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            bus.unsubscribe(suite_id, entry)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/search/cases")
+def search_test_cases(q: str = Query(..., min_length=1), suite_id: int | None = None, project_id: int | None = None,
+                      limit: int = Query(20, ge=1, le=200), offset: int = Query(0, ge=0, le=10000),
+                      db: Session = Depends(get_db)):
+    #every word is matched as a prefix, best match first; pass next_offset back as offset for the next page
+    return search_cases(db, q, suite_id=suite_id, project_id=project_id, limit=limit, offset=offset)
 
 @app.get("/api/cases/{case_id}")
-def case_detail(case_id):
-    db = SessionLocal()
-    try:
-        detail = get_case_detail_with_executions(db, case_id)
-        if not detail:
-            return JSONResponse (status_code=404,
-            content="Test case not found")
-        return detail
-    finally:
-        db.close()
+def case_detail(case_id: int, limit: int = Query(HISTORY_LIMIT, ge=1, le=1000),
+                before: datetime | None = None, before_id: int | None = None,
+                after: datetime | None = None, after_id: int | None = None,
+                db: Session = Depends(get_db)):
+    #executions come one page at a time, pass next_before back as before/before_id for older ones
+    detail = get_case_detail_with_executions(db, case_id, limit, before=before, before_id=before_id,
+                                             after=after, after_id=after_id)
+    if not detail:
+        return JSONResponse (status_code=404,
+        content="Test case not found")
+    return detail
+
+@app.get("/api/cases/{case_id}/executions/daily")
+def case_execution_trend(case_id: int, since: datetime | None = None, until: datetime | None = None,
+                         days: int = Query(90, ge=1, le=3650), db: Session = Depends(get_db)):
+    #per day/status counts for a trend chart, defaults to the last `days` days
+    if since is None:
+        since = (until or datetime.now(timezone.utc)) - timedelta(days=days)
+    if not db.get(TestCase, case_id):
+        return JSONResponse(status_code=404, content="Test case not found")
+    return {"case_id": case_id, "since": since.isoformat(), "until": until.isoformat() if until else None,
+            "days": get_execution_daily_counts(db, case_id, since, until)}
 
 @app.post("/api/execute/{case_id}")
-def execute_case(case_id, status: str, comment: str|None = None, retry: bool = False, suite_id: int|None = None):
+def execute_case(case_id: int, status: str, comment: str|None = None, retry: bool = False, suite_id: int|None = None, db: Session = Depends(get_db)):
     status = status.upper()
-    if status not in ("PASS", "FAIL", "BLOCKER", "IN PROGRESS"):
+    if status not in EXECUTION_STATUSES:
         return {"Invalid Status"}
-    db = SessionLocal()
+    if insert_execution(db, case_id, status, comment) is None:
+        return JSONResponse(status_code=404, content="Test case not found")
+    if retry:
+        tc = db.query(TestCase).get(case_id)
+        if not tc:
+            return JSONResponse(status_code=404, content="Test case not found")
+        return {"next": {"id": tc.id, "title": tc.title, "description": tc.description, "steps": tc.steps}}
+    if suite_id:
+        #not using this feature as of now 
+        tc = get_next_case_in_suite(db, suite_id, after_case_id=case_id)
+        if not tc:
+            return {"next": None}
+        return {"next": {"id": tc.id, "title": tc.title, "description": tc.description, "steps": tc.steps}}
+    return {"next": None}
+
+@app.post("/api/executions/batch")
+def execute_batch(records: List[Dict], db: Session = Depends(get_db)):
+    #records: [{"case_id": 1, "status": "PASS", "comment": "...", "executed_at": "2024-05-01T10:00:00"}, ...]
+    parsed = []
+    for r in records:
+        try:
+            parsed.append({**r, "executed_at": parse_datetime(r.get("executed_at"))})
+        except ValueError as e:
+            parsed.append({"case_id": r.get("case_id"), "error": f"Bad executed_at: {e}"})
     try:
-        insert_execution(db, case_id, status, comment)
-        if retry:
-            tc = db.query(TestCase).get(case_id)
-            if not tc:
-                raise JSONResponse(status_code=404, content="Test case not found")
-            return {"next": {"id": tc.id, "title": tc.title, "description": tc.description, "steps": tc.steps}}
-        if suite_id:
-            #not using this feature as of now 
-            tc = get_next_case_in_suite(db, suite_id, after_case_id=case_id)
-            if not tc:
-                return {"next": None}
-            return {"next": {"id": tc.id, "title": tc.title, "description": tc.description, "steps": tc.steps}}
-        return {"next": None}
-    finally:
-        db.close()
+        results = record_executions(db, parsed)
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"recorded": sum(r["ok"] for r in results), "failed": sum(not r["ok"] for r in results),
+            "results": results}
 
-@app.get("/api/suites/{suite_id}/summary")
-def suite_summary(suite_id: int):
-    db = SessionLocal()
+@app.post("/api/executions/upload")
+def execute_upload(file: UploadFile = File(...), suite_id: int | None = None, db: Session = Depends(get_db)):
+    #CSV (case_id,status,comment,executed_at) or JUnit XML; JUnit tests are matched to cases by title in suite_id
+    name = file.filename.lower()
+    try:
+        if name.endswith(".csv"):
+            records = parse_results_csv(file.file)
+        elif name.endswith(".xml"):
+            records = parse_junit_xml(file.file)
+        else:
+            raise HTTPException(status_code=400, detail="Only CSV or JUnit XML result files supported")
+    except (ValueError, SyntaxError) as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse results: {e}")
+    unresolved = [r for r in records if r.get("case_id") is None and r.get("title")]
+    if unresolved:
+        if suite_id is None:
+            raise HTTPException(status_code=400, detail="suite_id is needed to match JUnit tests by name")
+        ids = case_ids_by_title(db, suite_id, [r["title"] for r in unresolved])
+        for r in unresolved:
+            r["case_id"] = ids.get(r["title"])
+    try:
+        results = record_executions(db, records)
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"recorded": sum(r["ok"] for r in results), "failed": sum(not r["ok"] for r in results),
+            "results": results}
+
+@app.post("/api/suites/{suite_id}/runs")
+def start_run(suite_id: int, name: str | None = None, environment: str | None = None,
+              executed_by: str | None = None, db: Session = Depends(get_db)):
+    #snapshots the suite's current cases into the run
+    run = create_run(db, suite_id, name, environment, executed_by)
+    if run is None:
+        return JSONResponse(status_code=404, content="Test suite not found")
+    return run
+
+@app.get("/api/suites/{suite_id}/runs")
+def suite_runs(suite_id: int, before_id: int | None = None, limit: int = Query(20, ge=1, le=200),
+               db: Session = Depends(get_db)):
+    return list_runs(db, suite_id, before_id, limit)
+
+@app.get("/api/runs/compare")
+def runs_compare(base: int, head: int, limit: int = Query(200, ge=1, le=5000), db: Session = Depends(get_db)):
+    out = compare_runs(db, base, head, limit)
+    if out is None:
+        return JSONResponse(status_code=404, content="Test run not found")
+    return out
+
+@app.get("/api/runs/{run_id}")
+def run_summary(run_id: int, db: Session = Depends(get_db)):
+    run = get_run_summary(db, run_id)
+    if run is None:
+        return JSONResponse(status_code=404, content="Test run not found")
+    return run
+
+@app.get("/api/runs/{run_id}/cases")
+def run_cases(run_id: int, after_id: int | None = None, limit: int = Query(100, ge=1, le=1000),
+              status: str | None = None, db: Session = Depends(get_db)):
+    if not db.get(TestRun, run_id):
+        return JSONResponse(status_code=404, content="Test run not found")
+    return get_run_cases_page(db, run_id, after_id, limit, status)
+
+@app.post("/api/runs/{run_id}/results")
+def run_results(run_id: int, records: List[Dict], db: Session = Depends(get_db)):
+    #same records as /api/executions/batch, the cases must be in the run
+    parsed = []
+    for r in records:
+        try:
+            parsed.append({**r, "executed_at": parse_datetime(r.get("executed_at"))})
+        except ValueError as e:
+            parsed.append({"case_id": r.get("case_id"), "error": f"Bad executed_at: {e}"})
     try:
-        summary = compute_suite_summary_using_latest(db, suite_id)
-        return summary
-    finally:
-        db.close()
+        results = record_run_results(db, run_id, parsed)
+    except RunClosed as e:
+        return JSONResponse(status_code=409, content=str(e))
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    if results is None:
+        return JSONResponse(status_code=404, content="Test run not found")
+    return {"recorded": sum(r["ok"] for r in results), "failed": sum(not r["ok"] for r in results),
+            "results": results}
+
+@app.post("/api/runs/{run_id}/close")
+def run_close(run_id: int, db: Session = Depends(get_db)):
+    run = close_run(db, run_id)
+    if run is None:
+        return JSONResponse(status_code=404, content="Test run not found")
+    return run
+
+@app.get("/api/suites/{suite_id}/analytics/transitions")
+def suite_transitions(suite_id: int, since: datetime | None = None, until: datetime | None = None,
+                      days: int = Query(1, ge=1, le=3650), base_run: int | None = None,
+                      head_run: int | None = None, limit: int = Query(500, ge=1, le=20000),
+                      db: Session = Depends(get_db)):
+    #status at since (default: `days` before until) vs until (default: now), or between two runs
+    if not db.get(TestSuite, suite_id):
+        return JSONResponse(status_code=404, content="Test suite not found")
+    if base_run is not None or head_run is not None:
+        if base_run is None or head_run is None:
+            raise HTTPException(status_code=400, detail="Pass both base_run and head_run")
+        out = compare_runs(db, base_run, head_run, limit)
+        if out is None:
+            return JSONResponse(status_code=404, content="Test run not found")
+        return out
+    if since is None:
+        since = (until or datetime.now(timezone.utc)) - timedelta(days=days)
+    return status_transitions(db, suite_id, since, until, limit)
+
+@app.get("/api/suites/{suite_id}/analytics/flaky")
+def suite_flaky_cases(suite_id: int, window: int = Query(20, ge=2, le=500),
+                      min_executions: int = Query(3, ge=2), limit: int = Query(100, ge=1, le=20000),
+                      db: Session = Depends(get_db)):
+    #flips between passing and not passing over each case's last `window` executions
+    if not db.get(TestSuite, suite_id):
+        return JSONResponse(status_code=404, content="Test suite not found")
+    return flaky_cases(db, suite_id, window, min_executions, limit)
+
+@app.get("/api/suites/{suite_id}/summary")
+def suite_summary(suite_id: int, request: Request, db: Session = Depends(get_db)):
+    return cached_json(request, f"suite:{suite_id}:summary", [f"suite:{suite_id}"],
+                       lambda: compute_suite_summary_using_latest(db, suite_id))
+
+@app.get("/api/summary")
+def summary_rollup(request: Request, project_id: int | None = None, suite_id: list[int] | None = Query(None),
+                   db: Session = Depends(get_db)):
+    #one call for dashboards instead of one /summary request per suite
+    return cached_json(request, f"rollup:{project_id}:{suite_id}", ["summaries"],
+                       lambda: compute_summary_rollup(db, project_id=project_id, suite_ids=suite_id))
+
+@app.get("/api/projects/{project_id}/summary")
+def project_summary(project_id: int, request: Request, db: Session = Depends(get_db)):
+    return cached_json(request, f"rollup:{project_id}:None", ["summaries"],
+                       lambda: compute_summary_rollup(db, project_id=project_id))
 
 @app.delete("/api/suites/{suite_id}/cases")
-def delete_testcases(suite_id:int):
-    db = SessionLocal()
-    try:
-        delete_tc = delete_all_test_cases_from_suite(db,suite_id)
-        return delete_tc
-    finally:
-        db.close()
+def delete_testcases(suite_id:int, background: bool = False, db: Session = Depends(get_db)):
+    if background:
+        #batched, progress on /api/jobs/{job_id}
+        return JSONResponse(status_code=202, content={"job_id": submit_delete("delete_cases", suite_id), "status": "queued"})
+    delete_tc = delete_all_test_cases_from_suite(db,suite_id)
+    return delete_tc
 
 @app.get("/api/suites")
-def get_all_suites():
-    db = SessionLocal()
-    try:
-        data_suites = get_all_suites_details(db)
-        return data_suites
-    finally:
-        db.close()
+def get_all_suites(request: Request, db: Session = Depends(get_db)):
+    return cached_json(request, "suites", ["suites"], lambda: get_all_suites_details(db))
 
 @app.delete("/api/suites/{suite_id}")
-def delete_suite(suite_id:int):
-    db = SessionLocal()
-    try:
-        del_suite = delete_suite_crud(db, suite_id)
-        return del_suite
-    finally:
-        db.close()
+def delete_suite(suite_id:int, background: bool = False, db: Session = Depends(get_db)):
+    if not db.get(TestSuite, suite_id):
+        return JSONResponse(status_code=404, content="Test suite not found")
+    if background:
+        return JSONResponse(status_code=202, content={"job_id": submit_delete("delete_suite", suite_id), "status": "queued"})
+    del_suite = delete_suite_crud(db, suite_id)
+    return del_suite
+
+@app.delete("/api/projects/{project_id}")
+def delete_project(project_id: int, background: bool = False, db: Session = Depends(get_db)):
+    if not db.get(Project, project_id):
+        return JSONResponse(status_code=404, content="Project not found")
+    if background:
+        return JSONResponse(status_code=202, content={"job_id": submit_delete("delete_project", project_id), "status": "queued"})
+    return delete_project_crud(db, project_id)
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    return cache.stats()
 
 @app.post("/api/testcases/single/")
-def add_single_tc(item: Dict):
-    db = SessionLocal()
+def add_single_tc(item: Dict, db: Session = Depends(get_db)):
     try:
-        tc = TestCase(
+        create_test_case(
+                        db,
                         suite_id=item["suite_id_tc"],
                         title=item["title_tc"],
                         description=item.get("description") or "",
                         priority=item.get("priority_tc") or "",
                         steps=item.get("steps_tc") or "",
                     )
-        db.add(tc)
-        db.commit()
-        db.refresh(tc)
         return "Test case got added successfully"
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
 
 @app.get("/api/projects")
-def get_projects():
-    db = SessionLocal()
-    try:
-        data_proj = db.query(Project).order_by(Project.id).all()
-        return data_proj
-    finally:
-        db.close()
+def get_projects(request: Request, db: Session = Depends(get_db)):
+    return cached_json(request, "projects", ["projects"],
+                       lambda: db.query(Project).order_by(Project.id).all())
 
 @app.post("/api/add/suite")
-def add_suite(item_suite: Dict):
-    db = SessionLocal()
+def add_suite(item_suite: Dict, db: Session = Depends(get_db)):
     try:
         ts = TestSuite(
                         project_id = item_suite["projectid"],
@@ -205,10 +451,9 @@ def add_suite(item_suite: Dict):
                     )
         db.add(ts)
         db.commit()
+        invalidate_suites([], listing=True)
         db.refresh(ts)
         return "Test Suite got added successfully"
     except SQLAlchemyError as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Request level performance metrics, exposed in Prometheus text format on /metrics.
+
+MetricsMiddleware times every request and records request/response sizes.
+SQLAlchemy cursor events count the queries each request runs and the time spent
+in them, so an N+1 pattern shows up as a spike in db_queries_per_request.
+Requests slower than SLOW_REQUEST_MS are logged with their SQL. Streamed responses
+(the SSE event stream, exports) last as long as the client reads, so they are left
+out of the latency histogram and the slow log; their sizes and queries still count.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from . import config
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+MAX_LOGGED_STATEMENTS = 50
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "statements")
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = []
+
+_current = ContextVar("request_stats", default=None)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.total += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def lines(self, name: str, labels: str):
+        out = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.total}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum}")
+        out.append(f"{name}_count{{{labels}}} {self.total}")
+        return out
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}    # (method, route, status) -> Histogram
+        self.req_size = {}   # (method, route) -> Histogram
+        self.resp_size = {}  # (method, route) -> Histogram
+        self.queries = {}    # (method, route) -> Histogram
+        self.db_time = {}    # (method, route) -> Histogram
+        self.slow = {}       # (method, route) -> count
+
+    @staticmethod
+    def _get(table, key, buckets):
+        h = table.get(key)
+        if h is None:
+            h = table[key] = Histogram(buckets)
+        return h
+
+    def record(self, method, route, status, seconds, req_bytes, resp_bytes, stats: RequestStats, slow: bool,
+               streamed: bool = False):
+        key = (method, route)
+        with self._lock:
+            if not streamed:
+                self._get(self.latency, (method, route, status), LATENCY_BUCKETS).observe(seconds)
+            self._get(self.req_size, key, SIZE_BUCKETS).observe(req_bytes)
+            self._get(self.resp_size, key, SIZE_BUCKETS).observe(resp_bytes)
+            self._get(self.queries, key, QUERY_BUCKETS).observe(stats.queries)
+            self._get(self.db_time, key, LATENCY_BUCKETS).observe(stats.db_time)
+            if slow:
+                self.slow[key] = self.slow.get(key, 0) + 1
+
+    def render(self, extra_gauges: dict | None = None):
+        def labels(key):
+            names = ("method", "route", "status")
+            return ",".join(f'{n}="{v}"' for n, v in zip(names, key))
+        out = []
+        with self._lock:
+            for name, help_text, table in (
+                ("http_request_duration_seconds", "Request latency", self.latency),
+                ("http_request_size_bytes", "Request body size", self.req_size),
+                ("http_response_size_bytes", "Response body size", self.resp_size),
+                ("db_queries_per_request", "SQL statements run per request", self.queries),
+                ("db_time_per_request_seconds", "Time spent in SQL per request", self.db_time),
+            ):
+                out.append(f"# HELP {name} {help_text}")
+                out.append(f"# TYPE {name} histogram")
+                for key, h in sorted(table.items()):
+                    out.extend(h.lines(name, labels(key)))
+            out.append("# HELP http_slow_requests_total Requests over the slow request threshold")
+            out.append("# TYPE http_slow_requests_total counter")
+            for key, n in sorted(self.slow.items()):
+                out.append(f"http_slow_requests_total{{{labels(key)}}} {n}")
+        for name, value in (extra_gauges or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                out.append(f"# TYPE {name} gauge")
+                out.append(f"{name} {value}")
+        return "\n".join(out) + "\n"
+
+registry = Registry()
+
+def instrument_engine(engine):
+    """Count statements and their time for the request running them (if any)."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current.get()
+        if stats is None:
+            return
+        stats.queries += 1
+        stats.db_time += elapsed
+        if len(stats.statements) < MAX_LOGGED_STATEMENTS:
+            stats.statements.append((elapsed, statement))
+
+class MetricsMiddleware:
+    """Plain ASGI middleware, so streaming responses are measured up to their last byte."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        sizes = {"request": 0, "response": 0}
+        status = {"code": 500, "streamed": False}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+                #a plain response sends its body in one message, a StreamingResponse in several
+                status["streamed"] |= message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            _current.reset(token)
+            seconds = time.perf_counter() - started
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            slow = seconds * 1000 >= config.SLOW_REQUEST_MS and not status["streamed"]
+            registry.record(scope["method"], route_path, status["code"], seconds,
+                            sizes["request"], sizes["response"], stats, slow, status["streamed"])
+            if slow:
+                sql = "\n".join(f"  [{t * 1000:.1f} ms] {s}" for t, s in stats.statements)
+                logger.warning("slow request %s %s took %.0f ms, %s queries (%.0f ms in db)\n%s",
+                               scope["method"], scope["path"], seconds * 1000, stats.queries,
+                               stats.db_time * 1000, sql)
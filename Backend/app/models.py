@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, func, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, JSON, func, Text, Index, PrimaryKeyConstraint, Float
+from sqlalchemy.orm import relationship, deferred
 from .db import Base
 from datetime import datetime
 
@@ -7,7 +7,7 @@ class Project(Base):
     __tablename__ = "projects"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
-    suites = relationship("TestSuite", back_populates="project", cascade="all, delete-orphan") #If a TestSuite no longer belongs to any Project → delete it automatically.
+    suites = relationship("TestSuite", back_populates="project", cascade="all, delete-orphan", passive_deletes=True) #If a TestSuite no longer belongs to any Project → delete it automatically.
 
 class TestSuite(Base):
     __tablename__ = "test_suites"
@@ -15,7 +15,13 @@ class TestSuite(Base):
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
     name = Column(String, nullable=False)
     project = relationship("Project", back_populates="suites")
-    cases = relationship("TestCase", back_populates="suite", cascade="all, delete-orphan")
+    #passive_deletes: rows below a deleted suite go with the ON DELETE CASCADE, not one by one through the ORM
+    cases = relationship("TestCase", back_populates="suite", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_test_suites_name", "name"),
+        Index("ix_test_suites_project_id", "project_id"),
+    )
 
 class TestCase(Base):
     __tablename__ = "test_cases"
@@ -24,28 +30,88 @@ class TestCase(Base):
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     priority = Column(String, nullable=True)
-    steps = Column(String, nullable=True, default=[])  # list of dicts
+    #[{"no": 1, "action": "...", "expected": "..."}], see utils.normalize_steps; deferred so
+    #listings never load step bodies, touching tc.steps loads it on demand
+    steps = deferred(Column(JSON, nullable=True, default=list))
+    #denormalized copy of the newest test_executions row, kept in sync by crud.insert_execution
+    latest_execution_id = Column(Integer, nullable=True)
+    latest_status = Column(String, nullable=True)
+    latest_comment = Column(Text, nullable=True)
+    latest_executed_at = Column(DateTime, nullable=True)
     suite = relationship("TestSuite", back_populates="cases")
-'''
+
+    __table_args__ = (
+        #keyset pages of a suite walk this index in id order
+        Index("ix_test_cases_suite_id", "suite_id", "id"),
+        Index("ix_test_cases_suite_latest_status", "suite_id", "latest_status"),
+    )
+
+class SuiteStatusCount(Base):
+    """
+    Number of cases per latest status in a suite ("NOT STARTED" for cases never executed).
+    Adjusted by the write paths in crud so the suite summary never counts rows.
+    """
+    __tablename__ = "suite_status_counts"
+    suite_id = Column(Integer, ForeignKey("test_suites.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("suite_id", "status"),
+    )
 class TestRun(Base):
+    """
+    One execution pass over a suite. Creating it snapshots the suite's cases into
+    test_run_cases, results recorded against the run update those rows, and
+    test_run_status_counts keeps the per-run totals (see app/runs.py).
+    status: open / closed
+    """
     __tablename__ = "test_runs"
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
-    suite_id = Column(Integer, ForeignKey("test_suites.id"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    suite_id = Column(Integer, ForeignKey("test_suites.id", ondelete="CASCADE"), nullable=True)
+    name = Column(String, nullable=True)
     environment = Column(String, nullable=True)
     executed_by = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="open")
     started_at = Column(DateTime, server_default=func.now())
     finished_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_test_runs_suite_id", "suite_id", "id"),
+        Index("ix_test_runs_project_id", "project_id"),
+    )
+
 class TestRunCase(Base):
+    """A case as it was when the run was created, with its result in that run (status None: not run yet)."""
     __tablename__ = "test_run_cases"
     id = Column(Integer, primary_key=True, index=True)
     run_id = Column(Integer, ForeignKey("test_runs.id", ondelete="CASCADE"), nullable=False)
-    test_case_id = Column(Integer, ForeignKey("test_cases.id"), nullable=False)
-    status = Column(String, nullable=False)  # PASSED / FAILED / SKIPPED
+    #kept (as NULL) when the case is deleted later, the snapshot still shows title and result
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="SET NULL"), nullable=True)
+    title = Column(String, nullable=False)
+    priority = Column(String, nullable=True)
+    status = Column(String, nullable=True)  # PASS / FAIL / BLOCKER / IN PROGRESS
     comment = Column(Text, nullable=True)
-    executed_at = Column(DateTime, server_default=func.now())
-    '''
+    execution_id = Column(Integer, nullable=True)
+    executed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_test_run_cases_run_case", "run_id", "test_case_id", unique=True),
+        Index("ix_test_run_cases_case_id", "test_case_id"),
+    )
+
+class TestRunStatusCount(Base):
+    """Number of run cases per status in a run, like suite_status_counts for suites."""
+    __tablename__ = "test_run_status_counts"
+    run_id = Column(Integer, ForeignKey("test_runs.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("run_id", "status"),
+    )
+
 class TestExecution(Base):
     """
     Flat history of every execution of a test case.
@@ -53,7 +119,51 @@ class TestExecution(Base):
     """
     __tablename__ = "test_executions"
     id = Column(Integer, primary_key=True, index=True)
-    test_case_id = Column(Integer, ForeignKey("test_cases.id"), nullable=False)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
     status = Column(String, nullable=False)   # PASSED / FAILED / SKIPPED
     comment = Column(Text, nullable=True)
-    executed_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    executed_at = Column(DateTime, server_default=func.now())
+    #set when the result was recorded against a test run
+    run_id = Column(Integer, ForeignKey("test_runs.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        #serves "latest execution per case" lookups straight from the index
+        Index("ix_test_executions_case_executed", "test_case_id", executed_at.desc()),
+        Index("ix_test_executions_executed_at", "executed_at"),
+        Index("ix_test_executions_run_id", "run_id"),
+    )
+
+class ExecutionDailyRollup(Base):
+    """
+    Executions per case, day and status for history that retention has purged
+    from test_executions (see app/retention.py).
+    """
+    __tablename__ = "execution_daily_rollups"
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    status = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("test_case_id", "day", "status"),
+    )
+
+class ImportJob(Base):
+    """
+    Background job, see app/jobs.py: the import of an uploaded file (kind "import")
+    or a batched delete ("delete_cases", "delete_suite", "delete_project").
+    status: queued / running / done / failed
+    """
+    __tablename__ = "import_jobs"
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=True, default="import")
+    filename = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="queued")
+    rows_parsed = Column(Integer, nullable=False, default=0)
+    rows_inserted = Column(Integer, nullable=False, default=0)
+    rows_deleted = Column(Integer, nullable=True, default=0)
+    rows_per_sec = Column(Float, nullable=True)
+    errors = Column(JSON, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
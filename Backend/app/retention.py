@@ -0,0 +1,283 @@
+"""
+Execution history retention.
+
+Purges old test_executions rows according to two policies, either or both:
+  keep_last  - the newest N executions of every case are kept
+  keep_days  - executions newer than N days are kept
+A row is purged only when no configured policy keeps it, and the newest
+execution of a case is never purged, so the latest_* projection and the suite
+counters stay valid.
+
+Purged rows are folded into execution_daily_rollups (count per case, day and
+status), so the daily trend keeps working, and optionally appended to a gzip
+NDJSON or Parquet archive before they are deleted. Cases are walked in id
+batches and every batch is committed on its own.
+
+Run it with `python -m app.cli retention` or on a timer with RETENTION_INTERVAL_HOURS
+(with several workers the timer runs in one of them).
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func, insert, update, delete, bindparam
+from . import config
+from .db import SessionLocal, engine
+from .locks import try_lock
+from .models import TestCase, TestExecution, ExecutionDailyRollup
+from .crud import IN_CHUNK
+
+logger = logging.getLogger(__name__)
+
+CASE_BATCH = 500      # cases ranked per window query
+ROW_BATCH = 20_000    # purged rows per transaction
+ARCHIVE_FORMATS = ("ndjson", "parquet")
+
+class _NdjsonArchive:
+    suffix = ".ndjson.gz"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = None
+
+    def write(self, rows):
+        if self._f is None:
+            self._f = gzip.open(self.path, "wt", encoding="utf-8")
+        for r in rows:
+            self._f.write(json.dumps(r) + "\n")
+        self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+
+class _ParquetArchive:
+    suffix = ".parquet"
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("Parquet archives need pyarrow (pip install pyarrow)") from e
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([("id", pyarrow.int64()), ("test_case_id", pyarrow.int64()),
+                                       ("status", pyarrow.string()), ("comment", pyarrow.string()),
+                                       ("executed_at", pyarrow.string())])
+        self.path = path
+        self._writer = None
+
+    def write(self, rows):
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(self.path, self._schema, compression="zstd")
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def _open_archive(archive_dir: str, archive_format: str):
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"archive_format must be one of {ARCHIVE_FORMATS}")
+    os.makedirs(archive_dir, exist_ok=True)
+    cls = _ParquetArchive if archive_format == "parquet" else _NdjsonArchive
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return cls(os.path.join(archive_dir, f"test_executions-{stamp}{cls.suffix}"))
+
+def database_size(db):
+    """(total_bytes, free_bytes) of the database, or (None, None) where it can't be read cheaply."""
+    conn = db.connection()
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        page_size, pages, free = (conn.exec_driver_sql(f"PRAGMA {p}").scalar()
+                                  for p in ("page_size", "page_count", "freelist_count"))
+        return pages * page_size, free * page_size
+    if dialect == "postgresql":
+        total = conn.exec_driver_sql("SELECT pg_total_relation_size('test_executions')").scalar()
+        return total, None
+    return None, None
+
+def _ranked(case_ids):
+    rn = func.row_number().over(
+        partition_by=TestExecution.test_case_id,
+        order_by=(TestExecution.executed_at.desc(), TestExecution.id.desc()),
+    ).label("rn")
+    return (select(TestExecution.id, TestExecution.test_case_id, TestExecution.status,
+                   TestExecution.comment, TestExecution.executed_at, rn)
+            .where(TestExecution.test_case_id.in_(case_ids))
+            .subquery())
+
+def _purge_condition(ranked, keep_last: int, cutoff: datetime | None):
+    #the newest execution backs the latest_* projection and is always kept
+    cond = ranked.c.rn > max(keep_last, 1)
+    if cutoff is not None:
+        cond &= ranked.c.executed_at < cutoff
+    return cond
+
+def _add_rollups(db, counts: Counter):
+    """Add counts ((case_id, day, status) -> n) to execution_daily_rollups."""
+    case_ids = list({k[0] for k in counts})
+    existing = set()
+    for i in range(0, len(case_ids), IN_CHUNK):
+        existing.update(db.execute(
+            select(ExecutionDailyRollup.test_case_id, ExecutionDailyRollup.day, ExecutionDailyRollup.status)
+            .where(ExecutionDailyRollup.test_case_id.in_(case_ids[i:i + IN_CHUNK]))
+        ).all())
+    updates = [{"c": k[0], "d": k[1], "s": k[2], "n": n} for k, n in counts.items() if k in existing]
+    inserts = [{"test_case_id": k[0], "day": k[1], "status": k[2], "count": n}
+               for k, n in counts.items() if k not in existing]
+    if updates:
+        db.execute(
+            update(ExecutionDailyRollup)
+            .where(ExecutionDailyRollup.test_case_id == bindparam("c"),
+                   ExecutionDailyRollup.day == bindparam("d"),
+                   ExecutionDailyRollup.status == bindparam("s"))
+            .values(count=ExecutionDailyRollup.count + bindparam("n"))
+            .execution_options(synchronize_session=False),
+            updates,
+        )
+    if inserts:
+        db.execute(insert(ExecutionDailyRollup), inserts)
+    return len(inserts)
+
+def apply_retention(db, keep_last: int = 0, keep_days: int = 0, archive_dir: str | None = None,
+                    archive_format: str = "ndjson", dry_run: bool = False, vacuum: bool = False,
+                    now: datetime | None = None):
+    """
+    Purge executions no policy keeps (see the module docstring); 0 switches a policy off.
+    dry_run only counts. vacuum runs VACUUM afterwards so the file actually shrinks
+    (it rewrites the whole database, so it is opt-in).
+    Returns a report dict: purged, rollups_created, archive, bytes before/after, seconds.
+    """
+    if keep_last <= 0 and keep_days <= 0:
+        raise ValueError("No retention policy given, set keep_last and/or keep_days")
+    started = time.perf_counter()
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = now - timedelta(days=keep_days) if keep_days > 0 else None
+    size_before, free_before = database_size(db)
+    archive = _open_archive(archive_dir, archive_format) if archive_dir and not dry_run else None
+
+    purged = 0
+    rollups_created = 0
+    last_case = 0
+    try:
+        while True:
+            case_ids = db.scalars(select(TestCase.id).where(TestCase.id > last_case)
+                                  .order_by(TestCase.id).limit(CASE_BATCH)).all()
+            if not case_ids:
+                break
+            last_case = case_ids[-1]
+            ranked = _ranked(case_ids)
+            cond = _purge_condition(ranked, keep_last, cutoff)
+            if dry_run:
+                purged += db.execute(select(func.count()).select_from(ranked).where(cond)).scalar()
+                continue
+            while True:
+                #purged rows are the oldest ones, deleting them doesn't change the rank of the rest
+                rows = db.execute(
+                    select(ranked.c.id, ranked.c.test_case_id, ranked.c.status,
+                           ranked.c.comment, ranked.c.executed_at)
+                    .where(cond).order_by(ranked.c.test_case_id, ranked.c.executed_at).limit(ROW_BATCH)
+                ).all()
+                if not rows:
+                    break
+                if archive:
+                    archive.write([{"id": r.id, "test_case_id": r.test_case_id, "status": r.status,
+                                    "comment": r.comment,
+                                    "executed_at": r.executed_at.isoformat() if r.executed_at else None}
+                                   for r in rows])
+                rollups_created += _add_rollups(
+                    db, Counter((r.test_case_id, r.executed_at.date(), r.status) for r in rows))
+                ids = [r.id for r in rows]
+                for i in range(0, len(ids), IN_CHUNK):
+                    db.execute(delete(TestExecution).where(TestExecution.id.in_(ids[i:i + IN_CHUNK])),
+                               execution_options={"synchronize_session": False})
+                db.commit()
+                purged += len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if archive:
+            archive.close()
+
+    if vacuum and not dry_run and purged:
+        db.close()
+        with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+    size_after, free_after = database_size(db)
+    db.rollback()
+    report = {
+        "policy": {"keep_last": keep_last or None, "keep_days": keep_days or None,
+                   "cutoff": cutoff.isoformat() if cutoff else None},
+        "dry_run": dry_run,
+        "purged": purged,
+        "rollups_created": rollups_created,
+        "archive": archive.path if archive and purged else None,
+        "archive_bytes": os.path.getsize(archive.path) if archive and purged else None,
+        "db_bytes_before": size_before,
+        "db_bytes_after": size_after,
+        "free_bytes_before": free_before,
+        "free_bytes_after": free_after,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info("retention purged %s execution(s) in %ss, db %s -> %s bytes (%s free)",
+                purged, report["seconds"], size_before, size_after, free_after)
+    return report
+
+def run_configured_retention(**overrides):
+    """apply_retention with the RETENTION_* settings, in its own session."""
+    kwargs = {
+        "keep_last": config.RETENTION_KEEP_LAST,
+        "keep_days": config.RETENTION_KEEP_DAYS,
+        "archive_dir": config.RETENTION_ARCHIVE_DIR or None,
+        "archive_format": config.RETENTION_ARCHIVE_FORMAT,
+        **overrides,
+    }
+    db = SessionLocal()
+    try:
+        return apply_retention(db, **kwargs)
+    finally:
+        db.close()
+
+_stop = threading.Event()
+_thread = None
+OWNER_RETRY_SECONDS = 60
+
+def _loop(interval: float):
+    #with several workers only the one holding the lock runs retention, the others
+    #keep trying so one takes over when that worker goes away
+    while not _stop.is_set():
+        with try_lock(engine, "retention") as owner:
+            if owner:
+                while not _stop.wait(interval):
+                    try:
+                        run_configured_retention()
+                    except Exception:
+                        logger.exception("scheduled retention run failed")
+                return
+        if _stop.wait(OWNER_RETRY_SECONDS):
+            return
+
+def start_retention_scheduler():
+    """Run retention every RETENTION_INTERVAL_HOURS in a daemon thread; no-op when not configured."""
+    global _thread
+    if config.RETENTION_INTERVAL_HOURS <= 0:
+        return False
+    if config.RETENTION_KEEP_LAST <= 0 and config.RETENTION_KEEP_DAYS <= 0:
+        logger.warning("RETENTION_INTERVAL_HOURS is set but no retention policy is, not scheduling")
+        return False
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, args=(config.RETENTION_INTERVAL_HOURS * 3600,),
+                               name="retention", daemon=True)
+    _thread.start()
+    return True
+
+def stop_retention_scheduler():
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
@@ -0,0 +1,247 @@
+"""
+Test runs.
+
+A run is one pass over a suite. Creating it copies the suite's cases into
+test_run_cases with a single INSERT ... SELECT, so the run keeps the case list
+(and titles) it started with even when the suite changes later. Results recorded
+against a run go into the normal test_executions history (tagged with run_id,
+so the latest_* projection and suite counters move as usual) and update the
+run's own row for the case, in the same transaction. test_run_status_counts
+holds the number of run cases per status, kept up to date like
+suite_status_counts.
+
+Run summaries, run case pages and run-to-run comparisons only read these per-run
+tables, never the execution history.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import select, func, update, insert, literal, bindparam, case
+from .models import TestSuite, TestCase, TestRun, TestRunCase, TestRunStatusCount
+from .crud import IN_CHUNK, NOT_STARTED, status_key, stage_executions, _utc
+from .cache import invalidate_suites
+from .db import lock_for_write
+from .events import publish_events
+
+RUN_CASES_LIMIT = 100
+COMPARE_CHANGED_LIMIT = 200
+NOT_IN_RUN = "NOT IN RUN"
+
+class RunClosed(Exception):
+    """Results were sent to a closed run."""
+
+def _run_dict(run: TestRun, counts: dict | None = None):
+    out = {
+        "id": run.id,
+        "project_id": run.project_id,
+        "suite_id": run.suite_id,
+        "name": run.name,
+        "environment": run.environment,
+        "executed_by": run.executed_by,
+        "status": run.status,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+    }
+    if counts is not None:
+        out["counts"] = counts
+        out["total"] = sum(counts.values())
+    return out
+
+def _run_counts(db, run_ids):
+    """run_id -> {status: count} from test_run_status_counts."""
+    counts = {rid: {} for rid in run_ids}
+    rows = db.execute(
+        select(TestRunStatusCount.run_id, TestRunStatusCount.status, TestRunStatusCount.count)
+        .where(TestRunStatusCount.run_id.in_(run_ids), TestRunStatusCount.count > 0)
+    )
+    for r in rows:
+        counts[r.run_id][r.status] = r.count
+    return counts
+
+def bump_run_counter(db, run_id: int, status: str | None, delta: int):
+    """Add delta to the run's counter for status, creating the row on first use."""
+    if delta == 0:
+        return
+    status = status_key(status)
+    res = db.execute(
+        update(TestRunStatusCount)
+        .where(TestRunStatusCount.run_id == run_id, TestRunStatusCount.status == status)
+        .values(count=TestRunStatusCount.count + delta)
+    )
+    if res.rowcount == 0:
+        db.execute(insert(TestRunStatusCount).values(run_id=run_id, status=status, count=delta))
+
+def create_run(db, suite_id: int, name: str | None = None, environment: str | None = None,
+               executed_by: str | None = None):
+    """Start a run over the suite's current cases. None if the suite doesn't exist."""
+    suite = db.get(TestSuite, suite_id)
+    if suite is None:
+        return None
+    run = TestRun(project_id=suite.project_id, suite_id=suite_id, name=name,
+                  environment=environment, executed_by=executed_by, status="open")
+    db.add(run)
+    db.flush()
+    snapshot = (select(literal(run.id), TestCase.id, TestCase.title, TestCase.priority)
+                .where(TestCase.suite_id == suite_id)
+                .order_by(TestCase.id))
+    n = db.execute(
+        insert(TestRunCase).from_select(["run_id", "test_case_id", "title", "priority"], snapshot)
+    ).rowcount
+    if n:
+        db.execute(insert(TestRunStatusCount).values(run_id=run.id, status=NOT_STARTED, count=n))
+    db.commit()
+    db.refresh(run)
+    return _run_dict(run, {NOT_STARTED: n} if n else {})
+
+def get_run_summary(db, run_id: int):
+    """The run with its per-status counts, or None."""
+    run = db.get(TestRun, run_id)
+    if run is None:
+        return None
+    return _run_dict(run, _run_counts(db, [run_id])[run_id])
+
+def list_runs(db, suite_id: int, before_id: int | None = None, limit: int = 20):
+    """Runs of a suite, newest first, with their counts. Pass next_before back as before_id."""
+    q = select(TestRun).where(TestRun.suite_id == suite_id)
+    if before_id is not None:
+        q = q.where(TestRun.id < before_id)
+    runs = db.scalars(q.order_by(TestRun.id.desc()).limit(limit + 1)).all()
+    has_more = len(runs) > limit
+    runs = runs[:limit]
+    counts = _run_counts(db, [r.id for r in runs]) if runs else {}
+    return {"runs": [_run_dict(r, counts[r.id]) for r in runs],
+            "next_before": runs[-1].id if has_more else None}
+
+def get_run_cases_page(db, run_id: int, after_id: int | None = None, limit: int = RUN_CASES_LIMIT,
+                       status: str | None = None):
+    """
+    One page of the run's cases in snapshot order; status filters by bucket
+    (NOT STARTED for cases without a result yet). Pass next_after back as after_id.
+    """
+    q = select(TestRunCase.id, TestRunCase.test_case_id, TestRunCase.title, TestRunCase.priority,
+               TestRunCase.status, TestRunCase.comment, TestRunCase.execution_id, TestRunCase.executed_at)\
+        .where(TestRunCase.run_id == run_id)
+    if status is not None:
+        status = status.upper()
+        q = q.where(TestRunCase.status.is_(None) if status == NOT_STARTED else TestRunCase.status == status)
+    if after_id is not None:
+        q = q.where(TestRunCase.id > after_id)
+    rows = db.execute(q.order_by(TestRunCase.id).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    cases = [{**r._mapping, "executed_at": r.executed_at.isoformat() if r.executed_at else None}
+             for r in rows]
+    return {"cases": cases, "next_after": rows[-1].id if has_more else None}
+
+def record_run_results(db, run_id: int, records: list[dict]):
+    """
+    Record results against a run, in one transaction with their history rows.
+    records: like record_executions; a case must be part of the run's snapshot.
+    A run case keeps its newest result, so late uploads of older results only add history.
+    Returns one result dict per record (see record_executions), or None if the run doesn't exist.
+    Raises RunClosed for a closed run.
+    """
+    #the run counters move from the statuses read here, so read them under the write lock
+    lock_for_write(db)
+    run = db.get(TestRun, run_id, with_for_update=True, populate_existing=True)
+    if run is None:
+        db.rollback()
+        return None
+    if run.status == "closed":
+        db.rollback()
+        raise RunClosed(f"Run {run_id} is closed")
+    now = _utc(datetime.now(timezone.utc))
+    ids = list({r.get("case_id") for r in records if isinstance(r.get("case_id"), int)})
+    run_cases = {}
+    for i in range(0, len(ids), IN_CHUNK):
+        q = (select(TestRunCase).where(TestRunCase.run_id == run_id, TestRunCase.test_case_id.in_(ids[i:i + IN_CHUNK]))
+             .order_by(TestRunCase.id).with_for_update().execution_options(populate_existing=True))
+        for rc in db.scalars(q):
+            run_cases[rc.test_case_id] = rc
+    staged = []
+    for r in records:
+        r = {**r, "run_id": run_id, "executed_at": _utc(r["executed_at"]) if r.get("executed_at") else now}
+        if not r.get("error") and r.get("case_id") not in run_cases:
+            r["error"] = "Test case not in this run"
+        staged.append(r)
+
+    results, events = stage_executions(db, staged)
+    newest = {}
+    for r, res in zip(staged, results):
+        if not res["ok"]:
+            continue
+        key = (r["executed_at"], res["execution_id"])
+        if r["case_id"] not in newest or key > newest[r["case_id"]][0]:
+            newest[r["case_id"]] = (key, r, res["execution_id"])
+    deltas = Counter()
+    changes = []
+    for case_id, ((executed_at, _), r, execution_id) in newest.items():
+        rc = run_cases[case_id]
+        if rc.executed_at is not None and (executed_at, execution_id) < (rc.executed_at, rc.execution_id or 0):
+            continue
+        status = r["status"].upper()
+        if status_key(rc.status) != status:
+            deltas[status_key(rc.status)] -= 1
+            deltas[status] += 1
+        changes.append({"rc_id": rc.id, "new_status": status, "new_comment": r.get("comment"),
+                        "new_execution_id": execution_id, "new_executed_at": executed_at})
+    if changes:
+        #on the table, not the entity: the ORM treats an executemany UPDATE as update-by-primary-key
+        t = TestRunCase.__table__
+        db.execute(
+            update(t).where(t.c.id == bindparam("rc_id"))
+            .values(status=bindparam("new_status"), comment=bindparam("new_comment"),
+                    execution_id=bindparam("new_execution_id"), executed_at=bindparam("new_executed_at")),
+            changes,
+        )
+    for status, delta in deltas.items():
+        bump_run_counter(db, run_id, status, delta)
+    db.commit()
+    invalidate_suites(sid for sid, _ in events)
+    publish_events(events)
+    return results
+
+def close_run(db, run_id: int):
+    """Mark the run closed (no more results). Returns the summary, or None."""
+    run = db.get(TestRun, run_id)
+    if run is None:
+        return None
+    if run.status != "closed":
+        run.status = "closed"
+        run.finished_at = _utc(datetime.now(timezone.utc))
+        db.commit()
+    return get_run_summary(db, run_id)
+
+def compare_runs(db, base_id: int, head_id: int, limit: int = COMPARE_CHANGED_LIMIT):
+    """
+    Case-by-case comparison of two runs, matched by case id (cases deleted since are left out).
+    Returns both runs, a transition count per (from, to) status pair, and up to `limit`
+    cases whose status changed. A case missing from one run shows as NOT IN RUN there.
+    None if either run doesn't exist.
+    """
+    base, head = db.get(TestRun, base_id), db.get(TestRun, head_id)
+    if base is None or head is None:
+        return None
+    b = select(TestRunCase.test_case_id, TestRunCase.title, TestRunCase.status)\
+        .where(TestRunCase.run_id == base_id, TestRunCase.test_case_id.is_not(None)).subquery("b")
+    h = select(TestRunCase.test_case_id, TestRunCase.title, TestRunCase.status)\
+        .where(TestRunCase.run_id == head_id, TestRunCase.test_case_id.is_not(None)).subquery("h")
+    joined = b.join(h, b.c.test_case_id == h.c.test_case_id, full=True)
+    before = case((b.c.test_case_id.is_(None), NOT_IN_RUN), else_=func.coalesce(b.c.status, NOT_STARTED))
+    after = case((h.c.test_case_id.is_(None), NOT_IN_RUN), else_=func.coalesce(h.c.status, NOT_STARTED))
+    transitions = db.execute(
+        select(before.label("from_status"), after.label("to_status"), func.count().label("count"))
+        .select_from(joined).group_by(before, after)
+    ).all()
+    case_id = func.coalesce(b.c.test_case_id, h.c.test_case_id)
+    changed = db.execute(
+        select(case_id.label("case_id"), func.coalesce(h.c.title, b.c.title).label("title"),
+               before.label("from_status"), after.label("to_status"))
+        .select_from(joined).where(before != after).order_by(case_id).limit(limit)
+    ).all()
+    return {
+        "base": _run_dict(base, _run_counts(db, [base_id])[base_id]),
+        "head": _run_dict(head, _run_counts(db, [head_id])[head_id]),
+        "transitions": [dict(r._mapping) for r in transitions],
+        "changed": [dict(r._mapping) for r in changed],
+        "changed_total": sum(r.count for r in transitions if r.from_status != r.to_status),
+    }
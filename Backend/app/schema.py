@@ -0,0 +1,64 @@
+"""
+Schema management.
+
+The schema is versioned with Alembic (migrations/ next to this package, alembic.ini
+in the Backend folder). run_migrations() upgrades a database to the newest
+revision and runs at startup under the startup lock; `python -m app.cli migrate`
+does the same by hand, and the alembic command works too (env.py backfills the
+projections a revision adds, whichever of these ran it):
+
+    cd Backend && alembic upgrade head
+    cd Backend && alembic revision -m "add something"
+
+Every revision is written out, the baseline included: it holds the tables as they
+were when migrations were introduced and also brings a database created before
+then (by create_all and the startup upgrade it replaced) up to them. A model change
+needs its own revision; tests/test_migrations.py fails when head and the models differ.
+"""
+import os
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy.orm import Session
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def alembic_config():
+    cfg = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return cfg
+
+def run_migrations(engine, revision: str = "head"):
+    """
+    Upgrade the database to `revision` in one transaction. Returns what the
+    baseline added ("table" or "table.column"), empty when it had already run.
+    """
+    cfg = alembic_config()
+    with engine.begin() as conn:
+        cfg.attributes["connection"] = conn
+        cfg.attributes["added"] = []
+        command.upgrade(cfg, revision)
+    return cfg.attributes["added"]
+
+def backfill_projections(connection, added):
+    """
+    Fill the projections a revision just added from the rows already there. Runs
+    in migrations/env.py after the revisions, in their transaction, so the app,
+    `python -m app.cli migrate` and the alembic command all leave them in sync.
+    """
+    from .crud import rebuild_latest_status, rebuild_suite_counters
+    if "test_cases.latest_status" not in added and "suite_status_counts" not in added:
+        return
+    #joins the open transaction, the commits inside the rebuilds don't end it
+    db = Session(bind=connection)
+    try:
+        if "test_cases.latest_status" in added:
+            #database predates the latest status projection
+            rebuild_latest_status(db)
+        rebuild_suite_counters(db)
+    finally:
+        db.close()
+
+def current_revision(engine):
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
@@ -0,0 +1,169 @@
+"""
+Full-text search over test case title, description and steps.
+
+SQLite: an external content FTS5 table, test_cases_fts, indexes test_cases through
+a view that flattens the JSON steps to their text. Triggers keep it in sync, so
+every write path (single adds, bulk imports, set-based deletes) updates it
+without code changes. The update trigger only fires when title, description or
+steps change, so recording executions (which updates the latest_* columns) does
+not touch the index.
+
+Postgres: a generated tsvector column, test_cases.search_vector, with a GIN index.
+
+Ranking is bm25 (ts_rank on Postgres) with the title weighted highest, and every
+word of the query is matched as a prefix.
+"""
+import re
+from sqlalchemy import text, inspect
+
+FTS_TABLE = "test_cases_fts"
+FTS_VIEW = "test_cases_fts_content"
+TITLE_WEIGHT, DESCRIPTION_WEIGHT, STEPS_WEIGHT = 10.0, 2.0, 1.0
+MAX_TERMS = 16
+
+def _steps_text_sql(ref: str):
+    #steps is a JSON list of {"no", "action", "expected"}; only the step text is indexed
+    return (f"(SELECT group_concat(coalesce(json_extract(s.value, '$.action'), '') || ' ' || "
+            f"coalesce(json_extract(s.value, '$.expected'), ''), ' ') "
+            f"FROM json_each(CASE WHEN json_valid({ref}.steps) THEN {ref}.steps ELSE '[]' END) s)")
+
+def is_search_object(name: str, type_: str) -> bool:
+    """
+    True for what ensure_search_index creates outside the models: the FTS5 table,
+    its shadow tables and content view, the Postgres tsvector column and its index.
+    Alembic autogenerate skips them (migrations/env.py include_object).
+    """
+    if type_ == "table":
+        return name.startswith(FTS_TABLE)
+    if type_ == "column":
+        return name == "search_vector"
+    if type_ == "index":
+        return name == "ix_test_cases_search_vector"
+    return False
+
+_SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS test_cases_fts_insert",
+    "DROP TRIGGER IF EXISTS test_cases_fts_delete",
+    "DROP TRIGGER IF EXISTS test_cases_fts_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"DROP VIEW IF EXISTS {FTS_VIEW}",
+]
+
+_SQLITE_DDL = [
+    #the FTS table reads its content (for rebuild and snippets) through this view
+    f"""CREATE VIEW {FTS_VIEW} AS
+        SELECT id, title, description, {_steps_text_sql('test_cases')} AS steps FROM test_cases""",
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, description, steps,
+        content='{FTS_VIEW}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    f"""CREATE TRIGGER test_cases_fts_insert AFTER INSERT ON test_cases BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description, steps)
+        VALUES (new.id, new.title, new.description, {_steps_text_sql('new')});
+    END""",
+    f"""CREATE TRIGGER test_cases_fts_delete AFTER DELETE ON test_cases BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, steps)
+        VALUES ('delete', old.id, old.title, old.description, {_steps_text_sql('old')});
+    END""",
+    f"""CREATE TRIGGER test_cases_fts_update AFTER UPDATE OF title, description, steps ON test_cases BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description, steps)
+        VALUES ('delete', old.id, old.title, old.description, {_steps_text_sql('old')});
+        INSERT INTO {FTS_TABLE}(rowid, title, description, steps)
+        VALUES (new.id, new.title, new.description, {_steps_text_sql('new')});
+    END""",
+]
+
+_POSTGRES_DDL = [
+    """ALTER TABLE test_cases ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+        setweight(jsonb_to_tsvector('simple', coalesce(steps::jsonb, '[]'), '["string"]'), 'C')) STORED""",
+    "CREATE INDEX ix_test_cases_search_vector ON test_cases USING gin (search_vector)",
+]
+
+def ensure_search_index(engine):
+    """
+    Create the search index if it is missing and fill it from the existing rows.
+    Returns True when it was created. Other databases get no index (search is off).
+    """
+    dialect = engine.dialect.name
+    insp = inspect(engine)
+    if dialect == "sqlite":
+        if FTS_TABLE in insp.get_table_names() and FTS_VIEW in insp.get_view_names():
+            return False
+        with engine.begin() as conn:
+            #also replaces an index built before steps became JSON
+            for ddl in _SQLITE_DROP + _SQLITE_DDL:
+                conn.exec_driver_sql(ddl)
+        rebuild_search_index(engine)
+        return True
+    if dialect == "postgresql":
+        if "search_vector" in {c["name"] for c in insp.get_columns("test_cases")}:
+            return False
+        with engine.begin() as conn:
+            #a generated column is computed for the existing rows as it is added
+            for ddl in _POSTGRES_DDL:
+                conn.exec_driver_sql(ddl)
+        return True
+    return False
+
+def rebuild_search_index(engine):
+    """Re-read every case into the index (SQLite), e.g. after editing test_cases by hand."""
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            #not the 'rebuild' command: it fails on a content view that uses json_each
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}(rowid, title, description, steps) "
+                                 f"SELECT id, title, description, steps FROM {FTS_VIEW}")
+            conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+def query_terms(q: str):
+    #words only, so user input never reaches the MATCH / tsquery syntax
+    return re.findall(r"\w+", q.lower())[:MAX_TERMS]
+
+def search_cases(db, q: str, suite_id: int | None = None, project_id: int | None = None,
+                 limit: int = 20, offset: int = 0):
+    """
+    Cases matching every word of q (as prefixes), best match first.
+    Returns {"results": [...], "next_offset": n or None}.
+    """
+    terms = query_terms(q)
+    if not terms:
+        return {"results": [], "next_offset": None}
+    params = {"limit": limit + 1, "offset": offset}
+    scope = ""
+    if suite_id is not None:
+        scope += " AND c.suite_id = :suite_id"
+        params["suite_id"] = suite_id
+    if project_id is not None:
+        scope += " AND c.suite_id IN (SELECT id FROM test_suites WHERE project_id = :project_id)"
+        params["project_id"] = project_id
+
+    if db.get_bind().dialect.name == "postgresql":
+        params["query"] = " & ".join(f"{t}:*" for t in terms)
+        sql = f"""
+            SELECT c.id, c.suite_id, c.title, c.priority, c.latest_status,
+                   ts_headline('simple', coalesce(c.title, '') || ' ' || coalesce(c.description, ''),
+                               to_tsquery('simple', :query), 'MaxFragments=1, MaxWords=12') AS snippet,
+                   ts_rank(c.search_vector, to_tsquery('simple', :query)) AS score
+            FROM test_cases c
+            WHERE c.search_vector @@ to_tsquery('simple', :query){scope}
+            ORDER BY score DESC, c.id
+            LIMIT :limit OFFSET :offset"""
+    else:
+        params["query"] = " ".join(f'"{t}"*' for t in terms)
+        #bm25 is lower for better matches, negated so score reads the same as on Postgres
+        sql = f"""
+            SELECT c.id, c.suite_id, c.title, c.priority, c.latest_status,
+                   snippet({FTS_TABLE}, -1, '[', ']', '…', 12) AS snippet,
+                   -bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, {STEPS_WEIGHT}) AS score
+            FROM {FTS_TABLE} JOIN test_cases c ON c.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH :query{scope}
+            ORDER BY bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, {STEPS_WEIGHT}), c.id
+            LIMIT :limit OFFSET :offset"""
+    rows = db.execute(text(sql), params).all()
+    has_more = len(rows) > limit
+    results = [dict(r._mapping) for r in rows[:limit]]
+    for r in results:
+        r["score"] = round(float(r["score"]), 4)
+    return {"results": results, "next_offset": offset + limit if has_more else None}
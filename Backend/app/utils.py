@@ -1,9 +1,182 @@
 import csv
+import io
 import json
+import re
 import pandas
+from datetime import datetime
 from io import BytesIO
 
-def parse_testcase_excel(content: bytes): #type hints
-    df = pandas.read_excel(BytesIO(content))  #BytesIO allows pandas to read the bytes as if it were a file
-    #Each row becomes a row in pandas, Each Excel column becomes a DataFrame column
-    return df.to_dict(orient='records') #Each row becomes a dictionary, All rows return inside a list
\ No newline at end of file
+SUPPORTED_UPLOADS = (".xlsx", ".xls", ".csv")
+
+def parse_testcase_excel(content: bytes, filename: str = "upload.xlsx"): #type hints
+    #whole file as a list, prefer iter_testcase_rows for big uploads
+    return list(iter_testcase_rows(BytesIO(content), filename))
+
+def _sheet_rows(fileobj, filename: str):
+    """Raw rows (tuples) of the upload, header first, without loading the whole sheet."""
+    name = filename.lower()
+    if name.endswith(".xlsx"):
+        from openpyxl import load_workbook
+        #read_only streams the sheet xml row by row instead of building every cell object
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            yield from wb.active.iter_rows(values_only=True)
+        finally:
+            wb.close()
+    elif name.endswith(".csv"):
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.reader(text)
+        finally:
+            text.detach() #leave the underlying upload file open for the caller
+    elif name.endswith(".xls"):
+        #legacy binary format has no streaming reader, pandas loads it whole
+        df = pandas.read_excel(fileobj, header=None, dtype=object)
+        yield from df.itertuples(index=False, name=None)
+    else:
+        raise ValueError(f"Unsupported file type, expected one of {', '.join(SUPPORTED_UPLOADS)}")
+
+def iter_testcase_rows(fileobj, filename: str):
+    """
+    Stream the test case rows of an uploaded sheet as dicts keyed by lower cased
+    header. The header is read and checked straight away (ValueError if there is
+    no title column), the rows are produced lazily so only one is held at a time.
+    """
+    rows = _sheet_rows(fileobj, filename)
+    header = next(rows, None)
+    keys = [str(h).strip().lower() if h is not None else "" for h in (header or ())]
+    if "title" not in keys:
+        rows.close()
+        raise ValueError("Excel is not proper, a 'title' column is required")
+    return _records(keys, rows)
+
+def _records(keys, rows):
+    for row in rows:
+        record = {k: clean_cell(v) for k, v in zip(keys, row) if k}
+        if any(v not in (None, "") for v in record.values()):
+            yield record
+
+def clean_cell(value):
+    #empty excel cells come back from pandas as NaN, treat them like missing values
+    if isinstance(value, (list, dict)):
+        return value
+    if value is None or pandas.isna(value):
+        return None
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+#"1.", "1)", "Step 1:" and bullets in front of a step line
+_STEP_PREFIX = re.compile(r"^\s*(?:step\s*)?(?:\d+\s*[.):-]|[-*\u2022])\s*", re.IGNORECASE)
+_EXPECTED_SPLIT = re.compile(r"\s*(?:->|=>|\|\s*expected\s*:?)\s*", re.IGNORECASE)
+
+def _step(action, expected=None):
+    action = "" if action is None else str(action).strip()
+    expected = None if expected in (None, "") else str(expected).strip()
+    return {"action": action, "expected": expected}
+
+def normalize_steps(value):
+    """
+    Steps in any of the shapes uploads and clients send, as the stored schema:
+    [{"no": 1, "action": "...", "expected": "..." or None}, ...].
+
+    Accepts a list (of dicts or strings), a JSON string of one, or free text with
+    one step per line where "action -> expected" (or =>, | expected:) gives the
+    expected result and "1." / "Step 1:" numbering is dropped.
+    """
+    value = clean_cell(value)
+    if value in (None, ""):
+        return []
+    if isinstance(value, str) and value[0] in "[{":
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+    if isinstance(value, dict):
+        value = [value]
+    steps = []
+    if isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict):
+                steps.append(_step(item.get("action") or item.get("step") or item.get("description"),
+                                   item.get("expected") or item.get("expected_result")))
+            elif item not in (None, ""):
+                steps.append(_step(*_EXPECTED_SPLIT.split(_STEP_PREFIX.sub("", str(item)), maxsplit=1)))
+    else:
+        for line in str(value).splitlines():
+            line = _STEP_PREFIX.sub("", line).strip()
+            if line:
+                steps.append(_step(*_EXPECTED_SPLIT.split(line, maxsplit=1)))
+    return [{"no": i, **st} for i, st in enumerate((st for st in steps if st["action"] or st["expected"]), 1)]
+
+def steps_text(steps):
+    """One line per step, for CSV export and other plain text views."""
+    return "\n".join(f"{st['no']}. {st['action']}" + (f" -> {st['expected']}" if st.get("expected") else "")
+                     for st in steps or [])
+
+
+def parse_datetime(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+
+def parse_results_csv(fileobj):
+    """
+    Execution results from a CSV with columns case_id, status, comment, executed_at.
+    Rows that can't be read are returned with an "error" key instead of being dropped.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        records = []
+        for row in csv.DictReader(text):
+            row = {(k or "").strip().lower(): clean_cell(v) for k, v in row.items()}
+            try:
+                records.append({"case_id": int(row.get("case_id")),
+                                "status": row.get("status"),
+                                "comment": row.get("comment") or None,
+                                "executed_at": parse_datetime(row.get("executed_at"))})
+            except (TypeError, ValueError) as e:
+                records.append({"case_id": row.get("case_id"), "error": f"Bad row: {e}"})
+        return records
+    finally:
+        text.detach()
+
+def parse_junit_xml(fileobj):
+    """
+    Execution results from a JUnit XML report. Every <testcase> becomes one record
+    with the case title (its name attribute), PASS or FAIL (failure/error child)
+    and the testsuite timestamp. Skipped tests are left out.
+    A numeric name or a case_id property is taken as the test case id.
+    Parsed with defusedxml: reports are uploaded, so entity expansion and external
+    entities are refused (a ValueError) instead of being resolved.
+    """
+    from defusedxml.ElementTree import iterparse
+    records = []
+    timestamp = None
+    for event, elem in iterparse(fileobj, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "testsuite":
+                timestamp = parse_datetime(elem.get("timestamp"))
+            continue
+        if elem.tag != "testcase":
+            continue
+        children = {child.tag for child in elem}
+        if "skipped" not in children:
+            failed = elem.find("failure") if elem.find("failure") is not None else elem.find("error")
+            props = {p.get("name"): p.get("value") for p in elem.iter("property")}
+            name = (elem.get("name") or "").strip()
+            case_id = props.get("case_id") or (name if name.isdigit() else None)
+            comment = None
+            if failed is not None:
+                comment = (failed.get("message") or failed.text or "").strip()[:2000] or None
+            records.append({
+                "case_id": int(case_id) if case_id else None,
+                "title": name,
+                "status": "FAIL" if failed is not None else "PASS",
+                "comment": comment,
+                "executed_at": timestamp,
+            })
+        elem.clear()
+    return records
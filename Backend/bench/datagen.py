@@ -0,0 +1,112 @@
+"""
+Synthetic data generator for benchmarks.
+
+Fills a database with projects, suites, cases and execution history straight
+through executemany inserts, then rebuilds the latest status projection and the
+suite counters the way the backfill CLI does. The same --seed always produces
+the same data, so runs on different commits are comparable.
+
+    cd Backend && python -m bench.datagen sqlite:///./bench.sqlite --suites 100 --cases 10000 --executions 50
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import Project, TestSuite, TestCase, TestExecution
+from app.crud import rebuild_latest_status, rebuild_suite_counters
+
+STATUSES = ["PASS", "FAIL", "BLOCKER", "IN PROGRESS"]
+STATUS_WEIGHTS = [70, 15, 5, 10]
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+INSERT_BATCH = 50_000
+START = datetime(2024, 1, 1)
+STEPS = [{"no": 1, "action": "open the page", "expected": None},
+         {"no": 2, "action": "check the result", "expected": "result is shown"}]
+
+
+def generate(db, projects: int = 1, suites: int = 10, cases: int = 1000, executions: int = 10,
+             seed: int = 0):
+    """
+    suites is per project, cases per suite and executions per case.
+    Returns {"projects": [ids], "suites": [ids], "cases": n, "executions": n, "seconds": s}.
+    """
+    started = time.perf_counter()
+    rnd = random.Random(seed)
+    project_rows = [Project(name=f"bench project {p}") for p in range(projects)]
+    db.add_all(project_rows)
+    db.flush()
+    suite_rows = [TestSuite(project_id=p.id, name=f"bench suite {p.id}.{s}")
+                  for p in project_rows for s in range(suites)]
+    db.add_all(suite_rows)
+    db.flush()
+    suite_ids = [s.id for s in suite_rows]
+
+    n_cases = 0
+    n_executions = 0
+    for suite_id in suite_ids:
+        db.execute(insert(TestCase), [
+            {"suite_id": suite_id, "title": f"case {suite_id}.{i}",
+             "description": f"generated case {i}", "priority": rnd.choice(PRIORITIES),
+             "steps": STEPS}
+            for i in range(cases)
+        ])
+        n_cases += cases
+        if not executions:
+            continue
+        case_ids = db.scalars(select(TestCase.id).where(TestCase.suite_id == suite_id)).all()
+        batch = []
+        for cid in case_ids:
+            #one run a day, each case executed somewhere inside it
+            for k in range(executions):
+                batch.append({"test_case_id": cid,
+                              "status": rnd.choices(STATUSES, STATUS_WEIGHTS)[0],
+                              "comment": None,
+                              "executed_at": START + timedelta(days=k, seconds=rnd.randrange(86400))})
+            if len(batch) >= INSERT_BATCH:
+                db.execute(insert(TestExecution), batch)
+                n_executions += len(batch)
+                batch = []
+        if batch:
+            db.execute(insert(TestExecution), batch)
+            n_executions += len(batch)
+    db.commit()
+    rebuild_latest_status(db)
+    rebuild_suite_counters(db)
+    return {
+        "projects": [p.id for p in project_rows],
+        "suites": suite_ids,
+        "cases": n_cases,
+        "executions": n_executions,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("db_url")
+    ap.add_argument("--projects", type=int, default=1)
+    ap.add_argument("--suites", type=int, default=10, help="suites per project")
+    ap.add_argument("--cases", type=int, default=1000, help="cases per suite")
+    ap.add_argument("--executions", type=int, default=10, help="executions per case")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    engine = create_engine(args.db_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        out = generate(db, args.projects, args.suites, args.cases, args.executions, args.seed)
+    finally:
+        db.close()
+        engine.dispose()
+    print(f"{len(out['suites'])} suites, {out['cases']} cases, {out['executions']} executions "
+          f"in {out['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for the latest status of every case in a suite.
+
+Times three ways on a throwaway SQLite file, for growing suite sizes: the old
+one-query-per-case lookup, the single window-function query
+(latest_execution_subquery, still used by the backfill and check-latest) and
+get_cases_with_latest_status, which reads the latest_* projection columns.
+
+    cd Backend && python -m bench.latest_status --sizes 1000 5000 20000 --executions 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import TestCase, TestExecution
+from app.crud import get_cases_with_latest_status, latest_execution_subquery
+from bench.datagen import generate
+
+
+def seed(db, n_cases: int, n_executions: int):
+    return generate(db, suites=1, cases=n_cases, executions=n_executions)["suites"][0]
+
+
+def per_case_lookup(db, suite_id: int):
+    #the previous implementation, kept here as the baseline
+    cases = db.query(TestCase).filter(TestCase.suite_id == suite_id).order_by(TestCase.id).all()
+    out = []
+    for c in cases:
+        latest = db.query(TestExecution).filter(TestExecution.test_case_id == c.id)\
+            .order_by(TestExecution.executed_at.desc()).first()
+        out.append((c.id, latest.status if latest else None))
+    return out
+
+
+def window_lookup(db, suite_id: int):
+    latest = latest_execution_subquery(suite_id)
+    return db.execute(
+        select(TestCase.id, latest.c.status)
+        .outerjoin(latest, (latest.c.test_case_id == TestCase.id) & (latest.c.rn == 1))
+        .where(TestCase.suite_id == suite_id)
+        .order_by(TestCase.id)
+    ).all()
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    ap.add_argument("--executions", type=int, default=20, help="executions per case")
+    args = ap.parse_args()
+
+    print(f"{'cases':>8} {'per-case (s)':>14} {'window (s)':>12} {'projection (s)':>16} {'speedup':>9}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}")
+            Base.metadata.create_all(bind=engine)
+            db = sessionmaker(bind=engine)()
+            try:
+                suite_id = seed(db, n, args.executions)
+                old = timed(per_case_lookup, db, suite_id)
+                db.expunge_all()
+                window = timed(window_lookup, db, suite_id)
+                new = timed(get_cases_with_latest_status, db, suite_id)
+            finally:
+                db.close()
+                engine.dispose()
+        print(f"{n:>8} {old:>14.3f} {window:>12.3f} {new:>16.3f} {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
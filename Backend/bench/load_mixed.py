@@ -0,0 +1,154 @@
+"""
+Mixed read/write load test against a real uvicorn server.
+
+Starts the backend on a throwaway database, uploads --cases test cases, then
+runs reader threads (case pages + summary) and writer threads (execute) for
+--seconds and prints throughput and p50/p95/p99 latency per operation.
+--workers takes a list to compare worker counts, each on a fresh database;
+--server gunicorn uses gunicorn.conf.py (the Docker setup) instead of uvicorn.
+
+    cd Backend && python -m bench.load_mixed --readers 8 --writers 2 --seconds 20
+    cd Backend && python -m bench.load_mixed --server gunicorn --workers 1,2,4 --readers 16
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATUSES = ["PASS", "FAIL", "BLOCKER", "IN PROGRESS"]
+
+
+def start_server(workdir: str, port: int, workers: int, extra_env=None, server: str = "uvicorn"):
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, WEB_CONCURRENCY=str(workers), **(extra_env or {}))
+    #same cache setting for every worker count (it defaults to off with several workers)
+    env.setdefault("CACHE_BACKEND", "none")
+    if server == "gunicorn":
+        env.update(WEB_BIND=f"127.0.0.1:{port}", LOG_LEVEL="WARNING")
+        cmd = [sys.executable, "-m", "gunicorn", "-c", os.path.join(BACKEND_DIR, "gunicorn.conf.py"),
+               "--access-logfile", "", "app.main:app"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=workdir, env=env)
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if httpx.get(f"{base}/api/suites", timeout=1).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("backend did not start")
+
+
+def seed(base: str, n_cases: int):
+    out = io.StringIO()
+    w = csv.writer(out)
+    w.writerow(["title", "priority", "steps"])
+    for i in range(n_cases):
+        w.writerow([f"case {i}", ["Low", "Medium", "High"][i % 3], "1. step"])
+    r = httpx.post(f"{base}/api/testcases/upload", files={"file": ("seed.csv", out.getvalue().encode())}, timeout=300)
+    r.raise_for_status()
+    suite = httpx.get(f"{base}/api/suites").json()[0]["id"]
+    ids = [c["id"] for c in httpx.get(f"{base}/api/suites/{suite}/cases", timeout=60).json()["cases"]]
+    return suite, ids
+
+
+def run_load(base: str, suite_id: int, case_ids, readers: int, writers: int, seconds: float):
+    results = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def reader():
+        with httpx.Client(base_url=base, timeout=30) as c:
+            while time.perf_counter() < stop_at:
+                after = random.choice(case_ids)
+                t0 = time.perf_counter()
+                r1 = c.get(f"/api/suites/{suite_id}/cases/page", params={"after_id": after, "limit": 100})
+                r2 = c.get(f"/api/suites/{suite_id}/summary")
+                dt = time.perf_counter() - t0
+                with lock:
+                    results["read"].append(dt)
+                    errors["read"] += (r1.status_code != 200) + (r2.status_code != 200)
+
+    def writer():
+        with httpx.Client(base_url=base, timeout=30) as c:
+            while time.perf_counter() < stop_at:
+                t0 = time.perf_counter()
+                r = c.post(f"/api/execute/{random.choice(case_ids)}", params={"status": random.choice(STATUSES)})
+                dt = time.perf_counter() - t0
+                with lock:
+                    results["write"].append(dt)
+                    errors["write"] += r.status_code != 200
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def pct(values, p: float):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def report(results, errors, seconds: float):
+    print(f"{'op':>6} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for op, values in results.items():
+        print(f"{op:>6} {len(values):>7} {len(values) / seconds:>8.1f} "
+              f"{pct(values, 50) * 1000:>8.1f} {pct(values, 95) * 1000:>8.1f} {pct(values, 99) * 1000:>8.1f} "
+              f"{errors[op]:>7}")
+    total = sum(len(v) for v in results.values())
+    print(f"total {total / seconds:.1f} req/s, mean {statistics.mean(sum(results.values(), [])) * 1000:.1f} ms")
+    return total / seconds
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cases", type=int, default=5000)
+    ap.add_argument("--readers", type=int, default=8)
+    ap.add_argument("--writers", type=int, default=2)
+    ap.add_argument("--seconds", type=float, default=20)
+    ap.add_argument("--workers", default="1", help="worker processes, or a list such as 1,2,4 to compare")
+    ap.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    throughput = {}
+    for workers in [int(w) for w in args.workers.split(",")]:
+        print(f"\n{args.server}, {workers} worker(s)")
+        with tempfile.TemporaryDirectory() as tmp:
+            proc, base = start_server(tmp, args.port, workers, server=args.server)
+            try:
+                suite_id, case_ids = seed(base, args.cases)
+                results, errors = run_load(base, suite_id, case_ids, args.readers, args.writers, args.seconds)
+                throughput[workers] = report(results, errors, args.seconds)
+            finally:
+                proc.terminate()
+                proc.wait()
+    if len(throughput) > 1:
+        first = next(iter(throughput.values()))
+        print(f"\n{'workers':>7} {'req/s':>8} {'scaling':>8}")
+        for workers, rps in throughput.items():
+            print(f"{workers:>7} {rps:>8.1f} {rps / first:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Peak memory of spreadsheet parsing, old whole-file path vs the streaming parser.
+
+Generates a fixture (200k rows by default) in a temp folder, then measures the
+tracemalloc peak of:
+  pandas    - read_excel + to_dict('records'), the previous implementation
+  stream    - iterating utils.iter_testcase_rows
+  import    - iter_testcase_rows feeding importer.import_testcases (temp SQLite db)
+
+    cd Backend && python -m bench.parse_memory --rows 200000 --format xlsx
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import Project, TestSuite
+from app.utils import iter_testcase_rows
+from app.importer import import_testcases
+
+HEADER = ["title", "description", "priority", "steps", "suite"]
+
+
+def make_fixture(path: str, n_rows: int):
+    def rows():
+        for i in range(n_rows):
+            yield [f"case {i}", f"description of case {i} " * 4, ["Low", "Medium", "High"][i % 3],
+                   f"1. open page {i}\n2. click button\n3. check result", f"suite {i % 50}"]
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(HEADER)
+            w.writerows(rows())
+    else:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(HEADER)
+        for r in rows():
+            ws.append(r)
+        wb.save(path)
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    n = fn()
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return n, seconds, peak / 2**20
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--format", choices=["xlsx", "csv"], default="xlsx")
+    ap.add_argument("--skip-pandas", action="store_true", help="skip the slow whole-file baseline")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"fixture.{args.format}")
+        make_fixture(path, args.rows)
+        print(f"fixture: {args.rows} rows, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        def pandas_path():
+            reader = pandas.read_csv if path.endswith(".csv") else pandas.read_excel
+            return len(reader(path).to_dict(orient="records"))
+
+        def stream_path():
+            with open(path, "rb") as f:
+                return sum(1 for _ in iter_testcase_rows(f, path))
+
+        def import_path():
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}")
+            Base.metadata.create_all(bind=engine)
+            db = sessionmaker(bind=engine)()
+            try:
+                p = Project(name="bench")
+                db.add(p)
+                db.flush()
+                db.add(TestSuite(project_id=p.id, name="Default Suite"))
+                db.commit()
+                with open(path, "rb") as f:
+                    return import_testcases(db, iter_testcase_rows(f, path))["inserted"]
+            finally:
+                db.close()
+                engine.dispose()
+
+        scenarios = [("stream", stream_path), ("import", import_path)]
+        if not args.skip_pandas:
+            scenarios.insert(0, ("pandas", pandas_path))
+        print(f"{'scenario':>10} {'rows':>8} {'seconds':>9} {'peak MiB':>9}")
+        for name, fn in scenarios:
+            n, seconds, peak = measure(fn)
+            print(f"{name:>10} {n:>8} {seconds:>9.2f} {peak:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
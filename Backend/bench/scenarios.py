@@ -0,0 +1,226 @@
+"""
+Timed API scenarios against the FastAPI app, in process.
+
+Generates a synthetic dataset (bench.datagen) in a throwaway SQLite file, then
+drives the app through TestClient and times every scenario --repeat times:
+
+  list_cases        GET /api/suites/{id}/cases
+  cases_page        GET /api/suites/{id}/cases/page
+  suite_summary     GET /api/suites/{id}/summary
+  summary_rollup    GET /api/summary
+  case_detail       GET /api/cases/{id}
+  transitions       GET /api/suites/{id}/analytics/transitions, since the middle of the history
+  flaky_cases       GET /api/suites/{id}/analytics/flaky
+  upload            POST /api/testcases/upload, a CSV of --upload-rows cases
+  batch_executions  POST /api/executions/batch, --batch-size records
+  create_run        POST /api/suites/{id}/runs, snapshots the suite's cases
+  run_results       POST /api/runs/{id}/results, --batch-size records
+  run_compare       GET /api/runs/compare, consecutive runs of a suite
+  delete_suite      DELETE /api/suites/{id}, the suites created by upload
+
+The response cache is off by default so the reads hit the database every time.
+Results (timings and SQL statements per call) are written as JSON; pass a
+previous result file to --compare to print the change per scenario.
+
+    cd Backend && python -m bench.scenarios --suites 10 --cases 2000 --executions 20 -o before.json
+    cd Backend && python -m bench.scenarios --suites 10 --cases 2000 --executions 20 --compare before.json
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+STATUSES = ["PASS", "FAIL", "BLOCKER", "IN PROGRESS"]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def upload_csv(n_rows: int, suite: str):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["title", "description", "priority", "steps", "suite"])
+    for i in range(n_rows):
+        writer.writerow([f"uploaded case {i}", "bench upload", "Low", "1. step", suite])
+    return out.getvalue().encode()
+
+
+def pct(values, p: float):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def summarize(timings, queries):
+    ms = [t * 1000 for t in timings]
+    return {
+        "runs": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(pct(ms, 50), 3),
+        "p95_ms": round(pct(ms, 95), 3),
+        "min_ms": round(min(ms), 3),
+        "max_ms": round(max(ms), 3),
+        "queries_per_call": round(statistics.fmean(queries), 1),
+    }
+
+
+def run(args):
+    #the app reads its settings at import time
+    from sqlalchemy import event, select
+    from fastapi.testclient import TestClient
+    from app.db import engine, SessionLocal
+    from app.main import app
+    from app.models import TestCase
+    from bench.datagen import generate, START
+
+    statements = [0]
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _count(*_):
+        statements[0] += 1
+
+    rnd = random.Random(args.seed)
+    results = {}
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        try:
+            data = generate(db, args.projects, args.suites, args.cases, args.executions, args.seed)
+            case_ids = db.scalars(select(TestCase.id)).all()
+        finally:
+            db.close()
+        print(f"generated {len(data['suites'])} suites, {data['cases']} cases, "
+              f"{data['executions']} executions in {data['seconds']}s")
+        suites = data["suites"]
+        created_suites = []
+
+        def timed(name, call):
+            timings, queries = [], []
+            for i in range(args.repeat):
+                before = statements[0]
+                t0 = time.perf_counter()
+                r = call(i)
+                timings.append(time.perf_counter() - t0)
+                queries.append(statements[0] - before)
+                if r.status_code >= 400:
+                    raise RuntimeError(f"{name}: HTTP {r.status_code} {r.text[:200]}")
+            results[name] = summarize(timings, queries)
+            s = results[name]
+            print(f"{name:>18} {s['mean_ms']:>10.1f} {s['p95_ms']:>10.1f} {s['queries_per_call']:>9}")
+
+        print(f"{'scenario':>18} {'mean ms':>10} {'p95 ms':>10} {'queries':>9}")
+        timed("list_cases", lambda i: client.get(f"/api/suites/{suites[i % len(suites)]}/cases"))
+        timed("cases_page", lambda i: client.get(f"/api/suites/{suites[i % len(suites)]}/cases/page",
+                                                  params={"limit": 100}))
+        timed("suite_summary", lambda i: client.get(f"/api/suites/{suites[i % len(suites)]}/summary"))
+        timed("summary_rollup", lambda i: client.get("/api/summary"))
+        timed("case_detail", lambda i: client.get(f"/api/cases/{rnd.choice(case_ids)}"))
+        middle = START + timedelta(days=args.executions // 2)
+        timed("transitions", lambda i: client.get(f"/api/suites/{suites[i % len(suites)]}/analytics/transitions",
+                                                   params={"since": middle.isoformat()}))
+        timed("flaky_cases", lambda i: client.get(f"/api/suites/{suites[i % len(suites)]}/analytics/flaky"))
+
+        def upload(i):
+            name = f"bench upload {i}"
+            r = client.post("/api/testcases/upload",
+                            files={"file": ("bench.csv", upload_csv(args.upload_rows, name), "text/csv")})
+            created_suites.append(name)
+            return r
+        timed("upload", upload)
+
+        def batch(i):
+            records = [{"case_id": rnd.choice(case_ids), "status": rnd.choice(STATUSES)}
+                       for _ in range(args.batch_size)]
+            return client.post("/api/executions/batch", json=records)
+        timed("batch_executions", batch)
+
+        runs = []
+
+        def start_run(i):
+            r = client.post(f"/api/suites/{suites[i % len(suites)]}/runs", params={"name": f"bench run {i}"})
+            runs.append(r.json()["id"])
+            return r
+        timed("create_run", start_run)
+
+        def run_results(i):
+            run_id = runs[i % len(runs)]
+            run_cases = client.get(f"/api/runs/{run_id}/cases", params={"limit": args.batch_size}).json()["cases"]
+            records = [{"case_id": c["test_case_id"], "status": rnd.choice(STATUSES)} for c in run_cases]
+            return client.post(f"/api/runs/{run_id}/results", json=records)
+        timed("run_results", run_results)
+        #runs i and i + len(suites) are on the same suite
+        timed("run_compare", lambda i: client.get("/api/runs/compare", params={
+            "base": runs[i % len(runs)], "head": runs[(i + len(suites)) % len(runs)]}))
+
+        ids = {s["suite_name"]: s["id"] for s in client.get("/api/suites").json()}
+        upload_ids = [ids[n] for n in created_suites]
+        timed("delete_suite", lambda i: client.delete(f"/api/suites/{upload_ids[i]}"))
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+            "dataset": {k: (len(v) if isinstance(v, list) else v) for k, v in data.items()},
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nagainst {baseline['meta'].get('commit')} ({baseline_path})")
+    print(f"{'scenario':>18} {'before ms':>10} {'after ms':>10} {'change':>8}")
+    for name, s in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            continue
+        change = (s["mean_ms"] - old["mean_ms"]) / old["mean_ms"] * 100 if old["mean_ms"] else 0
+        print(f"{name:>18} {old['mean_ms']:>10.1f} {s['mean_ms']:>10.1f} {change:>+7.0f}%")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--projects", type=int, default=1)
+    ap.add_argument("--suites", type=int, default=10, help="suites per project")
+    ap.add_argument("--cases", type=int, default=1000, help="cases per suite")
+    ap.add_argument("--executions", type=int, default=10, help="executions per case")
+    ap.add_argument("--repeat", type=int, default=10, help="calls per scenario")
+    ap.add_argument("--upload-rows", type=int, default=1000)
+    ap.add_argument("--batch-size", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--cache", action="store_true", help="keep the response cache on")
+    ap.add_argument("-o", "--output", default="bench-results.json")
+    ap.add_argument("--compare", help="previous result file")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DB_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        if not args.cache:
+            os.environ["CACHE_BACKEND"] = "none"
+        out = run(args)
+
+    with open(args.output, "w") as f:
+        json.dump(out, f, indent=2)
+    print(f"results written to {args.output}")
+    if args.compare:
+        compare(out, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+gunicorn settings for running the backend with several worker processes.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+WEB_CONCURRENCY sets the number of workers (see app/config.py). Each worker is a
+separate process with its own connection pool, response cache, event buffers
+and background job thread; startup work is serialized with a lock
+(app/locks.py) and the retention timer runs in one worker only.
+
+The default is 1 worker. The response cache, the event sequence behind
+/api/suites/{id}/events and the /metrics counters are not shared between
+processes yet. With more workers the cache is off, a client polling events only
+sees the writes its own worker handled (the Streamlit grid misses the others), and
+each /metrics scrape shows one worker. Raise it for API-only traffic.
+
+SQLite: works with several workers in WAL mode (the default SQLITE_JOURNAL_MODE),
+readers run in parallel and writes queue on the database lock for up to
+SQLITE_BUSY_TIMEOUT_MS. For write-heavy loads point DB_URL at Postgres.
+"""
+from app import config
+
+bind = config.WEB_BIND
+workers = config.WEB_CONCURRENCY
+worker_class = "uvicorn_worker.UvicornWorker"
+timeout = config.WEB_TIMEOUT
+graceful_timeout = 30
+keepalive = 5
+#every worker must open its own database connections, so the app is not loaded before the fork
+preload_app = False
+accesslog = "-"
+loglevel = config.LOG_LEVEL.lower()
+
+if workers > 1 and config.DB_URL.startswith("sqlite") and config.SQLITE_JOURNAL_MODE.upper() != "WAL":
+    raise RuntimeError("Several workers on SQLite need SQLITE_JOURNAL_MODE=WAL")
+if workers > 1 and config.DB_URL in ("sqlite://", "sqlite:///:memory:"):
+    raise RuntimeError("An in-memory SQLite database can't be shared between workers")
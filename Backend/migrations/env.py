@@ -0,0 +1,53 @@
+"""
+Alembic environment. The app passes its open connection in
+config.attributes["connection"] (app/schema.py run_migrations); the alembic
+command line connects to DB_URL itself. Either way the projections a revision
+added are backfilled before the transaction commits.
+"""
+from logging.config import fileConfig
+from alembic import context
+from app.db import Base, build_engine
+from app import config as app_config
+from app import models  # noqa: F401, registers the tables on Base.metadata
+from app.schema import backfill_projections
+from app.search import is_search_object
+
+config = context.config
+target_metadata = Base.metadata
+
+def include_object(obj, name, type_, reflected, compare_to):
+    #the search index isn't in the models, autogenerate must not drop it
+    return not (reflected and compare_to is None and is_search_object(name, type_))
+
+def run(connection):
+    context.configure(connection=connection, target_metadata=target_metadata,
+                      include_object=include_object,
+                      render_as_batch=connection.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+        backfill_projections(connection, config.attributes.get("added", []))
+
+def run_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run(connection)
+        return
+    if config.config_file_name:
+        fileConfig(config.config_file_name, disable_existing_loggers=False)
+    engine = build_engine(app_config.DB_URL)
+    try:
+        with engine.begin() as connection:
+            run(connection)
+    finally:
+        engine.dispose()
+
+def run_offline():
+    context.configure(url=app_config.DB_URL, target_metadata=target_metadata, literal_binds=True,
+                      include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_offline()
+else:
+    run_online()
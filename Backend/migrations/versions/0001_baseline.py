@@ -0,0 +1,153 @@
+"""baseline: the schema before migrations
+
+The tables as they were when migrations were introduced, written out here so the
+revision never changes with the models; later model changes get their own
+revisions. An empty database gets every table. A database from before migrations
+(create_all plus the old startup upgrade) gets the tables it lacks and the columns
+that were added to the models over time, so it ends up at the same schema.
+Idempotent.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+import sqlalchemy as sa
+from alembic import op, context
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def tables():
+    """(name, columns) in creation order; new Column objects on every call."""
+    return [
+        ("projects", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False, unique=True),
+        ]),
+        ("test_suites", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id", ondelete="CASCADE"), nullable=True),
+            sa.Column("name", sa.String(), nullable=False),
+        ]),
+        ("test_cases", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("suite_id", sa.Integer(), sa.ForeignKey("test_suites.id", ondelete="CASCADE"), nullable=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("priority", sa.String(), nullable=True),
+            sa.Column("steps", sa.JSON(), nullable=True),
+            sa.Column("latest_execution_id", sa.Integer(), nullable=True),
+            sa.Column("latest_status", sa.String(), nullable=True),
+            sa.Column("latest_comment", sa.Text(), nullable=True),
+            sa.Column("latest_executed_at", sa.DateTime(), nullable=True),
+        ]),
+        ("suite_status_counts", [
+            sa.Column("suite_id", sa.Integer(), sa.ForeignKey("test_suites.id", ondelete="CASCADE"),
+                      primary_key=True),
+            sa.Column("status", sa.String(), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        ]),
+        ("test_runs", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id", ondelete="CASCADE"), nullable=True),
+            sa.Column("suite_id", sa.Integer(), sa.ForeignKey("test_suites.id", ondelete="CASCADE"), nullable=True),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("environment", sa.String(), nullable=True),
+            sa.Column("executed_by", sa.String(), nullable=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("started_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+        ]),
+        ("test_executions", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("test_case_id", sa.Integer(), sa.ForeignKey("test_cases.id", ondelete="CASCADE"),
+                      nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("comment", sa.Text(), nullable=True),
+            sa.Column("executed_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("run_id", sa.Integer(), sa.ForeignKey("test_runs.id", ondelete="SET NULL"), nullable=True),
+        ]),
+        ("execution_daily_rollups", [
+            sa.Column("test_case_id", sa.Integer(), sa.ForeignKey("test_cases.id", ondelete="CASCADE"),
+                      primary_key=True),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("status", sa.String(), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        ]),
+        ("test_run_cases", [
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("run_id", sa.Integer(), sa.ForeignKey("test_runs.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("test_case_id", sa.Integer(), sa.ForeignKey("test_cases.id", ondelete="SET NULL"),
+                      nullable=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("priority", sa.String(), nullable=True),
+            sa.Column("status", sa.String(), nullable=True),
+            sa.Column("comment", sa.Text(), nullable=True),
+            sa.Column("execution_id", sa.Integer(), nullable=True),
+            sa.Column("executed_at", sa.DateTime(), nullable=True),
+        ]),
+        ("test_run_status_counts", [
+            sa.Column("run_id", sa.Integer(), sa.ForeignKey("test_runs.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("status", sa.String(), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        ]),
+        ("import_jobs", [
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("kind", sa.String(), nullable=True),
+            sa.Column("filename", sa.String(), nullable=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("rows_parsed", sa.Integer(), nullable=False),
+            sa.Column("rows_inserted", sa.Integer(), nullable=False),
+            sa.Column("rows_deleted", sa.Integer(), nullable=True),
+            sa.Column("rows_per_sec", sa.Float(), nullable=True),
+            sa.Column("errors", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+        ]),
+    ]
+
+INDEXES = [
+    ("ix_projects_id", "projects", ["id"], False),
+    ("ix_test_suites_id", "test_suites", ["id"], False),
+    ("ix_test_cases_id", "test_cases", ["id"], False),
+    ("ix_test_cases_suite_id", "test_cases", ["suite_id", "id"], False),
+    ("ix_test_cases_suite_latest_status", "test_cases", ["suite_id", "latest_status"], False),
+    ("ix_test_runs_id", "test_runs", ["id"], False),
+    ("ix_test_runs_suite_id", "test_runs", ["suite_id", "id"], False),
+    ("ix_test_executions_id", "test_executions", ["id"], False),
+    ("ix_test_executions_case_executed", "test_executions", ["test_case_id", sa.text("executed_at DESC")], False),
+    ("ix_test_run_cases_id", "test_run_cases", ["id"], False),
+    ("ix_test_run_cases_run_case", "test_run_cases", ["run_id", "test_case_id"], True),
+]
+
+
+def upgrade():
+    insp = sa.inspect(op.get_bind())
+    existing = set(insp.get_table_names())
+    added = []
+    for name, columns in tables():
+        if name not in existing:
+            op.create_table(name, *columns)
+            added.append(name)
+            continue
+        have = {c["name"] for c in insp.get_columns(name)}
+        for col in columns:
+            if col.name not in have:
+                #type only: SQLite can't add constraints to an existing table
+                op.add_column(name, sa.Column(col.name, col.type, nullable=True))
+                added.append(f"{name}.{col.name}")
+    for name, table, columns, unique in INDEXES:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+    #env.py backfills the projections for what was added
+    context.config.attributes.setdefault("added", []).extend(added)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+    for name, _ in reversed(tables()):
+        op.drop_table(name)
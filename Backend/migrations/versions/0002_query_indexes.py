@@ -0,0 +1,39 @@
+"""indexes for the lookup and delete paths
+
+test_suites.name       suite lookup by name on every upload
+test_suites.project_id project summaries and project deletes
+test_executions.executed_at  time range queries over the whole history
+test_executions.run_id detaching executions when a run is deleted
+test_runs.project_id   project deletes
+test_run_cases.test_case_id  detaching run snapshots when cases are deleted
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_test_suites_name", "test_suites", ["name"]),
+    ("ix_test_suites_project_id", "test_suites", ["project_id"]),
+    ("ix_test_executions_executed_at", "test_executions", ["executed_at"]),
+    ("ix_test_executions_run_id", "test_executions", ["run_id"]),
+    ("ix_test_runs_project_id", "test_runs", ["project_id"]),
+    ("ix_test_run_cases_case_id", "test_run_cases", ["test_case_id"]),
+]
+
+
+def upgrade():
+    #if_not_exists: a database the baseline just created from the models has them already
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
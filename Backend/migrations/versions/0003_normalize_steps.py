@@ -0,0 +1,57 @@
+"""normalize test_cases.steps written before it held the step list
+
+Uploads stored steps as free text, and the old defaults were "" or "[]"; the app
+now stores [{"no": 1, "action": "...", "expected": ...}, ...]. Rows still in an
+old shape are rewritten once here instead of being scanned for on every start.
+The filter compares the column cast to text so it works on a Postgres json
+column as well as SQLite.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+import json
+import sqlalchemy as sa
+from alembic import op
+from app.utils import normalize_steps
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+cases = sa.table("test_cases", sa.column("id", sa.Integer), sa.column("steps", sa.JSON))
+
+def _raw(text):
+    #Postgres returns a json string value quoted, SQLite the text as it was stored
+    if text.startswith('"'):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+    return text
+
+
+def upgrade():
+    conn = op.get_bind()
+    raw = sa.cast(cases.c.steps, sa.Text)
+    old = (sa.select(cases.c.id, raw.label("steps"))
+           .where(cases.c.id > sa.bindparam("after"), cases.c.steps.is_not(None),
+                  raw.not_like("[{%"), raw.not_in(["[]", "null"]))
+           .order_by(cases.c.id).limit(BATCH_SIZE))
+    rewrite = (cases.update().where(cases.c.id == sa.bindparam("case_id"))
+               .values(steps=sa.bindparam("new_steps", type_=sa.JSON)))
+    after = 0
+    while True:
+        rows = conn.execute(old, {"after": after}).all()
+        if not rows:
+            return
+        conn.execute(rewrite, [{"case_id": r.id, "new_steps": normalize_steps(_raw(r.steps))} for r in rows])
+        after = rows[-1].id
+
+
+def downgrade():
+    #the free text the steps came from isn't kept, the normalized lists stay
+    pass
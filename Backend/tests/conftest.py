@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.db import build_engine
+from app.schema import run_migrations
+
+@pytest.fixture
+def engine(tmp_path):
+    #a file database, so sessions on several threads share it like the app's pool does
+    eng = build_engine(f"sqlite:///{tmp_path / 'test.sqlite'}")
+    run_migrations(eng)
+    yield eng
+    eng.dispose()
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+@pytest.fixture
+def make_suite():
+    """make_suite(db, name, n) -> (suite_id, [case ids]): a project and suite with n cases."""
+    from app import crud, models
+
+    def make(db, name, n=0):
+        project = models.Project(name=name)
+        db.add(project)
+        db.flush()
+        suite = models.TestSuite(project_id=project.id, name=name)
+        db.add(suite)
+        db.commit()
+        return suite.id, [crud.create_test_case(db, suite.id, f"{name} {i}").id for i in range(n)]
+    return make
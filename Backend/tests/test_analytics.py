@@ -0,0 +1,28 @@
+from datetime import datetime
+from app import analytics, crud, models
+
+def test_transitions_bucket_blank_and_null_statuses_as_not_started(db, make_suite):
+    suite_id, (a, b, c) = make_suite(db, "analytics", 3)
+    crud.record_executions(db, [{"case_id": a, "status": "PASS", "executed_at": datetime(2024, 5, 1)},
+                                {"case_id": a, "status": "FAIL", "executed_at": datetime(2024, 5, 3)},
+                                {"case_id": b, "status": "PASS", "executed_at": datetime(2024, 5, 3)}])
+    #rows written by old clients: "null" in the history and in the projection
+    db.add(models.TestExecution(test_case_id=c, status="null", executed_at=datetime(2024, 5, 1)))
+    db.get(models.TestCase, c).latest_status = "null"
+    db.commit()
+    result = analytics.status_transitions(db, suite_id, since=datetime(2024, 5, 2))
+    pairs = {(t["from_status"], t["to_status"]): t["count"] for t in result["transitions"]}
+    assert pairs == {("PASS", "FAIL"): 1, ("NOT STARTED", "PASS"): 1, ("NOT STARTED", "NOT STARTED"): 1}
+    #the regression comes first
+    assert [ch["case_id"] for ch in result["changed"]] == [a, b]
+    assert result["changed_total"] == 2
+
+def test_flaky_counts_flips_in_id_order_for_tied_timestamps(db, make_suite):
+    suite_id, (flaky, stable) = make_suite(db, "analytics", 2)
+    at = datetime(2024, 5, 1, 9)
+    crud.record_executions(db, [{"case_id": flaky, "status": st, "executed_at": at}
+                                for st in ("PASS", "FAIL", "PASS", "IN PROGRESS", "FAIL")])
+    crud.record_executions(db, [{"case_id": stable, "status": "PASS", "executed_at": at}] * 4)
+    result = analytics.flaky_cases(db, suite_id)
+    assert [(c["case_id"], c["executions"], c["flips"], c["score"]) for c in result["cases"]] == [(flaky, 4, 3, 1.0)]
+    assert result["cases"][0]["pass_rate"] == 0.5
@@ -0,0 +1,14 @@
+from app.cache import MemoryCache
+
+def test_set_skipped_when_invalidated_while_building():
+    cache = MemoryCache(ttl=60, max_entries=10)
+    generation = cache.generation(["suite:1"])
+    #a write commits and invalidates while the old result is being built
+    cache.invalidate("suite:1")
+    cache.set("suite:1:summary", "old body", ["suite:1"], generation)
+    assert cache.get("suite:1:summary") is None
+
+    generation = cache.generation(["suite:1"])
+    cache.invalidate("suite:2")
+    cache.set("suite:1:summary", "body", ["suite:1"], generation)
+    assert cache.get("suite:1:summary") == "body"
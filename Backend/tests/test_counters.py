@@ -0,0 +1,71 @@
+import threading
+from app import crud
+from app import models, runs
+
+STATUSES = ("PASS", "FAIL", "BLOCKER", "IN PROGRESS")
+
+def _suite_with_cases(db, n):
+    project = models.Project(name="counters")
+    db.add(project)
+    db.flush()
+    suite = models.TestSuite(project_id=project.id, name="counters")
+    db.add(suite)
+    db.commit()
+    return suite.id, [crud.create_test_case(db, suite.id, f"case {i}").id for i in range(n)]
+
+def _hammer(session_factory, record, threads=8, per_thread=40):
+    errors = []
+
+    def work(t):
+        db = session_factory()
+        try:
+            for i in range(per_thread):
+                record(db, t, i)
+        except Exception as e:  # surfaced by the assert below
+            errors.append(e)
+        finally:
+            db.close()
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert errors == []
+
+def test_concurrent_single_results_keep_counters(session_factory):
+    db = session_factory()
+    suite_id, case_ids = _suite_with_cases(db, 3)
+    _hammer(session_factory, lambda s, t, i: crud.insert_execution(
+        s, case_ids[(t + i) % len(case_ids)], STATUSES[(t * 7 + i) % len(STATUSES)], None))
+    db.expire_all()
+    assert crud.check_suite_counters(db, suite_id) == []
+    assert crud.check_latest_status(db, suite_id) == []
+    assert sum(crud.compute_suite_summary_using_latest(db, suite_id).values()) == len(case_ids)
+    db.close()
+
+def test_concurrent_batches_keep_counters(session_factory):
+    db = session_factory()
+    suite_id, case_ids = _suite_with_cases(db, 3)
+    _hammer(session_factory, lambda s, t, i: crud.record_executions(
+        s, [{"case_id": cid, "status": STATUSES[(t + i + k) % len(STATUSES)]} for k, cid in enumerate(case_ids)]),
+        per_thread=15)
+    db.expire_all()
+    assert crud.check_suite_counters(db, suite_id) == []
+    assert crud.check_latest_status(db, suite_id) == []
+    assert sum(crud.compute_suite_summary_using_latest(db, suite_id).values()) == len(case_ids)
+    db.close()
+
+def test_concurrent_run_results_keep_run_counters(session_factory):
+    db = session_factory()
+    suite_id, case_ids = _suite_with_cases(db, 3)
+    run_id = runs.create_run(db, suite_id)["id"]
+    _hammer(session_factory, lambda s, t, i: runs.record_run_results(
+        s, run_id, [{"case_id": case_ids[(t + i) % len(case_ids)], "status": STATUSES[(t * 7 + i) % len(STATUSES)]}]))
+    db.expire_all()
+    counts = runs.get_run_summary(db, run_id)["counts"]
+    assert sum(counts.values()) == len(case_ids)
+    statuses = [c["status"] or "NOT STARTED" for c in runs.get_run_cases_page(db, run_id)["cases"]]
+    assert counts == {st: statuses.count(st) for st in set(statuses)}
+    assert crud.check_suite_counters(db, suite_id) == []
+    db.close()
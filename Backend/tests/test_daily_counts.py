@@ -0,0 +1,23 @@
+from datetime import date, datetime
+from app import crud, models
+
+def test_rollups_and_raw_rows_share_the_until_boundary(session_factory):
+    db = session_factory()
+    project = models.Project(name="daily")
+    db.add(project)
+    db.flush()
+    suite = models.TestSuite(project_id=project.id, name="daily")
+    db.add(suite)
+    db.commit()
+    case_id = crud.create_test_case(db, suite.id, "case").id
+    #May 2 has purged history in a rollup and a live row, May 1 only a rollup
+    db.add_all([models.ExecutionDailyRollup(test_case_id=case_id, day=date(2024, 5, 1), status="PASS", count=2),
+                models.ExecutionDailyRollup(test_case_id=case_id, day=date(2024, 5, 2), status="PASS", count=3)])
+    db.commit()
+    crud.record_executions(db, [{"case_id": case_id, "status": "FAIL", "executed_at": datetime(2024, 5, 2, 9)}])
+
+    midnight = crud.get_execution_daily_counts(db, case_id, until=datetime(2024, 5, 2))
+    assert midnight == [{"day": "2024-05-01", "PASS": 2}]
+    noon = crud.get_execution_daily_counts(db, case_id, until=datetime(2024, 5, 2, 12))
+    assert noon == [{"day": "2024-05-01", "PASS": 2}, {"day": "2024-05-02", "PASS": 3, "FAIL": 1}]
+    db.close()
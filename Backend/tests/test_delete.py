@@ -0,0 +1,29 @@
+from sqlalchemy import func, select
+from app import crud, models, runs
+
+def test_batched_delete_removes_history_and_keeps_run_snapshots(db, make_suite):
+    suite_id, case_ids = make_suite(db, "delete", 5)
+    run_id = runs.create_run(db, suite_id)["id"]
+    runs.record_run_results(db, run_id, [{"case_id": case_ids[0], "status": "PASS"}])
+    crud.record_executions(db, [{"case_id": cid, "status": "FAIL"} for cid in case_ids])
+    batches = []
+    assert crud.delete_cases_in_batches(db, [suite_id], 2, batches.append) == 5
+    assert batches == [2, 4, 5]
+    assert db.scalar(select(func.count()).select_from(models.TestExecution)) == 0
+    snapshot = {c["title"]: c for c in runs.get_run_cases_page(db, run_id)["cases"]}
+    assert snapshot["delete 0"]["status"] == "PASS" and snapshot["delete 0"]["test_case_id"] is None
+    assert db.scalar(select(func.count()).select_from(models.SuiteStatusCount)) == 0
+
+def test_results_recorded_during_the_delete_leave_no_phantom_counters(session_factory, db, make_suite):
+    suite_id, case_ids = make_suite(db, "delete", 6)
+    other = session_factory()
+
+    def record_on_last(deleted):
+        #another request records a result on a case a later batch removes
+        crud.insert_execution(other, case_ids[-1], "PASS", None)
+
+    crud.delete_cases_in_batches(db, [suite_id], 2, record_on_last)
+    other.close()
+    db.expire_all()
+    assert crud.check_suite_counters(db, suite_id) == []
+    assert crud.compute_suite_summary_using_latest(db, suite_id) == {}
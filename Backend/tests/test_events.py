@@ -0,0 +1,18 @@
+import asyncio
+from app.events import EventBus
+
+def test_slow_subscriber_gets_a_reload_instead_of_losing_events():
+    bus = EventBus(buffer_size=3)
+
+    async def run():
+        entry = bus.subscribe(1)
+        for i in range(5):
+            bus.publish(1, {"type": "case", "case_id": i})
+        await asyncio.sleep(0)  # let the threadsafe callbacks run
+        queue = entry[1]
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    received = asyncio.run(run())
+    #3 fit, the 4th overflowed into a reload marker, the 5th follows it
+    assert [(e["seq"], e["type"]) for e in received] == [(4, "reload"), (5, "case")]
+    assert received[0]["reason"] == "missed events"
@@ -0,0 +1,5 @@
+from app.explain import check_plans
+
+def test_hot_paths_use_indexes():
+    problems = check_plans(out=lambda line: None)
+    assert problems == [], [f"{p['path']}: {p['tables']} {p['sql']}" for p in problems]
@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from app import crud, export
+from app.db import get_db
+from app.main import app
+
+def _exported(monkeypatch, session_factory, fn, suite_id, **kwargs):
+    monkeypatch.setattr(export, "SessionLocal", session_factory)
+    return "".join(fn(suite_id, **kwargs))
+
+def test_ndjson_nests_each_case_history(monkeypatch, session_factory, db, make_suite):
+    suite_id, (a, b, c) = make_suite(db, "export", 3)
+    crud.record_executions(db, [{"case_id": a, "status": "FAIL", "executed_at": datetime(2024, 5, 1, 9)},
+                                {"case_id": c, "status": "PASS", "executed_at": datetime(2024, 5, 1, 10)},
+                                {"case_id": a, "status": "PASS", "executed_at": datetime(2024, 5, 2, 9)}])
+    lines = _exported(monkeypatch, session_factory, export.iter_suite_ndjson, suite_id).splitlines()
+    items = [json.loads(line) for line in lines]
+    assert [i["id"] for i in items] == [a, b, c]
+    assert [e["status"] for e in items[0]["executions"]] == ["FAIL", "PASS"]
+    assert items[1]["executions"] == [] and [e["status"] for e in items[2]["executions"]] == ["PASS"]
+
+def test_since_until_accept_aware_datetimes(monkeypatch, session_factory, db, make_suite):
+    suite_id, (a,) = make_suite(db, "export", 1)
+    crud.record_executions(db, [{"case_id": a, "status": "FAIL", "executed_at": datetime(2024, 5, 1, 9)},
+                                {"case_id": a, "status": "PASS", "executed_at": datetime(2024, 5, 1, 11)}])
+    #10:30 at UTC+2 is 08:30 UTC, so both rows are after it; until 11:00 UTC+0 excludes the second
+    since = datetime(2024, 5, 1, 10, 30, tzinfo=timezone(timedelta(hours=2)))
+    body = _exported(monkeypatch, session_factory, export.iter_suite_csv, suite_id,
+                     since=since, until=datetime(2024, 5, 1, 11, tzinfo=timezone.utc))
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert [(r["case_id"], r["status"]) for r in rows] == [(str(a), "FAIL")]
+
+def test_csv_keeps_cases_without_history(monkeypatch, session_factory, db, make_suite):
+    suite_id, (a, b) = make_suite(db, "export", 2)
+    crud.record_executions(db, [{"case_id": b, "status": "PASS"}, {"case_id": b, "status": "FAIL"}])
+    rows = list(csv.DictReader(io.StringIO(_exported(monkeypatch, session_factory, export.iter_suite_csv, suite_id))))
+    assert [(r["case_id"], r["status"]) for r in rows] == [(str(a), ""), (str(b), "PASS"), (str(b), "FAIL")]
+    cases_only = _exported(monkeypatch, session_factory, export.iter_suite_csv, suite_id, executions=False)
+    assert len(cases_only.splitlines()) == 3
+
+def test_unknown_suite_is_404(session_factory):
+    def override():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    app.dependency_overrides[get_db] = override
+    try:
+        assert TestClient(app).get("/api/suites/999/export").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
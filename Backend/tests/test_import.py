@@ -0,0 +1,53 @@
+import io
+import pytest
+from sqlalchemy import func, select
+from app import crud, models
+from app.importer import import_testcases, ImportFailed
+from app.utils import iter_testcase_rows
+
+CSV = b"""Title,Description,Priority,Steps,Suite
+Login,Signs in,High,"1. Open -> Shown
+2. Submit",Auth
+,no title,,,Auth
+Logout,,Low,,
+Pay,,,,Checkout
+"""
+
+def _count(db, model):
+    return db.scalar(select(func.count()).select_from(model))
+
+def test_streamed_csv_import_resolves_and_creates_suites(db, make_suite):
+    default_id, _ = make_suite(db, "Default Suite")
+    auth_id, _ = make_suite(db, "Auth")
+    chunks = []
+    report = import_testcases(db, iter_testcase_rows(io.BytesIO(CSV), "cases.csv"), chunk_size=2,
+                              on_chunk=lambda _db, parsed, inserted: chunks.append((parsed, inserted)))
+    assert (report["parsed"], report["inserted"], report["skipped"]) == (4, 3, 1)
+    assert report["suites_created"] == ["Checkout"] and chunks == [(2, 1), (4, 3)]
+    login = db.scalars(select(models.TestCase).where(models.TestCase.title == "Login")).one()
+    assert login.suite_id == auth_id and login.priority == "High"
+    assert login.steps == [{"no": 1, "action": "Open", "expected": "Shown"},
+                           {"no": 2, "action": "Submit", "expected": None}]
+    assert crud.compute_suite_summary_using_latest(db, default_id) == {"NOT STARTED": 1}
+    assert crud.check_suite_counters(db) == []
+
+def test_missing_title_column_is_rejected():
+    with pytest.raises(ValueError):
+        iter_testcase_rows(io.BytesIO(b"Name,Priority\nx,High\n"), "cases.csv")
+
+def _failing_rows():
+    yield {"title": "kept"}
+    yield {"title": "boom", "description": object()}  # the driver can't bind it, fails in the database
+
+def test_atomic_import_rolls_back_everything(db, make_suite):
+    make_suite(db, "Default Suite")
+    with pytest.raises(ImportFailed) as err:
+        import_testcases(db, _failing_rows(), chunk_size=1)
+    assert err.value.inserted == 0 and _count(db, models.TestCase) == 0
+
+def test_chunked_import_keeps_committed_chunks(db, make_suite):
+    make_suite(db, "Default Suite")
+    with pytest.raises(ImportFailed) as err:
+        import_testcases(db, _failing_rows(), chunk_size=1, atomic=False)
+    assert err.value.inserted == 1 and _count(db, models.TestCase) == 1
+    assert crud.check_suite_counters(db) == []
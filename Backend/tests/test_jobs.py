@@ -0,0 +1,21 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app import jobs, models
+
+def test_shutdown_marks_jobs_that_never_started_failed(monkeypatch, session_factory, db, make_suite):
+    suite_id, _ = make_suite(db, "jobs", 2)
+    monkeypatch.setattr(jobs, "SessionLocal", session_factory)
+    monkeypatch.setattr(jobs, "_executor", ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(jobs, "_queued", {})
+    release = threading.Event()
+    jobs._executor.submit(release.wait)  # keeps the one worker busy
+    job_ids = [jobs.submit_delete("delete_cases", suite_id) for _ in range(2)]
+
+    jobs.shutdown_jobs()
+    release.set()
+    db.expire_all()
+    for job_id in job_ids:
+        job = jobs.get_job(db, job_id)
+        assert job["status"] == "failed" and job["finished_at"] is not None
+        assert job["errors"] == ["cancelled: the server shut down before the job started"]
+    assert len(db.query(models.TestCase).all()) == 2
@@ -0,0 +1,40 @@
+import io
+from datetime import datetime
+import pytest
+from app.utils import parse_junit_xml
+
+REPORT = b"""<?xml version="1.0"?>
+<testsuites>
+  <testsuite name="api" timestamp="2024-05-01T09:30:00">
+    <testcase name="Login works"/>
+    <testcase name="42"><failure message="expected 200">trace</failure></testcase>
+    <testcase name="Checkout">
+      <properties><property name="case_id" value="7"/></properties>
+      <error>boom</error>
+    </testcase>
+    <testcase name="Later"><skipped/></testcase>
+  </testsuite>
+</testsuites>
+"""
+
+def test_testcases_become_records():
+    records = parse_junit_xml(io.BytesIO(REPORT))
+    assert [(r["case_id"], r["title"], r["status"], r["comment"]) for r in records] == [
+        (None, "Login works", "PASS", None),
+        (42, "42", "FAIL", "expected 200"),
+        (7, "Checkout", "FAIL", "boom"),
+    ]
+    assert {r["executed_at"] for r in records} == {datetime(2024, 5, 1, 9, 30)}
+
+def test_entity_expansion_is_refused():
+    bomb = b"""<?xml version="1.0"?>
+<!DOCTYPE lolz [<!ENTITY lol "lol"><!ENTITY lol2 "&lol;&lol;&lol;&lol;">]>
+<testsuite><testcase name="&lol2;"/></testsuite>
+"""
+    with pytest.raises(ValueError):
+        parse_junit_xml(io.BytesIO(bomb))
+
+def test_malformed_report_is_a_syntax_error():
+    #the upload endpoint turns ValueError and SyntaxError into a 400
+    with pytest.raises(SyntaxError):
+        parse_junit_xml(io.BytesIO(b"<testsuite><testcase></testsuite>"))
@@ -0,0 +1,97 @@
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect, text
+from app.db import Base, build_engine
+from app.schema import alembic_config, run_migrations, current_revision
+from app import crud, models  # noqa: F401, registers the tables
+from app.search import ensure_search_index
+from sqlalchemy.orm import Session
+
+def test_head_matches_models(engine):
+    #a model change without its own revision shows up here
+    with engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    assert diff == []
+
+def test_autogenerate_leaves_search_index_alone(engine):
+    #alembic check autogenerates through env.py; without its filter the FTS objects are "removed"
+    assert ensure_search_index(engine)
+    cfg = alembic_config()
+    with engine.begin() as conn:
+        cfg.attributes["connection"] = conn
+        command.check(cfg)
+
+def test_upgrade_stops_at_revision(tmp_path):
+    eng = build_engine(f"sqlite:///{tmp_path / 'rev.sqlite'}")
+    try:
+        run_migrations(eng, "0001")
+        assert current_revision(eng) == "0001"
+        assert "ix_test_suites_name" not in {i["name"] for i in inspect(eng).get_indexes("test_suites")}
+        assert run_migrations(eng) == []
+        assert current_revision(eng) == "0003"
+    finally:
+        eng.dispose()
+
+def test_baseline_upgrades_database_from_before_migrations(tmp_path):
+    eng = build_engine(f"sqlite:///{tmp_path / 'old.sqlite'}")
+    try:
+        with eng.begin() as conn:
+            conn.execute(text("CREATE TABLE projects (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE)"))
+            conn.execute(text("CREATE TABLE test_suites (id INTEGER PRIMARY KEY, project_id INTEGER, name VARCHAR)"))
+            conn.execute(text("CREATE TABLE test_cases (id INTEGER PRIMARY KEY, suite_id INTEGER, "
+                              "title VARCHAR NOT NULL, description TEXT, priority VARCHAR, steps TEXT)"))
+            conn.execute(text("CREATE TABLE test_executions (id INTEGER PRIMARY KEY, test_case_id INTEGER NOT NULL, "
+                              "status VARCHAR NOT NULL, comment TEXT, executed_at DATETIME)"))
+        added = run_migrations(eng)
+        assert "test_cases.latest_status" in added and "suite_status_counts" in added
+        assert "test_executions.run_id" in added
+        assert current_revision(eng) == "0003"
+    finally:
+        eng.dispose()
+
+def _old_database_with_executions(eng):
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE test_suites (id INTEGER PRIMARY KEY, project_id INTEGER, name VARCHAR)"))
+        conn.execute(text("CREATE TABLE test_cases (id INTEGER PRIMARY KEY, suite_id INTEGER, "
+                          "title VARCHAR NOT NULL, description TEXT, priority VARCHAR, steps TEXT)"))
+        conn.execute(text("CREATE TABLE test_executions (id INTEGER PRIMARY KEY, test_case_id INTEGER NOT NULL, "
+                          "status VARCHAR NOT NULL, comment TEXT, executed_at DATETIME)"))
+        conn.execute(text("INSERT INTO test_suites VALUES (1, NULL, 's')"))
+        conn.execute(text("INSERT INTO test_cases (id, suite_id, title) VALUES (1, 1, 'a'), (2, 1, 'b')"))
+        conn.execute(text("INSERT INTO test_executions VALUES (1, 1, 'FAIL', NULL, '2026-01-01 10:00:00'), "
+                          "(2, 1, 'PASS', NULL, '2026-01-02 10:00:00')"))
+
+def test_alembic_upgrade_backfills_projections(tmp_path):
+    #the alembic command, not run_migrations: the backfill can't depend on who upgrades
+    eng = build_engine(f"sqlite:///{tmp_path / 'old.sqlite'}")
+    try:
+        _old_database_with_executions(eng)
+        cfg = alembic_config()
+        with eng.begin() as conn:
+            cfg.attributes["connection"] = conn
+            command.upgrade(cfg, "head")
+        with Session(eng) as db:
+            assert db.get(models.TestCase, 1).latest_status == "PASS"
+            assert crud.compute_suite_summary_using_latest(db, 1) == {"PASS": 1, "NOT STARTED": 1}
+            assert crud.check_latest_status(db) == [] and crud.check_suite_counters(db) == []
+    finally:
+        eng.dispose()
+
+def test_upgrade_normalizes_old_steps(tmp_path):
+    eng = build_engine(f"sqlite:///{tmp_path / 'old.sqlite'}")
+    try:
+        _old_database_with_executions(eng)
+        with eng.begin() as conn:
+            conn.execute(text("INSERT INTO test_cases (id, suite_id, title, steps) VALUES "
+                              "(3, 1, 'c', '1. Open page -> Page shown\n2. Log in'), (4, 1, 'd', ''), "
+                              "(5, 1, 'e', '[]'), (6, 1, 'f', '[{\"no\": 1, \"action\": \"Go\", \"expected\": null}]')"))
+        run_migrations(eng)
+        with Session(eng) as db:
+            steps = {c.id: c.steps for c in db.query(models.TestCase).filter(models.TestCase.id >= 3)}
+        assert steps[3] == [{"no": 1, "action": "Open page", "expected": "Page shown"},
+                            {"no": 2, "action": "Log in", "expected": None}]
+        assert steps[4] == [] and steps[5] == []
+        assert steps[6] == [{"no": 1, "action": "Go", "expected": None}]
+    finally:
+        eng.dispose()
@@ -0,0 +1,30 @@
+from app import crud
+
+def test_keyset_pages_walk_the_suite_once(db, make_suite):
+    suite_id, case_ids = make_suite(db, "pages", 7)
+    seen, after = [], None
+    while True:
+        page = crud.get_cases_page(db, suite_id, after_id=after, limit=3)
+        assert page["total"] == 7
+        seen += [c["id"] for c in page["cases"]]
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert seen == case_ids
+    #the last full page does not point at an empty one
+    assert crud.get_cases_page(db, suite_id, after_id=case_ids[-4], limit=3)["next_cursor"] is None
+
+def test_fields_and_filters(db, make_suite):
+    suite_id, _ = make_suite(db, "pages")
+    high = [crud.create_test_case(db, suite_id, f"high {i}", priority="High").id for i in range(2)]
+    low = crud.create_test_case(db, suite_id, "low", priority="Low", steps="Open").id
+    crud.record_executions(db, [{"case_id": high[0], "status": "FAIL"}, {"case_id": low, "status": "PASS"}])
+
+    page = crud.get_cases_page(db, suite_id, fields=["title", "steps", "bogus"])
+    assert set(page["cases"][0]) == {"id", "title", "steps"}
+    assert page["cases"][-1]["steps"] == [{"no": 1, "action": "Open", "expected": None}]
+
+    by_priority = crud.get_cases_page(db, suite_id, priorities=["High"])
+    assert [c["id"] for c in by_priority["cases"]] == high and by_priority["total"] is None
+    failed_or_new = crud.get_cases_page(db, suite_id, statuses=["FAIL", "NOT STARTED"])
+    assert [c["id"] for c in failed_or_new["cases"]] == high and failed_or_new["total"] == 2
@@ -0,0 +1,49 @@
+from datetime import datetime
+import pytest
+from app import crud, runs
+
+def test_results_keep_the_newest_per_run_case(db, make_suite):
+    suite_id, (a, b) = make_suite(db, "runs", 2)
+    run = runs.create_run(db, suite_id, name="nightly")
+    assert run["counts"] == {"NOT STARTED": 2}
+    results = runs.record_run_results(db, run["id"], [
+        {"case_id": a, "status": "fail", "executed_at": datetime(2024, 5, 2)},
+        {"case_id": a, "status": "PASS", "executed_at": datetime(2024, 5, 1)},  # older, history only
+        {"case_id": 999, "status": "PASS"},
+    ])
+    assert [r["ok"] for r in results] == [True, True, False]
+    assert results[2]["error"] == "Test case not in this run"
+    assert runs.get_run_summary(db, run["id"])["counts"] == {"FAIL": 1, "NOT STARTED": 1}
+    page = runs.get_run_cases_page(db, run["id"], status="fail")["cases"]
+    assert [(c["test_case_id"], c["status"]) for c in page] == [(a, "FAIL")]
+    assert len(crud.get_case_detail_with_executions(db, a, 10)["executions"]) == 2
+
+def test_closed_run_rejects_results(db, make_suite):
+    suite_id, (a,) = make_suite(db, "runs", 1)
+    run_id = runs.create_run(db, suite_id)["id"]
+    assert runs.close_run(db, run_id)["status"] == "closed"
+    with pytest.raises(runs.RunClosed):
+        runs.record_run_results(db, run_id, [{"case_id": a, "status": "PASS"}])
+    assert runs.record_run_results(db, 999, []) is None
+
+def test_compare_runs_matches_cases_by_id(db, make_suite):
+    suite_id, (a, b) = make_suite(db, "runs", 2)
+    base = runs.create_run(db, suite_id)["id"]
+    runs.record_run_results(db, base, [{"case_id": a, "status": "PASS"}, {"case_id": b, "status": "PASS"}])
+    c = crud.create_test_case(db, suite_id, "added later").id
+    head = runs.create_run(db, suite_id)["id"]
+    runs.record_run_results(db, head, [{"case_id": a, "status": "FAIL"}, {"case_id": b, "status": "PASS"}])
+    diff = runs.compare_runs(db, base, head)
+    pairs = {(t["from_status"], t["to_status"]): t["count"] for t in diff["transitions"]}
+    assert pairs == {("PASS", "FAIL"): 1, ("PASS", "PASS"): 1, ("NOT IN RUN", "NOT STARTED"): 1}
+    assert [(ch["case_id"], ch["to_status"]) for ch in diff["changed"]] == [(a, "FAIL"), (c, "NOT STARTED")]
+    assert diff["changed_total"] == 2
+    assert runs.compare_runs(db, base, 999) is None
+
+def test_list_runs_pages_newest_first(db, make_suite):
+    suite_id, _ = make_suite(db, "runs", 1)
+    ids = [runs.create_run(db, suite_id)["id"] for _ in range(3)]
+    first = runs.list_runs(db, suite_id, limit=2)
+    assert [r["id"] for r in first["runs"]] == ids[:0:-1]
+    rest = runs.list_runs(db, suite_id, before_id=first["next_before"], limit=2)
+    assert [r["id"] for r in rest["runs"]] == ids[:1] and rest["next_before"] is None
@@ -0,0 +1,41 @@
+from app import crud, models
+from app.search import ensure_search_index, search_cases
+
+def _cases(db, make_suite):
+    suite_id, _ = make_suite(db, "search")
+    other_id, _ = make_suite(db, "other")
+    login = crud.create_test_case(db, suite_id, "Login with valid password", "User signs in").id
+    reset = crud.create_test_case(db, suite_id, "Reset form", "Clears the login fields").id
+    steps = crud.create_test_case(db, suite_id, "Checkout", steps="Open cart -> Cart shown\nPay by voucher").id
+    elsewhere = crud.create_test_case(db, other_id, "Login as admin").id
+    return suite_id, other_id, login, reset, steps, elsewhere
+
+def test_prefix_match_ranks_titles_first_with_snippets(engine, db, make_suite):
+    ensure_search_index(engine)
+    suite_id, _, login, reset, _, elsewhere = _cases(db, make_suite)
+    results = search_cases(db, "log")["results"]
+    assert {r["id"] for r in results[:2]} == {login, elsewhere}
+    assert results[-1]["id"] == reset  # description only, lowest weight
+    assert "[" in results[0]["snippet"] and "]" in results[0]["snippet"]
+    scoped = search_cases(db, "login", suite_id=suite_id)["results"]
+    assert [r["id"] for r in scoped] == [login, reset]
+
+def test_steps_and_edits_reach_the_index(engine, db, make_suite):
+    ensure_search_index(engine)
+    _, other_id, login, _, steps, elsewhere = _cases(db, make_suite)
+    assert [r["id"] for r in search_cases(db, "vouch")["results"]] == [steps]
+    db.get(models.TestCase, login).title = "Sign in"
+    db.commit()
+    assert login not in {r["id"] for r in search_cases(db, "valid password")["results"]}
+    crud.delete_cases_in_batches(db, [other_id], 10)
+    assert elsewhere not in {r["id"] for r in search_cases(db, "admin")["results"]}
+
+def test_query_syntax_and_paging(engine, db, make_suite):
+    ensure_search_index(engine)
+    _cases(db, make_suite)
+    #FTS5 operators in the input are plain words
+    assert search_cases(db, '"login" OR NOT*')["results"] == []
+    assert search_cases(db, "  ...  ") == {"results": [], "next_offset": None}
+    first = search_cases(db, "login", limit=2)
+    assert len(first["results"]) == 2 and first["next_offset"] == 2
+    assert len(search_cases(db, "login", limit=2, offset=2)["results"]) == 1
@@ -0,0 +1,27 @@
+import math
+from app.utils import normalize_steps, steps_text
+
+def test_free_text_lines_with_numbering_and_expected():
+    text = "Step 1: Open app => Home shown\n2) Tap login | Expected: Form shown\n\n- Submit"
+    assert normalize_steps(text) == [
+        {"no": 1, "action": "Open app", "expected": "Home shown"},
+        {"no": 2, "action": "Tap login", "expected": "Form shown"},
+        {"no": 3, "action": "Submit", "expected": None},
+    ]
+
+def test_structured_shapes():
+    assert normalize_steps('[{"step": "Go", "expected_result": "Done"}]') == [
+        {"no": 1, "action": "Go", "expected": "Done"}]
+    assert normalize_steps({"action": "One"}) == [{"no": 1, "action": "One", "expected": None}]
+    assert normalize_steps(["a -> b", "", None, {"description": "c"}]) == [
+        {"no": 1, "action": "a", "expected": "b"}, {"no": 2, "action": "c", "expected": None}]
+    #numbers are reassigned, blank dict steps dropped
+    assert [s["no"] for s in normalize_steps([{"no": 7, "action": "x"}, {"action": ""}, {"action": "y"}])] == [1, 2]
+
+def test_empty_values_and_round_trip():
+    for empty in (None, "", "   ", math.nan, "[]", []):
+        assert normalize_steps(empty) == []
+    steps = normalize_steps("Open -> Shown\nClose")
+    assert steps_text(steps) == "1. Open -> Shown\n2. Close"
+    assert normalize_steps(steps_text(steps)) == steps
+    assert normalize_steps("[not json") == [{"no": 1, "action": "[not json", "expected": None}]
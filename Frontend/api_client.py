@@ -0,0 +1,190 @@
+"""
+HTTP client for the backend, shared by every session of the Streamlit app.
+
+One keep-alive httpx.Client per Streamlit server process (get_client() is a
+st.cache_resource), so reruns reuse pooled connections instead of opening new ones.
+
+GET responses are kept in a small TTL cache keyed by path and params and tagged
+(suites, projects, suite:<id>, case:<id>). Once an entry is older than its TTL
+it is revalidated with the ETag the backend sent (If-None-Match, a 304 keeps
+the cached body). Writes go through post()/delete() with the tags they affect,
+and only those entries are dropped.
+
+prefetch() runs several GETs at once on a small thread pool over the same pooled
+client and stores them in the same cache, so a screen that needs the case page and
+the summary waits for one parallel round trip; the get_json() calls after it are
+cache hits.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import streamlit as st
+
+#seconds a response is used without asking the backend again
+TTL_LISTS = 300      # suites, projects: change rarely, writes here invalidate them
+TTL_SUITE = 30       # case pages and summaries, other users' writes show up after this
+TTL_CASE = 30        # case detail and daily trend
+
+class ApiError(Exception):
+    def __init__(self, status_code: int, text: str):
+        super().__init__(f"HTTP {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
+
+def _key(path: str, params):
+    items = sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in (params or {}).items()
+                   if v is not None)
+    return path, tuple(items)
+
+class ApiClient:
+    def __init__(self, base_url: str, timeout: float = 10):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        self.http = httpx.Client(base_url=base_url, timeout=timeout, limits=self.limits)
+        #httpx.Client is thread safe, prefetch threads share its connections
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="api-prefetch")
+        self._cache = {}  # key -> [expires_at, etag, data, tags, stamp]
+        self._lock = threading.Lock()
+
+    def _store(self, key, response: httpx.Response, ttl: float, tags, stamp=None):
+        """Cache a 200 or refresh the entry a 304 confirmed; None for a 304 whose entry is gone."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if response.status_code == 304:
+                if entry is None:
+                    return None
+                entry[0] = time.monotonic() + ttl
+                entry[4] = stamp
+                return entry[2]
+            data = response.json()
+            self._cache[key] = [time.monotonic() + ttl, response.headers.get("etag"), data, tuple(tags), stamp]
+            return data
+
+    def _lookup(self, key):
+        """(fresh data or None, headers for a revalidating request)."""
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None:
+            return None, {}
+        if entry[0] > time.monotonic():
+            return entry[2], {}
+        return None, {"If-None-Match": entry[1]} if entry[1] else {}
+
+    def get_json(self, path: str, params=None, ttl: float = 0, tags=()):
+        """
+        JSON body of GET path; raises ApiError for an error status.
+        ttl=0 always asks the backend (job status, event cursors).
+        """
+        if ttl <= 0:
+            resp = self.http.get(path, params=params)
+            if resp.status_code >= 400:
+                raise ApiError(resp.status_code, resp.text)
+            return resp.json()
+        key = _key(path, params)
+        data, headers = self._lookup(key)
+        if data is not None:
+            return data
+        return self._fetch_and_store(key, path, params, headers, ttl, tags)
+
+    def _fetch_and_store(self, key, path, params, headers, ttl, tags, stamp=None):
+        resp = self.http.get(path, params=params, headers=headers)
+        if resp.status_code >= 400:
+            raise ApiError(resp.status_code, resp.text)
+        data = self._store(key, resp, ttl, tags, stamp)
+        if data is None:
+            #another session invalidated the entry the 304 refers to, ask for the body
+            resp = self.http.get(path, params=params)
+            if resp.status_code >= 400:
+                raise ApiError(resp.status_code, resp.text)
+            data = self._store(key, resp, ttl, tags, stamp)
+        return data
+
+    def prefetch(self, requests, stamp=None):
+        """
+        Warm the cache for [(path, params, ttl, tags), ...] concurrently. Errors are
+        not cached, the get_json() call for that request then reports them.
+        stamp is kept with the responses fetched here (see suite_view).
+        """
+        todo = []
+        for path, params, ttl, tags in requests:
+            key = _key(path, params)
+            data, headers = self._lookup(key)
+            if data is None:
+                todo.append((key, path, params, ttl, tags, headers))
+        futures = [self._pool.submit(self._fetch_and_store, key, path, params, headers, ttl, tags, stamp)
+                   for key, path, params, ttl, tags, headers in todo]
+        for f in futures:
+            f.exception()  # wait; errors are left for get_json to report
+
+    def invalidate(self, *tags: str):
+        """Drop cached responses carrying any of tags; "suite:*" matches every suite."""
+        prefixes = tuple(t[:-1] for t in tags if t.endswith("*"))
+        exact = {t for t in tags if not t.endswith("*")}
+        with self._lock:
+            for key in [k for k, e in self._cache.items()
+                        if any(t in exact or (prefixes and t.startswith(prefixes)) for t in e[3])]:
+                del self._cache[key]
+
+    def post(self, path: str, invalidate=(), **kwargs):
+        """POST through the pooled client; invalidate is dropped from the cache when it succeeds."""
+        resp = self.http.post(path, **kwargs)
+        if resp.status_code < 400:
+            self.invalidate(*invalidate)
+        return resp
+
+    def delete(self, path: str, invalidate=(), **kwargs):
+        resp = self.http.delete(path, **kwargs)
+        if resp.status_code < 400:
+            self.invalidate(*invalidate)
+        return resp
+
+    #the screens' reads, with their TTL and tags in one place
+    def suites(self):
+        return self.get_json("/api/suites", ttl=TTL_LISTS, tags=("suites",))
+
+    def projects(self):
+        return self.get_json("/api/projects", ttl=TTL_LISTS, tags=("projects",))
+
+    def cases_page_request(self, suite_id: int, params):
+        return f"/api/suites/{suite_id}/cases/page", params, TTL_SUITE, (f"suite:{suite_id}",)
+
+    def summary(self, suite_id: int):
+        return self.fetch(self.summary_request(suite_id))
+
+    def summary_request(self, suite_id: int):
+        return f"/api/suites/{suite_id}/summary", None, TTL_SUITE, (f"suite:{suite_id}",)
+
+    def case_request(self, case_id: int, suite_id: int, params=None):
+        return f"/api/cases/{case_id}", params, TTL_CASE, (f"case:{case_id}", f"suite:{suite_id}")
+
+    def trend_request(self, case_id: int, suite_id: int):
+        return f"/api/cases/{case_id}/executions/daily", None, TTL_CASE, (f"case:{case_id}", f"suite:{suite_id}")
+
+    def fetch(self, request):
+        """get_json for a (path, params, ttl, tags) tuple from the *_request helpers."""
+        path, params, ttl, tags = request
+        return self.get_json(path, params, ttl, tags)
+
+    def suite_view(self, suite_id: int, page_params):
+        """
+        (cases page, event seq) for a suite; the summary is fetched alongside, so when
+        neither is cached both come in one parallel round trip. The seq is read before
+        them and kept with the cached page, so a page served from the cache is patched
+        with every event since it was fetched, not just since this call.
+        """
+        page_req, summary_req = self.cases_page_request(suite_id, page_params), self.summary_request(suite_id)
+        seq = None
+        if self._lookup(_key(page_req[0], page_req[1]))[0] is None:
+            seq = self.get_json(f"/api/suites/{suite_id}/events")["last_seq"]
+        self.prefetch([page_req, summary_req], stamp=seq)
+        page = self.fetch(page_req)
+        with self._lock:
+            entry = self._cache.get(_key(page_req[0], page_req[1]))
+        return page, entry[4] if entry and entry[4] is not None else seq or 0
+
+@st.cache_resource
+def get_client(base_url: str) -> ApiClient:
+    #one per server process, shared by all sessions and reruns
+    return ApiClient(base_url)
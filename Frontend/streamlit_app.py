@@ -1,11 +1,12 @@
 import streamlit as st
-import httpx
 import asyncio
 import pandas as pd
 from st_aggrid import AgGrid, GridOptionsBuilder, JsCode, GridUpdateMode, DataReturnMode
 import matplotlib.pyplot as plt
 from datetime import datetime
 import os
+import time
+from api_client import get_client, ApiError
 
 BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:8000")
 
@@ -15,24 +16,23 @@ st.set_page_config(page_title="Test Case Management", layout="wide")
 
 tab = st.sidebar.radio("Select",("🧪 Test Suites","📋 Test Cases & Summary", "📤 Upload Test cases"),  label_visibility="collapsed")
 
-#we have cached this suites table to avoid fetching everytime from db
-@st.cache_data
+#pooled connections and a response cache shared by all sessions, writes below say what they invalidate
+client = get_client(API_BASE)
+
 def fetch_suites():
-    suites_data = httpx.get(f"{API_BASE}/api/suites", timeout=10)
-    if suites_data.status_code==200:
-        return suites_data.json()
-    else:
-        st.error(suites_data.text)
+    try:
+        return client.suites()
+    except ApiError as e:
+        st.error(e.text)
 
 
 def fetch_projects():
-    projects_data = httpx.get(f"{API_BASE}/api/projects", timeout=10)
-    return projects_data.json()
+    return client.projects()
 
 if tab == "🧪 Test Suites":
     st.header("🧪 Test Suites")
     if st.button("🔄 Refresh Suites"):
-        st.cache_data.clear()
+        client.invalidate("suites", "projects")
     
     try:
         data = fetch_suites()
@@ -51,12 +51,11 @@ if tab == "🧪 Test Suites":
         if submitted:
             if name!='':
                 payload = {"projectid":project_id, "suitename": name}
-                resp_suite = httpx.post(f"{API_BASE}/api/add/suite", json=payload)
+                resp_suite = client.post("/api/add/suite", json=payload, invalidate=["suites"])
                 if resp_suite.status_code!=200:
                     st.error(resp_suite.text)
                 else:
                     st.success(resp_suite.text)
-                    st.cache_data.clear()
                     st.rerun()
             if name=="":
                 st.error("Please enter the name")
@@ -95,12 +94,13 @@ if tab == "📋 Test Cases & Summary":
         st.write("")
         st.write("")
     if delete_tcs.button("🗑️ Delete test cases"):
-        delete_case = httpx.delete(f"{API_BASE}/api/suites/{suite_idd}/cases")
+        delete_case = client.delete(f"/api/suites/{suite_idd}/cases", invalidate=["suites", f"suite:{suite_idd}"])
         if delete_case.status_code!=200:
             st.error(delete_case.text)
         else:
             st.success(delete_case.text)
             st.session_state['cases_data'] = []
+            st.session_state["page_key"] = None
     
     #delete suite
     with delete_suite:
@@ -117,11 +117,10 @@ if tab == "📋 Test Cases & Summary":
         st.warning("This will delete the linked test cases as well. Are you sure?")
         yes, no = st.columns(2)
         if yes.button("Yes", key="confirm_delete_yes"):
-            resp_suite = httpx.delete(f"{API_BASE}/api/suites/{suite_idd}")
+            resp_suite = client.delete(f"/api/suites/{suite_idd}", invalidate=["suites", f"suite:{suite_idd}"])
             if resp_suite.status_code==200:
                 st.success(resp_suite.text)
                 st.session_state["confirm_delete_suite"] = False
-                st.cache_data.clear()
                 st.rerun()
             else:
                 st.error(resp_suite.text)
@@ -135,33 +134,91 @@ if tab == "📋 Test Cases & Summary":
         st.write("")
         st.write("")
     if refresh_button.button("🔄 Fetch data", key="btn_fetch_data"):
+        client.invalidate(f"suite:{suite_idd}")
         st.session_state["refresh_suite"] = True
+        st.session_state["page_key"] = None
         st.session_state["confirm_delete_suite"] = False
         st.session_state["show_cases"] = False
         st.session_state["show_summary"] = False
+        st.session_state["page_cursors"] = [None]
         st.rerun()
 
-    #load test cases for that particular suite it
+    if "page_cursors" not in st.session_state:
+        st.session_state["page_cursors"] = [None]  # after_id of every page visited so far, first page has none
+
+    def reset_paging():
+        st.session_state["page_cursors"] = [None]
+
+    if st.session_state["data_loaded_for_suite"] != suite_idd:
+        reset_paging()
+
+    #load one page of test cases for that particular suite id, filters are applied by the backend
     if st.session_state["refresh_suite"] == True:
-        try:
-            resp = httpx.get(f"{API_BASE}/api/suites/{suite_idd}/cases", timeout=10)
-        except Exception as e:
-            st.error(f"Could not reach backend: {e}")
-            st.stop()
-
-        if resp.status_code!=200:
-            st.error(f"Failed to load cases: {resp.text}")
-            st.stop()
-
-        #test cases are fetched here
-        st.session_state["cases_data"] = resp.json().get("cases",[])
+        page_params = {
+            "limit": st.session_state.get("page_size", 100),
+            "priority": st.session_state.get("filter_priority", []),
+            "status": st.session_state.get("filter_status", []),
+        }
+        if st.session_state["page_cursors"][-1] is not None:
+            page_params["after_id"] = st.session_state["page_cursors"][-1]
+        page_key = (suite_idd, tuple(st.session_state["page_cursors"]), page_params["limit"],
+                    tuple(page_params["priority"]), tuple(page_params["status"]))
+        need_page = st.session_state.get("page_key") != page_key
+
+        if not need_page:
+            #same page as last rerun: only pull the events since then and patch the rows we hold
+            try:
+                ev_data = client.get_json(f"/api/suites/{suite_idd}/events",
+                                          params={"after": st.session_state["events_seq"]})
+            except Exception:
+                ev_data = None
+            if ev_data is not None and ev_data["events"]:
+                #the suite changed since its pages and summary were cached
+                client.invalidate(f"suite:{suite_idd}")
+            if ev_data is None or ev_data["reset"] or any(e["type"] == "reload" for e in ev_data["events"]):
+                client.invalidate(f"suite:{suite_idd}")
+                need_page = True
+            else:
+                rows_by_id = {c["id"]: c for c in st.session_state["cases_data"]}
+                for e in ev_data["events"]:
+                    row = rows_by_id.get(e["case_id"])
+                    if row is not None:
+                        row["latest_status"] = e["latest_status"]
+                        row["latest_executed_at"] = e["latest_executed_at"]
+                    if page_params["status"] and st.session_state.get("cases_total") is not None:
+                        st.session_state["cases_total"] += sum(d for name, d in e["counts_delta"].items()
+                                                               if name in page_params["status"])
+                if page_params["status"]:
+                    #a row whose new status no longer matches the filter drops out of the view
+                    st.session_state["cases_data"] = [c for c in st.session_state["cases_data"]
+                                                      if (c.get("latest_status") or "NOT STARTED") in page_params["status"]]
+                st.session_state["events_seq"] = ev_data["last_seq"]
+
+        if need_page:
+            try:
+                #page and summary in one parallel round trip, events after seq get patched in
+                page, seq = client.suite_view(suite_idd, page_params)
+            except ApiError as e:
+                st.error(f"Failed to load cases: {e.text}")
+                st.stop()
+            except Exception as e:
+                st.error(f"Could not reach backend: {e}")
+                st.stop()
+
+            #test cases are fetched here, copied since the rows get patched in place
+            st.session_state["cases_data"] = [dict(c) for c in page.get("cases",[])]
+            st.session_state["next_cursor"] = page.get("next_cursor")
+            st.session_state["cases_total"] = page.get("total")
+            st.session_state["events_seq"] = seq
+            st.session_state["page_key"] = page_key
         st.session_state["data_loaded_for_suite"] = suite_idd
+        filtering = bool(page_params["priority"] or page_params["status"])
 
 
         #show case summary if cases found and info if not found
-        if len(st.session_state['cases_data'])==0:
+        if len(st.session_state['cases_data'])==0 and not filtering:
             st.info("No test cases found in this suite. Upload or create testcases first.")
-        if st.session_state["data_loaded_for_suite"] == suite_idd and st.session_state["cases_data"]:
+        if st.session_state["data_loaded_for_suite"] == suite_idd and (st.session_state["cases_data"] or filtering):
             # show all the test cases of that suite
             # ---------- CHANGE: use session_state to persist the table across reruns ----------
             if get_tcs.button("📋 Get Test Cases"):
@@ -176,6 +233,23 @@ if tab == "📋 Test Cases & Summary":
                 # display cases table (AgGrid version)
                 st.subheader("📄 Test cases status")
 
+                filter_p, filter_s, size_col = st.columns([1, 1.5, 0.6])
+                filter_p.multiselect("Priority", ["Low", "Medium", "High"], key="filter_priority", on_change=reset_paging)
+                filter_s.multiselect("Latest status", ["NOT STARTED", "PASS", "FAIL", "BLOCKER", "IN PROGRESS"],
+                                     key="filter_status", on_change=reset_paging)
+                size_col.selectbox("Page size", [50, 100, 250, 500], index=1, key="page_size", on_change=reset_paging)
+
+                page_no = len(st.session_state["page_cursors"])
+                total = st.session_state.get("cases_total")
+                prev_col, info_col, next_col = st.columns([0.5, 2, 0.5])
+                info_col.caption(f"Page {page_no}" + (f" of {total} case(s)" if total is not None else ""))
+                if prev_col.button("◀ Prev", disabled=page_no == 1):
+                    st.session_state["page_cursors"].pop()
+                    st.rerun()
+                if next_col.button("Next ▶", disabled=st.session_state.get("next_cursor") is None):
+                    st.session_state["page_cursors"].append(st.session_state["next_cursor"])
+                    st.rerun()
+
                 df_rows = []
                 for c in case:
                     df_rows.append({
@@ -225,11 +299,15 @@ if tab == "📋 Test Cases & Summary":
                 #st.write("DEBUG: selected rows count:", len(selected))
                 if selected:
                     preview = selected[0]
-                    id_select_resp = httpx.get(f"{API_BASE}/api/cases/{preview['id']}", timeout=10)
-                    if id_select_resp.status_code!=200:
-                        st.error(f"Failed to load test case: {id_select_resp.text}")
+                    case_req = client.case_request(preview["id"], suite_idd)
+                    trend_req = client.trend_request(preview["id"], suite_idd)
+                    #detail and daily trend together
+                    client.prefetch([case_req, trend_req])
+                    try:
+                        payload = client.fetch(case_req)
+                    except ApiError as e:
+                        st.error(f"Failed to load test case: {e.text}")
                     else:
-                        payload = id_select_resp.json()
                         case_d = payload["case_r"]
                         execution = payload["executions"]
 
@@ -240,14 +318,46 @@ if tab == "📋 Test Cases & Summary":
                         if case_d.get("priority"):
                             st.write(f"**Priority:** {case_d['priority']}")
                         st.write("**Steps:**")
-                        st.write(case_d.get("steps") or [])
+                        if case_d.get("steps"):
+                            steps_df = pd.DataFrame(case_d["steps"], columns=["no", "action", "expected"])
+                            st.dataframe(steps_df.fillna(""), hide_index=True, use_container_width=True)
+                        else:
+                            st.write("_No steps_")
 
 
-                        #Display Execution
+                        #Display Execution, first page comes with the case, older pages are added on demand
+                        if st.session_state.get("history_case") != case_d["id"]:
+                            st.session_state["history_case"] = case_d["id"]
+                            st.session_state["history_older"] = []
+                            st.session_state["history_cursor"] = payload.get("next_before")
+                        elif not st.session_state["history_older"]:
+                            st.session_state["history_cursor"] = payload.get("next_before")
+                        shown = {ex["id"] for ex in execution}
+                        execution = execution + [ex for ex in st.session_state["history_older"] if ex["id"] not in shown]
+
                         st.markdown("#### Execution history (latest first)")
                         if execution:
-                            for ex in execution:
-                                st.write(f"- {ex['executed_at']} — **{ex['status']}** — {ex.get('comment','')}")
+                            hist_df = pd.DataFrame(execution)[["executed_at", "status", "comment"]]
+                            st.dataframe(hist_df, hide_index=True, use_container_width=True)
+                            cursor = st.session_state["history_cursor"]
+                            if cursor and st.button("Load older"):
+                                try:
+                                    older = client.fetch(client.case_request(case_d["id"], suite_idd, cursor))
+                                except ApiError as e:
+                                    st.error(e.text)
+                                else:
+                                    st.session_state["history_older"] += older["executions"]
+                                    st.session_state["history_cursor"] = older["next_before"]
+                                    st.rerun()
+
+                            try:
+                                days = client.fetch(trend_req)["days"]
+                            except ApiError:
+                                days = []
+                            if days:
+                                trend = pd.DataFrame(days).set_index("day").fillna(0)
+                                st.markdown("##### Daily results (last 90 days)")
+                                st.bar_chart(trend)
                         else:
                             st.write("_No executions yet_")
 
@@ -257,28 +367,32 @@ if tab == "📋 Test Cases & Summary":
 
                         col1, col2, col3, col4 = st.columns(4)
                         if col1.button("PASS ✅"): #text on buttom
-                            resp = httpx.post(f"{API_BASE}/api/execute/{case_d['id']}", params={"status": "PASS", "retry": False, "comment": comment})
+                            resp = client.post(f"/api/execute/{case_d['id']}", params={"status": "PASS", "retry": False, "comment": comment},
+                                               invalidate=[f"suite:{suite_idd}", f"case:{case_d['id']}"])
                             if resp.status_code!=200:
                                 st.error(resp.text)
                             else:
                                 st.success("Recorded PASSED")
                                 st.rerun()
                         if col2.button("FAIL 🟫"):
-                            resp = httpx.post(f"{API_BASE}/api/execute/{case_d['id']}", params={"status": "FAIL", "retry": False, "comment": comment})
+                            resp = client.post(f"/api/execute/{case_d['id']}", params={"status": "FAIL", "retry": False, "comment": comment},
+                                               invalidate=[f"suite:{suite_idd}", f"case:{case_d['id']}"])
                             if resp.status_code!=200:
                                 st.error(resp.text)
                             else:
                                 st.success("Recorded FAILED")
                                 st.rerun()
                         if col3.button("BLOCKER 🔴"):
-                            resp = httpx.post(f"{API_BASE}/api/execute/{case_d['id']}", params={"status": "BLOCKER", "retry": False, "comment": comment})
+                            resp = client.post(f"/api/execute/{case_d['id']}", params={"status": "BLOCKER", "retry": False, "comment": comment},
+                                               invalidate=[f"suite:{suite_idd}", f"case:{case_d['id']}"])
                             if resp.status_code!=200:
                                 st.error(resp.text)
                             else:
                                 st.success("Recorded BLOCKER")
                                 st.rerun()
                         if col4.button("IN PROGRESS 🔵"):
-                            resp = httpx.post(f"{API_BASE}/api/execute/{case_d['id']}", params={"status": "IN PROGRESS", "retry": False, "comment": comment})
+                            resp = client.post(f"/api/execute/{case_d['id']}", params={"status": "IN PROGRESS", "retry": False, "comment": comment},
+                                               invalidate=[f"suite:{suite_idd}", f"case:{case_d['id']}"])
                             if resp.status_code!=200:
                                 st.error(resp.text)
                             else:
@@ -294,11 +408,11 @@ if tab == "📋 Test Cases & Summary":
                 st.markdown("-----------")
                 st.subheader("📈 Test summary  status")
 
-                resp_summ = httpx.get(f"{API_BASE}/api/suites/{suite_idd}/summary")
-                if resp_summ.status_code!=200:
-                    st.error(resp_summ.text)
+                try:
+                    data = client.summary(suite_idd)
+                except ApiError as e:
+                    st.error(e.text)
                 else:
-                    data = resp_summ.json()
                     data_status = pd.DataFrame({'Status':list(data.keys()), 'Count': list(data.values())})
                     #create a chart
                     #st.bar_chart(data_status.set_index('Status'))
@@ -327,36 +441,66 @@ if tab == "📋 Test Cases & Summary":
 
 if tab == "📤 Upload Test cases":
     st.markdown("#### Upload a file to import test cases")
-    uploaded = st.file_uploader("select file",type=["xlsx", "xls"], label_visibility="collapsed")
+    uploaded = st.file_uploader("select file",type=["xlsx", "xls", "csv"], label_visibility="collapsed")
     if uploaded:
         mime = (
         "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         if uploaded.name.endswith(".xlsx")
+        else "text/csv" if uploaded.name.endswith(".csv")
         else "application/vnd.ms-excel")
-        files = {"file": (uploaded.name, uploaded.getvalue(), mime)}
-        resp = httpx.post(f"{API_BASE}/api/testcases/upload", files=files)
-        if resp.status_code == 200:
-            st.success("Test cases got uploaded successfully")
-            #st.json(resp.json())
-        else:
-            st.error(f"Upload failed: {resp.text}")
+        upload_key = (uploaded.name, uploaded.size)
+        #the uploader keeps its file across reruns, only submit a given file once
+        if st.session_state.get("uploaded_file") != upload_key:
+            files = {"file": (uploaded.name, uploaded.getvalue(), mime)}
+            #import runs as a background job on the backend, we only wait for the file transfer
+            resp = client.post("/api/testcases/upload", files=files, params={"background": True}, timeout=120)
+            if resp.status_code == 202:
+                st.session_state["uploaded_file"] = upload_key
+                st.session_state["import_job_id"] = resp.json()["job_id"]
+            else:
+                st.error(f"Upload failed: {resp.text}")
+
+        job_id = st.session_state.get("import_job_id")
+        if job_id and st.session_state.get("uploaded_file") == upload_key:
+            progress = st.empty()
+            while True:
+                try:
+                    job = client.get_json(f"/api/import-jobs/{job_id}")
+                except ApiError as e:
+                    progress.error(f"Could not read import status: {e.text}")
+                    break
+                if job["status"] == "done":
+                    #an import can add cases (and suites) anywhere, once per finished job
+                    if st.session_state.get("import_job_seen") != job_id:
+                        st.session_state["import_job_seen"] = job_id
+                        client.invalidate("suites", "suite:*")
+                    progress.success(f"Test cases got uploaded successfully: {job['rows_inserted']} added "
+                                     f"({job['rows_per_sec']} rows/sec)")
+                    break
+                if job["status"] == "failed":
+                    progress.error(f"Upload failed: {'; '.join(job['errors'])}")
+                    break
+                progress.info(f"Importing... {job['rows_parsed']} rows read, {job['rows_inserted']} added "
+                              f"({job['rows_per_sec'] or 0} rows/sec)")
+                time.sleep(1)
 
     st.markdown("-----")
     st.markdown("#### Add single test case")
-    st.cache_data.clear()
     data_up = fetch_suites()
     with st.form("tc_form", clear_on_submit=True):
         select_name = st.selectbox("Choose suite name", data_up, format_func=lambda x:x["suite_name"])
         suite_id = select_name["id"]
         title = st.text_input("Enter title for test case", key = "title_input")
-        steps = st.text_area("Enter steps for test case", key = "steps_input")
+        steps = st.text_area("Enter steps for test case", key = "steps_input",
+                             help="One step per line, add the expected result after ->  e.g. Click login -> Dashboard opens")
         priority = st.selectbox("Choose priority", ["Low", "Medium","High"])
         submitted = st.form_submit_button("Add test case")
         if submitted:
             if title!="":
                 payload = {"suite_id_tc":suite_id, "title_tc":title,
                                 "steps_tc":steps, "priority_tc":priority}
-                resp = httpx.post(f"{API_BASE}/api/testcases/single/", json=payload)
+                resp = client.post("/api/testcases/single/", json=payload,
+                                   invalidate=["suites", f"suite:{suite_id}"])
                 if resp.status_code!=200:
                     st.error(resp.text)
                 else: